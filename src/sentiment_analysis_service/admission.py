@@ -0,0 +1,256 @@
+# src/sentiment_analysis_service/admission.py
+"""
+Admission control for the prediction endpoints.
+
+Every request is checked against per-request limits (body bytes, items,
+characters per text) and against a budget of items in flight across all
+requests. The body size is checked from Content-Length before the body is
+read, and the item and text limits are also part of the request schema, so
+an oversized batch is turned away before it is decoded or validated in
+full. Requests
+over budget are rejected immediately instead of waiting in a queue, so one
+oversized client cannot push up latency for everyone else. An optional
+deadline header lets clients say how long an answer is still useful; work
+that can no longer finish in time is shed too.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Sequence
+
+from .config import (
+    ADMISSION_MAX_BODY_BYTES,
+    ADMISSION_MAX_IN_FLIGHT_ITEMS,
+    ADMISSION_MAX_ITEMS,
+    ADMISSION_MAX_TEXT_CHARS,
+    ADMISSION_RETRY_AFTER_S,
+)
+from .metrics import ADMISSIONS
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionError(Exception):
+    """
+    Raised when a request is not admitted.
+
+    Attributes:
+        status_code (int): HTTP status to answer with.
+        reason (str): Short machine-readable reason, also the metric label.
+        retry_after (Optional[int]): Seconds for the Retry-After header, for
+                                     rejections that are worth retrying.
+    """
+
+    def __init__(
+        self,
+        status_code: int,
+        reason: str,
+        message: str,
+        retry_after: Optional[int] = None,
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def parse_deadline(value: Optional[str], start: float) -> Optional[float]:
+    """
+    Converts a deadline header (milliseconds of budget) to a perf_counter time.
+
+    Args:
+        value (Optional[str]): The header value, or None if absent.
+        start (float): perf_counter() time the request arrived.
+
+    Returns:
+        Optional[float]: The absolute deadline, or None without a header.
+
+    Raises:
+        AdmissionError: If the value is not a positive number (400).
+    """
+    if value is None:
+        return None
+    try:
+        budget_ms = float(value)
+    except ValueError:
+        budget_ms = -1.0
+    if not budget_ms > 0:
+        raise AdmissionError(
+            400,
+            "deadline_invalid",
+            f"Deadline must be positive milliseconds: {value!r}",
+        )
+    return start + budget_ms / 1000
+
+
+def remaining(deadline: Optional[float]) -> Optional[float]:
+    """Seconds left until `deadline` (None if there is no deadline)."""
+    return None if deadline is None else deadline - time.perf_counter()
+
+
+class AdmissionController:
+    """
+    Enforces request size limits and a global budget of in-flight items.
+
+    Limits of 0 are disabled. The budget is counted in items rather than
+    requests because inference cost scales with items: ten 1-item requests
+    and one 10-item request cost about the same.
+    """
+
+    def __init__(
+        self,
+        max_items: int = ADMISSION_MAX_ITEMS,
+        max_text_chars: int = ADMISSION_MAX_TEXT_CHARS,
+        max_in_flight_items: int = ADMISSION_MAX_IN_FLIGHT_ITEMS,
+        retry_after: int = ADMISSION_RETRY_AFTER_S,
+        max_body_bytes: int = ADMISSION_MAX_BODY_BYTES,
+    ):
+        self.max_items = max_items
+        self.max_text_chars = max_text_chars
+        self.max_body_bytes = max_body_bytes
+        self.max_in_flight_items = max_in_flight_items
+        self.retry_after = retry_after
+        # Only touched from the event loop, so no lock is needed
+        self._in_flight_items = 0
+
+    @property
+    def in_flight_items(self) -> int:
+        """Items of admitted requests that have not finished yet."""
+        return self._in_flight_items
+
+    def _shed(self, error: AdmissionError) -> AdmissionError:
+        ADMISSIONS.labels("shed", error.reason).inc()
+        logger.warning(
+            "Request shed: reason=%s status=%d in_flight_items=%d",
+            error.reason,
+            error.status_code,
+            self._in_flight_items,
+        )
+        return error
+
+    def check_body_size(self, content_length: Optional[str]) -> None:
+        """
+        Rejects a body over `max_body_bytes` from its Content-Length header.
+
+        Called before the body is read. Without a Content-Length (a chunked
+        upload) the size cannot be checked up front, so the request is
+        refused with 411.
+
+        Raises:
+            AdmissionError: 413 if the body is too large, 411 if its length
+                            is unknown, 400 if the header is malformed.
+        """
+        if not self.max_body_bytes:
+            return
+        if content_length is None:
+            raise self._shed(
+                AdmissionError(
+                    411,
+                    "length_required",
+                    "Content-Length is required; stream large inputs to "
+                    "/predict/stream or /jobs instead.",
+                )
+            )
+        try:
+            n_bytes = int(content_length)
+        except ValueError:
+            raise self._shed(
+                AdmissionError(
+                    400,
+                    "length_invalid",
+                    f"Invalid Content-Length: {content_length!r}",
+                )
+            )
+        if n_bytes > self.max_body_bytes:
+            raise self._shed(
+                AdmissionError(
+                    413,
+                    "body_too_large",
+                    f"Request body has {n_bytes} bytes; the limit is "
+                    f"{self.max_body_bytes}. Split it into smaller requests.",
+                )
+            )
+
+    def too_many_items(self, n_items: int) -> AdmissionError:
+        """Returns (and counts) the error for a request over `max_items`."""
+        return self._shed(
+            AdmissionError(
+                413,
+                "too_many_items",
+                f"Request has {n_items} items; the limit is "
+                f"{self.max_items}. Split it into smaller requests.",
+            )
+        )
+
+    def text_too_long(self, index: int, n_chars: int) -> AdmissionError:
+        """Returns (and counts) the error for a text over `max_text_chars`."""
+        return self._shed(
+            AdmissionError(
+                413,
+                "text_too_long",
+                f"Item {index} has {n_chars} characters; the limit "
+                f"is {self.max_text_chars}.",
+            )
+        )
+
+    def check_size(self, texts: Sequence[str]) -> None:
+        """
+        Rejects requests over the per-request item or character limits (413).
+
+        Raises:
+            AdmissionError: If a limit is exceeded. Retrying will not help, so
+                            no Retry-After is set.
+        """
+        if self.max_items and len(texts) > self.max_items:
+            raise self.too_many_items(len(texts))
+        if self.max_text_chars:
+            for i, text in enumerate(texts):
+                if len(text) > self.max_text_chars:
+                    raise self.text_too_long(i, len(text))
+
+    def deadline_exceeded(self) -> AdmissionError:
+        """Returns (and counts) the error for work that missed its deadline."""
+        return self._shed(
+            AdmissionError(
+                503,
+                "deadline",
+                "Request deadline expired before processing started.",
+                self.retry_after,
+            )
+        )
+
+    @contextmanager
+    def admit(self, n_items: int, deadline: Optional[float] = None) -> Iterator[None]:
+        """
+        Holds `n_items` of the in-flight budget while the request runs.
+
+        Raises:
+            AdmissionError: 503 if the deadline already passed, 429 if the
+                            budget cannot fit the request right now. Both
+                            carry Retry-After.
+        """
+        left = remaining(deadline)
+        if left is not None and left <= 0:
+            raise self.deadline_exceeded()
+        # A single request larger than the whole budget is still admitted
+        # when nothing else runs, otherwise it could never succeed
+        if (
+            self.max_in_flight_items
+            and self._in_flight_items
+            and self._in_flight_items + n_items > self.max_in_flight_items
+        ):
+            raise self._shed(
+                AdmissionError(
+                    429,
+                    "capacity",
+                    "Server is at capacity, retry later.",
+                    self.retry_after,
+                )
+            )
+        ADMISSIONS.labels("admitted", "ok").inc()
+        self._in_flight_items += n_items
+        try:
+            yield
+        finally:
+            self._in_flight_items -= n_items
@@ -0,0 +1,317 @@
+# src/sentiment_analysis_service/batch.py
+"""
+Offline bulk scoring of CSV, JSONL or Parquet files.
+
+Usage:
+    python -m sentiment_analysis_service.batch INPUT OUTPUT [--text-column text]
+        [--output-format csv|jsonl|parquet] [--chunk-size N] [--workers N] [--resume]
+
+The input is read in chunks, chunks are scored on a process pool (the model
+is loaded once per worker) and results are appended to OUTPUT in input
+order. Progress is recorded next to the output so an interrupted run can be
+continued with --resume.
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from .config import (
+    BATCH_SCORING_CHUNK_SIZE,
+    BATCH_SCORING_TEXT_COLUMN,
+    SERVING_MODEL_PATH,
+)
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "jsonl", "parquet")
+_SUFFIX_FORMATS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".json": "jsonl",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+}
+LABEL_COLUMN = "sentiment"
+PROGRESS_SUFFIX = ".progress.json"
+
+
+def infer_format(path: Path) -> str:
+    """Guesses the file format from the file extension."""
+    fmt = _SUFFIX_FORMATS.get(Path(path).suffix.lower())
+    if fmt is None:
+        raise ValueError(f"Cannot infer format of {path}; pass it explicitly.")
+    return fmt
+
+
+def read_chunks(path: Path, fmt: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yields the input file as DataFrames of at most `chunk_size` rows."""
+    if fmt == "csv":
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    elif fmt == "jsonl":
+        yield from pd.read_json(path, lines=True, chunksize=chunk_size)
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq  # pandas' parquet engine
+
+        for record_batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield record_batch.to_pandas()
+    else:
+        raise ValueError(f"Unknown input format '{fmt}'. Expected one of {FORMATS}.")
+
+
+class ChunkWriter:
+    """Appends scored chunks to the output file and reports its size."""
+
+    def __init__(self, path: Path, fmt: str, resume_at: Optional[int] = None):
+        if fmt not in FORMATS:
+            raise ValueError(
+                f"Unknown output format '{fmt}'. Expected one of {FORMATS}."
+            )
+        self.path = Path(path)
+        self.fmt = fmt
+        self._parquet_writer = None
+        self._file = None
+        if fmt == "parquet":
+            if resume_at is not None:
+                raise ValueError("Resuming is not supported for parquet output.")
+            return
+        self._file = open(self.path, "ab" if resume_at else "wb")
+        if resume_at is not None:
+            # Drop anything written after the last recorded chunk
+            self._file.truncate(resume_at)
+            self._file.seek(resume_at)
+        self._header_written = bool(resume_at)
+
+    def write(self, frame: pd.DataFrame) -> None:
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+            return
+        if self.fmt == "csv":
+            data = frame.to_csv(index=False, header=not self._header_written)
+            self._header_written = True
+        else:
+            data = frame.to_json(orient="records", lines=True, force_ascii=False)
+            if data and not data.endswith("\n"):
+                data += "\n"
+        self._file.write(data.encode("utf-8"))
+
+    def commit(self) -> Optional[int]:
+        """Flushes to disk and returns the output size in bytes (text formats)."""
+        if self._file is None:
+            return None
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def close(self) -> None:
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if self._file is not None:
+            self._file.close()
+
+
+def _progress_path(output: Path) -> Path:
+    return Path(str(output) + PROGRESS_SUFFIX)
+
+
+def _write_progress(path: Path, progress: Dict[str, Any]) -> None:
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(progress, f)
+    os.replace(tmp_path, path)  # Atomic, so a crash never leaves half a file
+
+
+def _init_worker(model_path: str) -> None:
+    """Loads the model once per worker process."""
+    from .predict import load_model, set_sharding
+
+    # Chunks are already spread over workers here; sharding them again would
+    # start a pool inside every worker
+    set_sharding(False)
+    load_model(Path(model_path))
+
+
+def _score_texts(texts: List[Any]) -> List[str]:
+    """Scores one chunk of texts (runs inside a worker)."""
+    from .predict import predict_labels
+
+    return [str(label) for label in predict_labels(texts)]
+
+
+def run_batch(
+    input_path: Path,
+    output_path: Path,
+    input_format: Optional[str] = None,
+    output_format: Optional[str] = None,
+    text_column: str = BATCH_SCORING_TEXT_COLUMN,
+    chunk_size: int = BATCH_SCORING_CHUNK_SIZE,
+    workers: int = os.cpu_count() or 1,
+    resume: bool = False,
+    model_path: Path = SERVING_MODEL_PATH,
+) -> Dict[str, Any]:
+    """
+    Scores every row of `input_path` and writes the rows plus a sentiment column.
+
+    Args:
+        input_path (Path): CSV, JSONL or Parquet file to score.
+        output_path (Path): Where to write the scored rows.
+        input_format (Optional[str]): Input format; inferred from the suffix.
+        output_format (Optional[str]): Output format; inferred from the suffix.
+        text_column (str): Column holding the text to score.
+        chunk_size (int): Rows per chunk handed to a worker.
+        workers (int): Worker processes; 1 scores in the current process.
+        resume (bool): Continue a previous run from its progress file.
+        model_path (Path): Model to load in each worker.
+
+    Returns:
+        Dict[str, Any]: Summary with rows scored, elapsed seconds and rows/sec.
+    """
+    input_path, output_path = Path(input_path), Path(output_path)
+    input_format = input_format or infer_format(input_path)
+    output_format = output_format or infer_format(output_path)
+    progress_path = _progress_path(output_path)
+    progress = {
+        "input": str(input_path.resolve()),
+        "text_column": text_column,
+        "chunk_size": chunk_size,
+        "chunks_done": 0,
+        "rows_done": 0,
+        "output_bytes": 0,
+    }
+    if resume and progress_path.exists():
+        with open(progress_path) as f:
+            saved = json.load(f)
+        for key in ("input", "text_column", "chunk_size"):
+            if saved.get(key) != progress[key]:
+                raise ValueError(
+                    f"Cannot resume: {key} changed ({saved.get(key)!r} -> "
+                    f"{progress[key]!r})."
+                )
+        progress = saved
+        logger.info(
+            f"Resuming after {progress['chunks_done']} chunks "
+            f"({progress['rows_done']} rows)."
+        )
+    skip_chunks = progress["chunks_done"]
+    if skip_chunks and output_format == "parquet":
+        raise ValueError("Resuming is not supported for parquet output.")
+
+    writer = ChunkWriter(
+        output_path,
+        output_format,
+        resume_at=progress["output_bytes"] if skip_chunks else None,
+    )
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(str(model_path),)
+        )
+    else:
+        _init_worker(str(model_path))
+
+    start = time.perf_counter()
+    rows_scored = 0
+    pending: deque = deque()
+
+    def write_next() -> None:
+        nonlocal rows_scored
+        frame, labels = pending.popleft()
+        frame[LABEL_COLUMN] = labels.result() if pool is not None else labels
+        writer.write(frame)
+        progress["output_bytes"] = writer.commit()
+        progress["chunks_done"] += 1
+        progress["rows_done"] += len(frame)
+        _write_progress(progress_path, progress)
+        rows_scored += len(frame)
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"Chunk {progress['chunks_done']} written: {progress['rows_done']} rows "
+            f"total, {rows_scored / elapsed:.0f} rows/sec"
+        )
+
+    try:
+        for index, frame in enumerate(
+            read_chunks(input_path, input_format, chunk_size)
+        ):
+            if index < skip_chunks:
+                continue
+            if text_column not in frame.columns:
+                raise ValueError(
+                    f"Text column '{text_column}' not found in {input_path}. "
+                    f"Available columns: {list(frame.columns)}"
+                )
+            texts = frame[text_column].tolist()
+            if pool is not None:
+                pending.append((frame, pool.submit(_score_texts, texts)))
+                # Keep a bounded number of chunks in flight (and in memory)
+                if len(pending) >= 2 * workers:
+                    write_next()
+            else:
+                pending.append((frame, _score_texts(texts)))
+                write_next()
+        while pending:
+            write_next()
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "rows_scored": rows_scored,
+        "rows_total": progress["rows_done"],
+        "chunks": progress["chunks_done"],
+        "seconds": elapsed,
+        "rows_per_sec": rows_scored / elapsed if elapsed > 0 else 0.0,
+    }
+    logger.info(f"Batch scoring finished: {summary}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", type=Path)
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--input-format", choices=FORMATS)
+    parser.add_argument("--output-format", choices=FORMATS)
+    parser.add_argument("--text-column", default=BATCH_SCORING_TEXT_COLUMN)
+    parser.add_argument("--chunk-size", type=int, default=BATCH_SCORING_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--resume", action="store_true")
+    parser.add_argument("--model-path", type=Path, default=SERVING_MODEL_PATH)
+    args = parser.parse_args(argv)
+
+    summary = run_batch(
+        args.input,
+        args.output,
+        input_format=args.input_format,
+        output_format=args.output_format,
+        text_column=args.text_column,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        resume=args.resume,
+        model_path=args.model_path,
+    )
+    print(
+        f"Scored {summary['rows_scored']} rows ({summary['rows_total']} total) "
+        f"in {summary['seconds']:.1f}s: {summary['rows_per_sec']:.0f} rows/sec"
+    )
+
+
+if __name__ == "__main__":
+    main()
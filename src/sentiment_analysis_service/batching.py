@@ -0,0 +1,195 @@
+# src/sentiment_analysis_service/batching.py
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+from .executor import InferenceExecutor
+from .metrics import BATCH_SIZE
+from .predict import predict
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the batch-size histogram buckets reported by stats()
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+class _PendingRequest:
+    """Texts from one caller waiting to be scored, plus the future to resolve."""
+
+    __slots__ = ("texts", "future")
+
+    def __init__(self, texts: List[Any], future: asyncio.Future):
+        self.texts = texts
+        self.future = future
+
+
+class MicroBatcher:
+    """
+    Merges concurrent prediction calls into larger batches.
+
+    Incoming texts are queued and flushed as one predict() call when the
+    merged batch reaches `max_batch_size` texts or the oldest queued request
+    has waited `max_wait_ms`. Each caller gets back only its own slice of the
+    results, in its original order.
+    """
+
+    def __init__(
+        self,
+        executor: InferenceExecutor,
+        predict_fn: Callable[[List[Any]], List[Dict[str, Any]]] = predict,
+        max_batch_size: int = BATCH_MAX_SIZE,
+        max_wait_ms: float = BATCH_MAX_WAIT_MS,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must not be negative.")
+        self.executor = executor
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._running_batches: set = set()
+        self._carry: Optional[_PendingRequest] = None
+        # Stats
+        self._queued_texts = 0
+        self._batches = 0
+        self._batched_texts = 0
+        self._max_seen_batch = 0
+        self._size_histogram = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+
+    def start(self) -> None:
+        """Starts the collector task on the running event loop (idempotent)."""
+        if self._collector is not None and not self._collector.done():
+            return
+        self._queue = asyncio.Queue()
+        self._collector = asyncio.get_running_loop().create_task(self._collect())
+        logger.info(
+            f"Micro-batcher started: max_batch_size={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait * 1000:.1f}"
+        )
+
+    async def stop(self) -> None:
+        """Flushes queued requests, waits for running batches and stops."""
+        if self._collector is None:
+            return
+        await self._queue.put(None)  # Sentinel: flush and exit
+        await self._collector
+        if self._running_batches:
+            await asyncio.gather(*self._running_batches, return_exceptions=True)
+        self._collector = None
+        logger.info("Micro-batcher stopped.")
+
+    async def submit(self, texts: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Queues texts for the next merged batch and waits for their results.
+
+        Args:
+            texts (List[Any]): Raw texts from a single caller.
+
+        Returns:
+            List[Dict[str, Any]]: One prediction dict per input text, in order.
+        """
+        if not texts:
+            return []
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queued_texts += len(texts)
+        await self._queue.put(_PendingRequest(list(texts), future))
+        return await future
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns queue depth and batch-size statistics."""
+        histogram = {
+            f"le_{bound}": count
+            for bound, count in zip(BATCH_SIZE_BUCKETS, self._size_histogram)
+        }
+        histogram["le_inf"] = self._size_histogram[-1]
+        return {
+            "queue_depth": self._queued_texts,
+            "batches": self._batches,
+            "batched_texts": self._batched_texts,
+            "mean_batch_size": (
+                self._batched_texts / self._batches if self._batches else 0.0
+            ),
+            "max_batch_size_seen": self._max_seen_batch,
+            "batch_size_histogram": histogram,
+            "running_batches": len(self._running_batches),
+        }
+
+    async def _collect(self) -> None:
+        """Collector loop: groups queued requests and dispatches batches."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = self._carry
+            self._carry = None
+            if first is None:
+                first = await self._queue.get()
+                if first is None:
+                    break
+            batch = [first]
+            size = len(first.texts)
+            deadline = loop.time() + self.max_wait
+            while size < self.max_batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is None:
+                    stopping = True
+                    break
+                if size + len(item.texts) > self.max_batch_size:
+                    # Keep it for the next batch rather than overshooting the limit
+                    self._carry = item
+                    break
+                batch.append(item)
+                size += len(item.texts)
+            self._dispatch(batch, size)
+        # Flush anything left behind so no caller waits forever
+        if self._carry is not None:
+            self._dispatch([self._carry], len(self._carry.texts))
+            self._carry = None
+
+    def _dispatch(self, batch: List[_PendingRequest], size: int) -> None:
+        """Records stats and schedules a merged batch on the executor."""
+        self._queued_texts -= size
+        self._batches += 1
+        self._batched_texts += size
+        self._max_seen_batch = max(self._max_seen_batch, size)
+        for i, bound in enumerate(BATCH_SIZE_BUCKETS):
+            if size <= bound:
+                self._size_histogram[i] += 1
+                break
+        else:
+            self._size_histogram[-1] += 1
+        BATCH_SIZE.labels("microbatch").observe(size)
+        task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+        self._running_batches.add(task)
+        task.add_done_callback(self._running_batches.discard)
+
+    async def _run_batch(self, batch: List[_PendingRequest]) -> None:
+        """Runs one vectorized predict() call and routes result slices back."""
+        texts = [text for item in batch for text in item.texts]
+        try:
+            results = await self.executor.run(self.predict_fn, texts)
+        except Exception as e:
+            logger.error(f"Merged batch of {len(texts)} failed: {e}", exc_info=True)
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+        offset = 0
+        for item in batch:
+            end = offset + len(item.texts)
+            if not item.future.done():  # Caller may have gone away
+                item.future.set_result(results[offset:end])
+            offset = end
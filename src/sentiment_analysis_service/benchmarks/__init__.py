@@ -0,0 +1,20 @@
+# src/sentiment_analysis_service/benchmarks/__init__.py
+"""
+Throughput benchmarks for preprocessing, predict() and the /predict endpoint.
+
+Usage:
+    python -m sentiment_analysis_service.benchmarks [--quick] [--output FILE]
+        [--compare BASELINE] [--threshold 0.1]
+"""
+
+from .corpus import CORPORA, make_corpus
+from .suite import compare, load_results, run_suite, save_results
+
+__all__ = [
+    "CORPORA",
+    "make_corpus",
+    "run_suite",
+    "compare",
+    "save_results",
+    "load_results",
+]
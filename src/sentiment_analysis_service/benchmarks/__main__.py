@@ -0,0 +1,70 @@
+# src/sentiment_analysis_service/benchmarks/__main__.py
+import argparse
+import sys
+from pathlib import Path
+
+from ..predict import ENGINES
+from .suite import (
+    DEFAULT_THRESHOLD,
+    SUITES,
+    compare,
+    format_comparison,
+    format_results,
+    load_results,
+    run_suite,
+    save_results,
+)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Run throughput benchmarks and compare them to a baseline."
+    )
+    parser.add_argument(
+        "--suite",
+        action="append",
+        choices=SUITES,
+        help="Suite to run (repeatable). Defaults to all suites.",
+    )
+    parser.add_argument(
+        "--engine",
+        action="append",
+        choices=ENGINES,
+        help="predict() engine to benchmark (repeatable). Defaults to sklearn.",
+    )
+    parser.add_argument("--quick", action="store_true", help="Small workloads.")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="Write results JSON here.")
+    parser.add_argument("--compare", type=Path, help="Baseline results JSON.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Relative items/sec drop that counts as a regression.",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_suite(
+        suites=args.suite or SUITES,
+        quick=args.quick,
+        repeats=args.repeats,
+        engines=args.engine or ("sklearn",),
+    )
+    print(format_results(results))
+    if args.output:
+        save_results(results, args.output)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        rows = compare(results, load_results(args.compare), args.threshold)
+        print(f"\nComparison against {args.compare}:")
+        print(format_comparison(rows))
+        regressions = [row for row in rows if row["status"] == "regression"]
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
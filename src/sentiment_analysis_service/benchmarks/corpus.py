@@ -0,0 +1,154 @@
+# src/sentiment_analysis_service/benchmarks/corpus.py
+"""
+Deterministic synthetic corpora for benchmarks.
+
+Every generator takes the number of texts and a seed and always returns the
+same texts for the same arguments, so results are comparable across runs.
+"""
+
+import random
+from typing import Callable, Dict, List, Tuple
+
+_POSITIVE = ["love", "great", "excellent", "amazing", "happy", "best", "fantastic"]
+_NEGATIVE = ["hate", "terrible", "awful", "worst", "bad", "broken", "disappointed"]
+_NEUTRAL = [
+    "product",
+    "delivery",
+    "service",
+    "the",
+    "it",
+    "was",
+    "order",
+    "box",
+    "price",
+    "quality",
+    "time",
+    "and",
+    "this",
+    "my",
+    "with",
+    "okay",
+]
+_WORDS = _POSITIVE + _NEGATIVE + _NEUTRAL
+_HASHTAGS = ["#fail", "#win", "#mondays", "#tech", "#cx"]
+_EMOJI = ["😀", "😡", "👍", "🔥", "💔", "🙃"]
+_UNICODE_WORDS = [
+    "café",
+    "naïve",
+    "über",
+    "façade",
+    "straße",
+    "日本語",
+    "привет",
+    "ñandú",
+]
+_PUNCTUATION = ["!!!", "?!", "...", ",", ";", "--", "(!)", "***", '"', "'"]
+
+
+def _sentence(rng: random.Random, n_words: int) -> str:
+    return " ".join(rng.choices(_WORDS, k=n_words))
+
+
+def short_tweets(n: int, seed: int = 0) -> List[str]:
+    """Tweet-sized texts: 3-20 words with mentions, hashtags and emoji."""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        parts = [_sentence(rng, rng.randint(3, 20))]
+        if rng.random() < 0.5:
+            parts.insert(0, f"@user{rng.randint(1, 9999)}")
+        if rng.random() < 0.4:
+            parts.append(rng.choice(_HASHTAGS))
+        if rng.random() < 0.3:
+            parts.append(rng.choice(_EMOJI))
+        texts.append(" ".join(parts))
+    return texts
+
+
+def long_reviews(n: int, seed: int = 0) -> List[str]:
+    """Multi-paragraph reviews of roughly 150-1500 words."""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        sentences = [
+            _sentence(rng, rng.randint(8, 30)).capitalize() + "."
+            for _ in range(rng.randint(10, 60))
+        ]
+        paragraphs = [
+            " ".join(sentences[i : i + 5]) for i in range(0, len(sentences), 5)
+        ]
+        texts.append("\n\n".join(paragraphs))
+    return texts
+
+
+def long_text(n_chars: int, seed: int = 0) -> str:
+    """A single review-like text of exactly `n_chars` characters (pastes, logs)."""
+    rng = random.Random(seed)
+    parts: List[str] = []
+    length = 0
+    while length < n_chars:
+        sentence = _sentence(rng, rng.randint(8, 30)).capitalize() + ". "
+        parts.append(sentence)
+        length += len(sentence)
+    return "".join(parts)[:n_chars]
+
+
+def labeled_texts(n: int, seed: int = 0) -> Tuple[List[str], List[str]]:
+    """
+    Review-like texts with sentiment labels, for training benchmarks.
+
+    Positive and negative texts mix filler words with a few words of their
+    polarity; neutral texts contain filler words only.
+
+    Returns:
+        Tuple[List[str], List[str]]: The texts and their labels.
+    """
+    rng = random.Random(seed)
+    polar = {"positive": _POSITIVE, "negative": _NEGATIVE, "neutral": []}
+    texts, labels = [], []
+    for _ in range(n):
+        label = rng.choice(("positive", "negative", "neutral"))
+        words = rng.choices(_NEUTRAL, k=rng.randint(4, 30))
+        if polar[label]:
+            for word in rng.choices(polar[label], k=rng.randint(1, 3)):
+                words.insert(rng.randint(0, len(words)), word)
+        texts.append(" ".join(words).capitalize() + rng.choice([".", "!", ""]))
+        labels.append(label)
+    return texts, labels
+
+
+def unicode_texts(n: int, seed: int = 0) -> List[str]:
+    """Texts mixing accented, non-Latin and emoji characters with ASCII words."""
+    rng = random.Random(seed)
+    vocabulary = _WORDS + _UNICODE_WORDS * 2 + _EMOJI
+    return [" ".join(rng.choices(vocabulary, k=rng.randint(5, 40))) for _ in range(n)]
+
+
+def punctuation_heavy(n: int, seed: int = 0) -> List[str]:
+    """Texts where most words carry punctuation and whitespace is irregular."""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        words = []
+        for word in rng.choices(_WORDS, k=rng.randint(5, 30)):
+            if rng.random() < 0.7:
+                word += rng.choice(_PUNCTUATION)
+            words.append(word)
+            words.append(rng.choice([" ", "  ", "\t", " \n "]))
+        texts.append("".join(words))
+    return texts
+
+
+CORPORA: Dict[str, Callable[[int, int], List[str]]] = {
+    "short_tweets": short_tweets,
+    "long_reviews": long_reviews,
+    "unicode": unicode_texts,
+    "punctuation_heavy": punctuation_heavy,
+}
+
+
+def make_corpus(kind: str, n: int, seed: int = 0) -> List[str]:
+    """Returns `n` texts of the given corpus kind."""
+    if kind not in CORPORA:
+        raise ValueError(f"Unknown corpus '{kind}'. Expected one of {tuple(CORPORA)}.")
+    return CORPORA[kind](n, seed)
@@ -0,0 +1,444 @@
+# src/sentiment_analysis_service/benchmarks/loadgen.py
+"""
+Closed-loop load generator for a locally started uvicorn server.
+
+Usage:
+    python -m sentiment_analysis_service.benchmarks.loadgen
+        [--concurrency 1,2,4,8,16,32,64] [--batch-sizes 1,10,100]
+        [--duration 10] [--warmup 2] [--workers 1] [--output report.json]
+        [--url http://127.0.0.1:8000]
+
+Each concurrency level runs that many virtual clients. A client sends a
+request, waits for the response and immediately sends the next one (closed
+loop), so offered load follows the server's capacity. For every level the
+report has latency percentiles, throughput, errors and the server-side
+stage timings scraped from /metrics. It also marks the knee: the level after
+which more concurrency stops buying throughput and only adds latency.
+
+Requests cycle through more distinct texts than the prediction cache holds,
+so the model is measured rather than cache hits.
+
+Without --url a uvicorn server is started on a free local port and stopped
+at the end. Nothing leaves the machine.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .corpus import make_corpus
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 95, 99, 99.9)
+# A level is past the knee when it adds less than this relative throughput
+DEFAULT_KNEE_GAIN = 0.10
+# Distinct texts cycled through per batch size; more than the prediction
+# cache holds, so the LRU never serves a repeat
+DEFAULT_TEXT_POOL = 2 * 10000
+_SRC_DIR = Path(__file__).resolve().parents[2]
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of already sorted values (None if empty)."""
+    if not sorted_values:
+        return None
+    # Rounded first so float noise (99.9 / 100 * 1000 = 999.0000001) is ignored
+    rank = max(1, math.ceil(round(q * len(sorted_values) / 100, 9)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def parse_stage_metrics(text: str) -> Dict[str, Dict[str, float]]:
+    """
+    Extracts per-stage count and sum from a /metrics scrape.
+
+    Returns:
+        Dict[str, Dict[str, float]]: {stage: {"count": n, "sum": seconds}}.
+    """
+    stages: Dict[str, Dict[str, float]] = {}
+    prefix = "sentiment_stage_duration_seconds_"
+    for line in text.splitlines():
+        if not line.startswith(prefix):
+            continue
+        series, _, value = line.rpartition(" ")
+        kind = series[len(prefix) :].split("{", 1)[0]
+        if kind not in ("count", "sum") or 'stage="' not in series:
+            continue
+        stage = series.split('stage="', 1)[1].split('"', 1)[0]
+        stages.setdefault(stage, {"count": 0.0, "sum": 0.0})[kind] = float(value)
+    return stages
+
+
+def stage_means(
+    before: Dict[str, Dict[str, float]], after: Dict[str, Dict[str, float]]
+) -> Dict[str, Optional[float]]:
+    """Mean seconds per observation of each stage between two scrapes."""
+    means: Dict[str, Optional[float]] = {}
+    for stage, totals in after.items():
+        previous = before.get(stage, {"count": 0.0, "sum": 0.0})
+        count = totals["count"] - previous["count"]
+        means[stage] = (totals["sum"] - previous["sum"]) / count if count else None
+    return means
+
+
+def find_knee(
+    levels: List[Dict[str, Any]], min_gain: float = DEFAULT_KNEE_GAIN
+) -> Optional[int]:
+    """
+    Returns the concurrency at the knee of the throughput curve.
+
+    Levels are walked in order of concurrency. The knee is the last level
+    whose throughput grew by at least `min_gain` (relative) over the level
+    before it; beyond it, extra clients mostly queue. Returns None if there
+    are no levels.
+    """
+    levels = sorted(levels, key=lambda level: level["concurrency"])
+    if not levels:
+        return None
+    knee = levels[0]["concurrency"]
+    for previous, level in zip(levels, levels[1:]):
+        base = previous["items_per_sec"]
+        if base <= 0 or (level["items_per_sec"] - base) / base < min_gain:
+            break
+        knee = level["concurrency"]
+    return knee
+
+
+async def run_level(
+    client: Any,
+    bodies: Sequence[bytes],
+    concurrency: int,
+    duration: float,
+    warmup: float = 0.0,
+    path: str = "/predict",
+) -> Dict[str, Any]:
+    """
+    Drives `concurrency` closed-loop clients for `warmup + duration` seconds.
+
+    Only requests started after the warm-up are recorded.
+
+    Args:
+        client: An httpx.AsyncClient (a real server or an ASGI transport).
+        bodies (Sequence[bytes]): Encoded JSON request bodies, sent in turn.
+        concurrency (int): Number of concurrent clients.
+        duration (float): Measured seconds.
+        warmup (float): Unrecorded seconds before measuring.
+        path (str): Endpoint to post to.
+
+    Returns:
+        Dict[str, Any]: Request count, errors, throughput and latency percentiles.
+    """
+    latencies: List[float] = []
+    errors: Counter = Counter()
+    start = time.perf_counter()
+    measure_from = start + warmup
+    deadline = measure_from + duration
+    headers = {"Content-Type": "application/json"}
+    next_body = itertools.cycle(bodies).__next__
+
+    async def virtual_client():
+        while True:
+            body = next_body()
+            sent = time.perf_counter()
+            if sent >= deadline:
+                return
+            try:
+                response = await client.post(path, content=body, headers=headers)
+                error = None if response.status_code < 400 else response.status_code
+            except Exception as e:  # Timeouts, connection resets...
+                error = type(e).__name__
+            done = time.perf_counter()
+            if sent < measure_from:
+                continue
+            if error is None:
+                latencies.append(done - sent)
+            else:
+                errors[str(error)] += 1
+
+    await asyncio.gather(*(virtual_client() for _ in range(concurrency)))
+    elapsed = max(time.perf_counter() - measure_from, 1e-9)
+    latencies.sort()
+    completed = len(latencies)
+    n_errors = sum(errors.values())
+    return {
+        "concurrency": concurrency,
+        "requests": completed + n_errors,
+        "errors": n_errors,
+        "error_rate": (
+            n_errors / (completed + n_errors) if completed + n_errors else 0.0
+        ),
+        "error_kinds": dict(errors),
+        "seconds": elapsed,
+        "requests_per_sec": completed / elapsed,
+        "latency_ms": {
+            f"p{q:g}": (percentile(latencies, q) * 1000 if latencies else None)
+            for q in PERCENTILES
+        },
+        "latency_mean_ms": (sum(latencies) / completed * 1000 if completed else None),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class LocalServer:
+    """Runs `uvicorn sentiment_analysis_service.main:app` in a subprocess."""
+
+    def __init__(
+        self,
+        port: Optional[int] = None,
+        workers: int = 1,
+        env: Optional[Dict[str, str]] = None,
+    ):
+        self.port = port or _free_port()
+        self.workers = workers
+        self.env = env or {}
+        self.process: Optional[subprocess.Popen] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout: float = 60.0) -> None:
+        import httpx
+
+        env = {**os.environ, **self.env}
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [str(_SRC_DIR), env.get("PYTHONPATH")])
+        )
+        self.process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "sentiment_analysis_service.main:app",
+                "--host",
+                "127.0.0.1",
+                "--port",
+                str(self.port),
+                "--workers",
+                str(self.workers),
+                "--no-access-log",
+                "--log-level",
+                "warning",
+            ],
+            env=env,
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(
+                    f"uvicorn exited with code {self.process.returncode}."
+                )
+            try:
+                health = httpx.get(f"{self.url}/health", timeout=1.0)
+                if health.status_code == 200 and health.json().get("model_loaded"):
+                    logger.info(f"Server ready at {self.url}")
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        self.stop()
+        raise TimeoutError(f"Server did not become healthy within {timeout}s.")
+
+    def stop(self) -> None:
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+
+    def __enter__(self) -> "LocalServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+async def _scrape(client: Any) -> Dict[str, Any]:
+    """Reads /stats and the stage histograms from /metrics (best effort)."""
+    scrape: Dict[str, Any] = {"stats": None, "stages": {}}
+    try:
+        response = await client.get("/stats")
+        if response.status_code == 200:
+            scrape["stats"] = response.json()
+        response = await client.get("/metrics")
+        if response.status_code == 200:
+            scrape["stages"] = parse_stage_metrics(response.text)
+    except Exception as e:
+        logger.warning(f"Could not scrape server stats: {e}")
+    return scrape
+
+
+async def sweep(
+    client: Any,
+    concurrency_levels: Sequence[int],
+    batch_sizes: Sequence[int],
+    duration: float,
+    warmup: float,
+    knee_gain: float = DEFAULT_KNEE_GAIN,
+    text_pool: int = DEFAULT_TEXT_POOL,
+) -> Dict[str, Any]:
+    """
+    Runs every (batch size, concurrency) combination against `client`.
+
+    Returns:
+        Dict[str, Any]: Per batch size, the measured levels and the knee.
+    """
+    texts = make_corpus("short_tweets", max(text_pool, *batch_sizes))
+    runs = []
+    for batch_size in batch_sizes:
+        bodies = [
+            json.dumps(
+                {"inputs": [{"text": t} for t in texts[i : i + batch_size]]}
+            ).encode("utf-8")
+            for i in range(0, len(texts) - batch_size + 1, batch_size)
+        ]
+        levels = []
+        for concurrency in concurrency_levels:
+            before = await _scrape(client)
+            level = await run_level(client, bodies, concurrency, duration, warmup)
+            after = await _scrape(client)
+            level["batch_size"] = batch_size
+            level["items_per_sec"] = level["requests_per_sec"] * batch_size
+            level["server_stage_mean_ms"] = {
+                stage: mean * 1000 if mean is not None else None
+                for stage, mean in stage_means(
+                    before["stages"], after["stages"]
+                ).items()
+            }
+            level["server_stats"] = after["stats"]
+            levels.append(level)
+            logger.info(
+                f"batch={batch_size} concurrency={concurrency}: "
+                f"{level['requests_per_sec']:.0f} req/s, "
+                f"p99={level['latency_ms']['p99']} ms, errors={level['errors']}"
+            )
+        runs.append(
+            {
+                "batch_size": batch_size,
+                "knee_concurrency": find_knee(levels, knee_gain),
+                "levels": levels,
+            }
+        )
+    return {"runs": runs}
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Renders a sweep report as text tables, one per batch size."""
+    lines = []
+    for run in report["runs"]:
+        lines.append(f"\nbatch size {run['batch_size']}")
+        lines.append(
+            f"{'conc':>5} {'req/s':>9} {'items/s':>10} {'p50':>8} {'p95':>8} "
+            f"{'p99':>8} {'p99.9':>8} {'err%':>6}"
+        )
+        for level in run["levels"]:
+            latency = level["latency_ms"]
+            cells = [
+                f"{latency[key]:8.1f}" if latency[key] is not None else f"{'-':>8}"
+                for key in ("p50", "p95", "p99", "p99.9")
+            ]
+            marker = (
+                "  <- knee" if level["concurrency"] == run["knee_concurrency"] else ""
+            )
+            lines.append(
+                f"{level['concurrency']:>5} {level['requests_per_sec']:>9.1f} "
+                f"{level['items_per_sec']:>10.0f} {' '.join(cells)} "
+                f"{level['error_rate'] * 100:>6.2f}{marker}"
+            )
+    return "\n".join(lines)
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+async def _run(args) -> Dict[str, Any]:
+    import httpx
+
+    limits = httpx.Limits(max_connections=max(args.concurrency) + 2)
+    async with httpx.AsyncClient(
+        base_url=args.url, limits=limits, timeout=args.timeout
+    ) as client:
+        return await sweep(
+            client,
+            args.concurrency,
+            args.batch_sizes,
+            args.duration,
+            args.warmup,
+            args.knee_gain,
+            args.text_pool,
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="Existing server; default starts one locally.")
+    parser.add_argument("--concurrency", type=_int_list, default="1,2,4,8,16,32,64")
+    parser.add_argument("--batch-sizes", type=_int_list, default="1,10,100")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers.")
+    parser.add_argument("--knee-gain", type=float, default=DEFAULT_KNEE_GAIN)
+    parser.add_argument(
+        "--text-pool",
+        type=int,
+        default=DEFAULT_TEXT_POOL,
+        help="Distinct texts cycled through (keep above the server cache size).",
+    )
+    parser.add_argument("--output", type=Path, help="Write the JSON report here.")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url is None:
+        server = LocalServer(workers=args.workers)
+        server.start()
+        args.url = server.url
+    try:
+        report = asyncio.run(_run(args))
+    finally:
+        if server is not None:
+            server.stop()
+
+    report["config"] = {
+        "url": args.url,
+        "started_server": server is not None,
+        "uvicorn_workers": args.workers if server is not None else None,
+        "duration_s": args.duration,
+        "warmup_s": args.warmup,
+        "knee_gain": args.knee_gain,
+        "text_pool": args.text_pool,
+        "cpu_count": os.cpu_count(),
+    }
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # One line per request
+    sys.exit(main())
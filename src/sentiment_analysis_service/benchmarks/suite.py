@@ -0,0 +1,565 @@
+# src/sentiment_analysis_service/benchmarks/suite.py
+import asyncio
+import dataclasses
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from .corpus import long_text, make_corpus
+
+logger = logging.getLogger(__name__)
+
+RESULTS_SCHEMA = 1
+SUITES = ("preprocess", "predict", "response", "long_text", "sharding", "endpoint")
+
+# Texts per preprocessing run, per corpus (long reviews are ~100x larger)
+PREPROCESS_SIZES = {
+    "short_tweets": 10000,
+    "long_reviews": 200,
+    "unicode": 10000,
+    "punctuation_heavy": 10000,
+}
+PREDICT_BATCH_SIZES = (1, 10, 100, 1000, 10000, 100000)
+QUICK_PREDICT_BATCH_SIZES = (1, 10, 100, 1000)
+# Batch size used when predict() runs on the non-tweet corpora
+PREDICT_CORPUS_BATCH_SIZES = {
+    "long_reviews": 100,
+    "unicode": 1000,
+    "punctuation_heavy": 1000,
+}
+ENDPOINT_BATCH_SIZES = (1, 10, 100, 1000)
+QUICK_ENDPOINT_BATCH_SIZES = (1, 10, 100)
+RESPONSE_BATCH_SIZES = (1, 100, 10000)
+# Characters per text, and texts per predict() call, for the long-text suite
+LONG_TEXT_CHARS = (1000, 10000, 100000, 1000000)
+QUICK_LONG_TEXT_CHARS = (1000, 10000, 100000)
+LONG_TEXT_BATCH_SIZE = 4
+# One huge predict() call, scored unsharded and on 2, 4, ... shard workers
+SHARDING_BATCH_SIZE = 100000
+QUICK_SHARDING_BATCH_SIZE = 20000
+# /predict response paths compared by the endpoint benchmark
+ENDPOINT_FORMATS = ("standard", "fast", "columnar")
+QUICK_DIVISOR = 10
+
+# Relative drop in items/sec reported as a regression by compare()
+DEFAULT_THRESHOLD = 0.10
+
+
+def _summarize(
+    name: str, params: Dict[str, Any], items: int, timings: List[float]
+) -> Dict[str, Any]:
+    median = statistics.median(timings)
+    return {
+        "name": name,
+        **params,
+        "items": items,
+        "calls": len(timings),
+        "median_s": median,
+        "min_s": min(timings),
+        "items_per_sec": items / median if median > 0 else float("inf"),
+    }
+
+
+def measure(
+    func: Callable[[], Any],
+    repeats: int = 5,
+    min_time: float = 0.2,
+    setup: Optional[Callable[[], Any]] = None,
+) -> List[float]:
+    """
+    Times `func` on the monotonic clock, excluding `setup`.
+
+    Runs at least `repeats` calls and keeps calling until `min_time` seconds
+    have been measured, so very fast calls still get a stable median.
+
+    Returns:
+        List[float]: Seconds per call.
+    """
+    func()  # Warm-up: first-call costs (caches, lazy imports) are not measured
+    timings: List[float] = []
+    while len(timings) < repeats or sum(timings) < min_time:
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def measure_async(
+    func: Callable[[], Awaitable[Any]],
+    repeats: int = 5,
+    min_time: float = 0.2,
+    setup: Optional[Callable[[], Any]] = None,
+) -> List[float]:
+    """Same as measure(), for coroutine functions."""
+    await func()
+    timings: List[float] = []
+    while len(timings) < repeats or sum(timings) < min_time:
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        await func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_preprocess(quick: bool = False, repeats: int = 5) -> List[Dict[str, Any]]:
+    """Benchmarks preprocess_text (per item) and preprocess_batch on every corpus."""
+    from ..preprocessing import preprocess_batch, preprocess_text
+
+    results = []
+    for corpus, size in PREPROCESS_SIZES.items():
+        n = max(1, size // QUICK_DIVISOR) if quick else size
+        texts = make_corpus(corpus, n)
+        params = {"corpus": corpus, "batch_size": n}
+        timings = measure(lambda: [preprocess_text(t) for t in texts], repeats)
+        results.append(_summarize("preprocess_text", params, n, timings))
+        timings = measure(lambda: preprocess_batch(texts), repeats)
+        results.append(_summarize("preprocess_batch", params, n, timings))
+    return results
+
+
+def bench_predict(
+    quick: bool = False, repeats: int = 5, engines: Iterable[str] = ("sklearn",)
+) -> List[Dict[str, Any]]:
+    """
+    Benchmarks predict() across batch sizes and corpora, per engine.
+
+    Tweet workloads are also run with probabilities=True
+    ("predict_probabilities") to show the cost of confidence scores over
+    labels alone.
+
+    The prediction cache is cleared before every call so the model itself is
+    measured, not cache hits from the previous repeat.
+    """
+    from .. import predict as predict_module
+
+    predict_module.load_model()
+    previous_engine = predict_module.get_engine()
+    batch_sizes = QUICK_PREDICT_BATCH_SIZES if quick else PREDICT_BATCH_SIZES
+    workloads = [("short_tweets", size) for size in batch_sizes]
+    for corpus, size in PREDICT_CORPUS_BATCH_SIZES.items():
+        workloads.append((corpus, max(1, size // QUICK_DIVISOR) if quick else size))
+    corpora = {
+        corpus: make_corpus(corpus, max(size for c, size in workloads if c == corpus))
+        for corpus in {c for c, _ in workloads}
+    }
+
+    results = []
+    try:
+        for engine in engines:
+            predict_module.set_engine(engine)
+            for corpus, size in workloads:
+                texts = corpora[corpus][:size]
+                timings = measure(
+                    lambda: predict_module.predict(texts),
+                    repeats,
+                    setup=predict_module.clear_prediction_cache,
+                )
+                params = {"corpus": corpus, "batch_size": size, "engine": engine}
+                results.append(_summarize("predict", params, size, timings))
+                if corpus != "short_tweets":
+                    continue
+                # Same workload with confidence and probabilities per item
+                timings = measure(
+                    lambda: predict_module.predict(texts, probabilities=True),
+                    repeats,
+                    setup=predict_module.clear_prediction_cache,
+                )
+                results.append(
+                    _summarize("predict_probabilities", params, size, timings)
+                )
+    finally:
+        predict_module.set_engine(previous_engine)
+    return results
+
+
+def bench_response(quick: bool = False, repeats: int = 5) -> List[Dict[str, Any]]:
+    """
+    Benchmarks building and serializing a /predict response from predict() output.
+
+    "standard" mirrors the response_model path: one PredictionResult per
+    item, the PredictResponse wrapper, FastAPI's re-validation and JSON
+    rendering. "fast" and "columnar" are the serialization.py paths.
+    """
+    import numpy as np
+    from fastapi.responses import JSONResponse
+
+    from ..schemas import PredictionResult, PredictResponse
+    from ..serialization import FastJSONResponse, columnar_payload, standard_payload
+
+    def standard(dicts):
+        response = PredictResponse(predictions=[PredictionResult(**p) for p in dicts])
+        validated = PredictResponse.model_validate(response.model_dump())
+        return JSONResponse(validated.model_dump(mode="json")).body
+
+    paths = {
+        "standard": standard,
+        "fast": lambda dicts: FastJSONResponse(standard_payload(dicts)).body,
+        "columnar": lambda dicts: FastJSONResponse(columnar_payload(dicts)).body,
+    }
+    texts = make_corpus("short_tweets", max(RESPONSE_BATCH_SIZES))
+    labels = np.array(["negative", "neutral", "positive"])
+    results = []
+    for size in RESPONSE_BATCH_SIZES[:-1] if quick else RESPONSE_BATCH_SIZES:
+        # predict() returns numpy string labels
+        dicts = [
+            {"input_text": text, "sentiment": labels[i % 3]}
+            for i, text in enumerate(texts[:size])
+        ]
+        for response_format, build in paths.items():
+            timings = measure(lambda: build(dicts), repeats)
+            params = {"batch_size": size, "format": response_format}
+            results.append(_summarize("response", params, size, timings))
+    return results
+
+
+def bench_long_text(quick: bool = False, repeats: int = 5) -> List[Dict[str, Any]]:
+    """
+    Benchmarks predict() as texts grow, under each long-text policy.
+
+    With "truncate" and "chunk" the time per call should stay flat once
+    texts exceed LONG_TEXT_MAX_CHARS; with "none" it grows with the length.
+    """
+    from .. import predict as predict_module
+    from ..long_text import LONG_TEXT_POLICIES
+
+    predict_module.load_model()
+    previous_policy = predict_module.get_long_text_policy()
+    sizes = QUICK_LONG_TEXT_CHARS if quick else LONG_TEXT_CHARS
+    results = []
+    try:
+        for mode in LONG_TEXT_POLICIES:
+            predict_module.set_long_text_policy(
+                dataclasses.replace(previous_policy, mode=mode)
+            )
+            for n_chars in sizes:
+                texts = [
+                    long_text(n_chars, seed) for seed in range(LONG_TEXT_BATCH_SIZE)
+                ]
+                timings = measure(
+                    lambda: predict_module.predict(texts),
+                    repeats,
+                    setup=predict_module.clear_prediction_cache,
+                )
+                params = {
+                    "corpus": "long_text",
+                    "batch_size": len(texts),
+                    "text_chars": n_chars,
+                    "policy": mode,
+                }
+                results.append(_summarize("long_text", params, len(texts), timings))
+    finally:
+        predict_module.set_long_text_policy(previous_policy)
+    return results
+
+
+def _shard_worker_counts() -> List[int]:
+    counts = [1]
+    while counts[-1] * 2 <= (os.cpu_count() or 1):
+        counts.append(counts[-1] * 2)
+    return counts
+
+
+def bench_sharding(quick: bool = False, repeats: int = 3) -> List[Dict[str, Any]]:
+    """
+    Benchmarks one huge predict() call against the number of shard workers.
+
+    workers=1 is the unsharded path. On a machine with N free cores the
+    median should drop close to 1/N of it; the pool is started (and the
+    model loaded in every worker) before timing.
+    """
+    from .. import predict as predict_module
+
+    predict_module.load_model()
+    size = QUICK_SHARDING_BATCH_SIZE if quick else SHARDING_BATCH_SIZE
+    texts = make_corpus("short_tweets", size)
+    results = []
+    try:
+        for workers in _shard_worker_counts():
+            if workers == 1:
+                predict_module.set_sharding(False)
+            else:
+                predict_module.set_sharding(True, workers=workers, threshold=1)
+                predict_module.start_shard_pool()
+            timings = measure(
+                lambda: predict_module.predict(texts),
+                repeats,
+                setup=predict_module.clear_prediction_cache,
+            )
+            params = {"corpus": "short_tweets", "batch_size": size, "workers": workers}
+            results.append(_summarize("predict_sharded", params, size, timings))
+    finally:
+        # Back to the configured (not yet started) pool
+        predict_module.set_sharding(False)
+        predict_module.set_sharding(True)
+    return results
+
+
+async def _bench_endpoint(
+    batch_sizes: Iterable[int], repeats: int
+) -> List[Dict[str, Any]]:
+    import httpx
+
+    from ..main import app
+    from ..predict import clear_prediction_cache
+
+    texts = make_corpus("short_tweets", max(batch_sizes))
+    results = []
+    # Runs the app's startup/shutdown events around the requests
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://benchmark"
+        ) as client:
+            for response_format in ENDPOINT_FORMATS:
+                for size in batch_sizes:
+                    # Encoded once, so client-side JSON encoding is not measured
+                    body = json.dumps({"inputs": [{"text": t} for t in texts[:size]]})
+
+                    async def call():
+                        response = await client.post(
+                            f"/predict?format={response_format}",
+                            content=body,
+                            headers={"Content-Type": "application/json"},
+                        )
+                        response.raise_for_status()
+
+                    timings = await measure_async(
+                        call, repeats, setup=clear_prediction_cache
+                    )
+                    params = {
+                        "corpus": "short_tweets",
+                        "batch_size": size,
+                        "format": response_format,
+                    }
+                    results.append(
+                        _summarize("endpoint_predict", params, size, timings)
+                    )
+    return results
+
+
+def bench_endpoint(quick: bool = False, repeats: int = 5) -> List[Dict[str, Any]]:
+    """Benchmarks POST /predict in-process through the ASGI app (no network)."""
+    batch_sizes = QUICK_ENDPOINT_BATCH_SIZES if quick else ENDPOINT_BATCH_SIZES
+    return asyncio.run(_bench_endpoint(batch_sizes, repeats))
+
+
+def environment() -> Dict[str, Any]:
+    """Describes the machine and code the results were measured on."""
+    import numpy
+    import sklearn
+
+    from .. import __version__
+    from ..config import PREPROCESS_EMIT_TOKENS
+    from ..predict import get_model_version
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "sklearn": sklearn.__version__,
+        "package_version": __version__,
+        "git_commit": commit or None,
+        "model_version": get_model_version(),
+        "preprocess_emit_tokens": PREPROCESS_EMIT_TOKENS,
+    }
+
+
+def run_suite(
+    suites: Iterable[str] = SUITES,
+    quick: bool = False,
+    repeats: int = 5,
+    engines: Iterable[str] = ("sklearn",),
+) -> Dict[str, Any]:
+    """
+    Runs the selected benchmark suites.
+
+    Args:
+        suites (Iterable[str]): Any of "preprocess", "predict", "response",
+                                "long_text", "sharding", "endpoint".
+        quick (bool): Smaller corpora and batch sizes (for CI smoke runs).
+        repeats (int): Minimum timed calls per benchmark.
+        engines (Iterable[str]): predict() engines to benchmark.
+
+    Returns:
+        Dict[str, Any]: JSON-serializable results with environment metadata.
+    """
+    suites = list(suites)
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        raise ValueError(f"Unknown suites {sorted(unknown)}. Expected {SUITES}.")
+    results: List[Dict[str, Any]] = []
+    for suite in suites:
+        logger.info(f"Running '{suite}' benchmarks...")
+        if suite == "preprocess":
+            results.extend(bench_preprocess(quick, repeats))
+        elif suite == "predict":
+            results.extend(bench_predict(quick, repeats, engines))
+        elif suite == "response":
+            results.extend(bench_response(quick, repeats))
+        elif suite == "long_text":
+            results.extend(bench_long_text(quick, repeats))
+        elif suite == "sharding":
+            results.extend(bench_sharding(quick, repeats))
+        else:
+            results.extend(bench_endpoint(quick, repeats))
+    return {
+        "schema": RESULTS_SCHEMA,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "quick": quick,
+        "environment": environment(),
+        "results": results,
+    }
+
+
+# Fields identifying a benchmark across runs (absent fields are None)
+KEY_FIELDS = (
+    "name",
+    "corpus",
+    "batch_size",
+    "engine",
+    "format",
+    "text_chars",
+    "policy",
+    "workers",
+)
+
+
+def _result_key(result: Dict[str, Any]) -> tuple:
+    return tuple(result.get(field) for field in KEY_FIELDS)
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """
+    Compares items/sec of two result documents benchmark by benchmark.
+
+    Args:
+        current (Dict[str, Any]): Results of this run (from run_suite()).
+        baseline (Dict[str, Any]): Saved results to compare against.
+        threshold (float): Relative slowdown reported as a regression.
+
+    Returns:
+        List[Dict[str, Any]]: One row per benchmark with the ratio
+            current/baseline and a status of "ok", "regression",
+            "improvement", "new" or "missing".
+    """
+    baseline_by_key = {_result_key(r): r for r in baseline.get("results", [])}
+    rows = []
+    seen = set()
+    for result in current.get("results", []):
+        key = _result_key(result)
+        seen.add(key)
+        row = {
+            **dict(zip(KEY_FIELDS, key)),
+            "items_per_sec": result["items_per_sec"],
+            "baseline_items_per_sec": None,
+            "ratio": None,
+            "status": "new",
+        }
+        previous = baseline_by_key.get(key)
+        if previous is not None and previous["items_per_sec"] > 0:
+            ratio = result["items_per_sec"] / previous["items_per_sec"]
+            row["baseline_items_per_sec"] = previous["items_per_sec"]
+            row["ratio"] = ratio
+            if ratio < 1.0 - threshold:
+                row["status"] = "regression"
+            elif ratio > 1.0 + threshold:
+                row["status"] = "improvement"
+            else:
+                row["status"] = "ok"
+        rows.append(row)
+    for key, previous in baseline_by_key.items():
+        if key not in seen:
+            rows.append(
+                {
+                    **dict(zip(KEY_FIELDS, key)),
+                    "items_per_sec": None,
+                    "baseline_items_per_sec": previous["items_per_sec"],
+                    "ratio": None,
+                    "status": "missing",
+                }
+            )
+    return rows
+
+
+def save_results(results: Dict[str, Any], path: Path) -> None:
+    """Writes a result document as JSON."""
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    """Reads a result document written by save_results()."""
+    with open(path) as f:
+        results = json.load(f)
+    if results.get("schema") != RESULTS_SCHEMA:
+        raise ValueError(
+            f"{path} has results schema {results.get('schema')}, "
+            f"expected {RESULTS_SCHEMA}."
+        )
+    return results
+
+
+def _variant(row: Dict[str, Any]) -> str:
+    if row.get("workers"):
+        return f"{row['workers']}w"
+    return row.get("engine") or row.get("format") or row.get("policy") or ""
+
+
+def _corpus(row: Dict[str, Any]) -> str:
+    corpus = row.get("corpus") or ""
+    return f"{corpus}@{row['text_chars']}" if row.get("text_chars") else corpus
+
+
+def format_results(results: Dict[str, Any]) -> str:
+    """Renders results as a plain-text table."""
+    lines = [
+        f"{'benchmark':<21} {'corpus':<18} {'variant':<8} {'batch':>7} "
+        f"{'median':>11} {'items/sec':>12}"
+    ]
+    for r in results["results"]:
+        lines.append(
+            f"{r['name']:<21} {_corpus(r):<18} {_variant(r):<8} "
+            f"{r.get('batch_size') or '':>7} {r['median_s'] * 1000:>9.3f}ms "
+            f"{r['items_per_sec']:>12.0f}"
+        )
+    return "\n".join(lines)
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    """Renders compare() rows as a plain-text table."""
+    lines = [
+        f"{'benchmark':<21} {'corpus':<18} {'variant':<8} {'batch':>7} "
+        f"{'ratio':>7}  status"
+    ]
+    for row in rows:
+        ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "-"
+        lines.append(
+            f"{row['name']:<21} {_corpus(row):<18} {_variant(row):<8} "
+            f"{row['batch_size'] or '':>7} {ratio:>7}  {row['status']}"
+        )
+    return "\n".join(lines)
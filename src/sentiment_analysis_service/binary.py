@@ -0,0 +1,188 @@
+# src/sentiment_analysis_service/binary.py
+"""
+Binary framing for /predict/binary: msgpack maps or Arrow IPC streams.
+
+msgpack request:  {"texts": ["...", ...]}
+msgpack response: {"count": n, "labels": ["...", ...], "error": null}
+                  plus "long_text": {index: action} if the long-text policy
+                  changed any input, and with ?probabilities=true
+                  "confidence": [...] and "probabilities": {label: [...]}
+
+Arrow request:    an IPC stream whose batches have a string column "text"
+Arrow response:   an IPC stream with one batch and a string column "label";
+                  long-text actions go in the schema metadata as JSON. With
+                  ?probabilities=true there is a float column "confidence"
+                  and one float column "probability_<label>" per label.
+
+Both libraries are optional; a format whose library is missing is reported
+as unsupported.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
+MSGPACK_CONTENT_TYPES = ("application/msgpack", "application/x-msgpack")
+ARROW_CONTENT_TYPES = (
+    "application/vnd.apache.arrow.stream",
+    "application/x-arrow-stream",
+)
+TEXT_COLUMN = "text"
+LABEL_COLUMN = "label"
+CONFIDENCE_COLUMN = "confidence"
+PROBABILITY_COLUMN_PREFIX = "probability_"
+
+
+class UnsupportedFormatError(ValueError):
+    """Raised for content types this endpoint cannot decode (HTTP 415)."""
+
+
+class BinaryRequestError(ValueError):
+    """
+    Raised for bodies that decode but do not match the request schema.
+
+    `errors` uses the same shape as FastAPI's 422 validation details.
+    """
+
+    def __init__(self, errors: List[Dict[str, Any]]):
+        super().__init__(errors[0]["msg"] if errors else "Invalid request body.")
+        self.errors = errors
+
+
+def binary_format(content_type: str) -> str:
+    """Maps a Content-Type header to "msgpack" or "arrow"."""
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in MSGPACK_CONTENT_TYPES:
+        return "msgpack"
+    if media_type in ARROW_CONTENT_TYPES:
+        return "arrow"
+    raise UnsupportedFormatError(
+        f"Unsupported Content-Type '{media_type}'. Expected one of "
+        f"{MSGPACK_CONTENT_TYPES + ARROW_CONTENT_TYPES}."
+    )
+
+
+def _error(error_type: str, loc: Sequence[Any], msg: str) -> BinaryRequestError:
+    return BinaryRequestError([{"type": error_type, "loc": list(loc), "msg": msg}])
+
+
+def _validate_texts(texts: List[Any], field: str) -> List[str]:
+    """Same rules as TextInput.text: a string of at least one character."""
+    for i, text in enumerate(texts):
+        if not isinstance(text, str):
+            raise _error(
+                "string_type", ("body", field, i), "Input should be a valid string"
+            )
+        if not text:
+            raise _error(
+                "string_too_short",
+                ("body", field, i),
+                "String should have at least 1 character",
+            )
+    return texts
+
+
+def _decode_msgpack(body: bytes) -> List[str]:
+    try:
+        import msgpack
+    except ImportError:
+        raise UnsupportedFormatError("msgpack is not installed on this server.")
+    try:
+        payload = msgpack.unpackb(body, raw=False)
+    except Exception as e:
+        raise _error("msgpack_invalid", ("body",), f"Invalid msgpack body: {e}")
+    if not isinstance(payload, dict) or "texts" not in payload:
+        raise _error("missing", ("body", "texts"), "Field required")
+    texts = payload["texts"]
+    if not isinstance(texts, list):
+        raise _error("list_type", ("body", "texts"), "Input should be a valid list")
+    return _validate_texts(texts, "texts")
+
+
+def _decode_arrow(body: bytes) -> List[str]:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise UnsupportedFormatError("pyarrow is not installed on this server.")
+    try:
+        # The reader works on the body buffer in place, without copying it
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except Exception as e:
+        raise _error("arrow_invalid", ("body",), f"Invalid Arrow IPC stream: {e}")
+    if TEXT_COLUMN not in table.column_names:
+        raise _error("missing", ("body", TEXT_COLUMN), "Field required")
+    column = table.column(TEXT_COLUMN)
+    if not (pa.types.is_string(column.type) or pa.types.is_large_string(column.type)):
+        raise _error(
+            "string_type",
+            ("body", TEXT_COLUMN),
+            f"Column '{TEXT_COLUMN}' should be a string column, got {column.type}",
+        )
+    # predict() needs Python strings; this is the one conversion per item
+    return _validate_texts(column.to_pylist(), TEXT_COLUMN)
+
+
+def decode_request(body: bytes, fmt: str) -> List[str]:
+    """
+    Decodes a binary request body into a list of texts.
+
+    Raises:
+        UnsupportedFormatError: If the format's library is not installed.
+        BinaryRequestError: If the body is malformed or fails validation.
+    """
+    if fmt == "msgpack":
+        return _decode_msgpack(body)
+    return _decode_arrow(body)
+
+
+def encode_response(
+    labels: Sequence[Any],
+    fmt: str,
+    long_text: Optional[Dict[int, str]] = None,
+    probabilities: Optional[Any] = None,
+    classes: Optional[Sequence[Any]] = None,
+) -> bytes:
+    """
+    Encodes predicted labels in the given binary format.
+
+    `long_text` maps input indices to the long-text action taken on them;
+    it is only included when non-empty. `probabilities` is an optional
+    (n, n_classes) numpy array whose columns follow `classes`.
+    """
+    if fmt == "msgpack":
+        import msgpack
+
+        payload = {"count": len(labels), "labels": labels, "error": None}
+        if long_text:
+            payload["long_text"] = {str(i): a for i, a in long_text.items()}
+        if probabilities is not None:
+            payload["confidence"] = probabilities.max(axis=1).tolist()
+            payload["probabilities"] = {
+                str(name): probabilities[:, j].tolist()
+                for j, name in enumerate(classes)
+            }
+        # numpy string labels pack as str without conversion
+        return msgpack.packb(payload)
+    import pyarrow as pa
+
+    metadata = None
+    if long_text:
+        metadata = {"long_text": json.dumps({str(i): a for i, a in long_text.items()})}
+    columns = [pa.array(labels, type=pa.string())]
+    names = [LABEL_COLUMN]
+    if probabilities is not None:
+        # Columns are built from the numpy buffers without per-item conversion
+        columns.append(pa.array(probabilities.max(axis=1)))
+        names.append(CONFIDENCE_COLUMN)
+        for j, name in enumerate(classes):
+            columns.append(pa.array(probabilities[:, j]))
+            names.append(f"{PROBABILITY_COLUMN_PREFIX}{name}")
+    batch = pa.record_batch(columns, names=names, metadata=metadata)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def media_type(fmt: str) -> str:
+    """Response Content-Type for a binary format."""
+    return MSGPACK_CONTENT_TYPES[0] if fmt == "msgpack" else ARROW_CONTENT_TYPES[0]
@@ -0,0 +1,556 @@
+# src/sentiment_analysis_service/compiled.py
+import copy
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .vocabulary import (
+    CompactVocabulary,
+    SortedVocabulary,
+    NOT_FOUND,
+    build_vocabulary,
+)
+
+SUPPORTED_NORMS = ("l2", "l1", None)
+# Precisions prune_compiled() can store idf and weights in (scoring is float64)
+WEIGHT_DTYPES = ("float64", "float32", "float16")
+
+# On-disk artifact format written by save_compiled()
+ARTIFACT_FORMAT = "compiled-linear"
+ARTIFACT_FORMAT_VERSION = 1
+ARTIFACT_META_FILE = "meta.json"
+
+
+def decision_labels(classes: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    """Maps decision values to class labels like sklearn's linear models."""
+    if scores.ndim == 1:
+        indices = (scores > 0).astype(int)
+    else:
+        indices = scores.argmax(axis=1)
+    return classes[indices]
+
+
+def uses_softmax(classifier: Any) -> bool:
+    """
+    Returns True if a fitted linear classifier's predict_proba is a softmax.
+
+    Mirrors LogisticRegression: multinomial unless it is binary, fitted with
+    liblinear or explicitly one-vs-rest. SGDClassifier (from train.py) is
+    always one-vs-rest.
+    """
+    if hasattr(classifier, "loss") and not hasattr(classifier, "solver"):
+        return False
+    multi_class = getattr(classifier, "multi_class", "auto")
+    if multi_class == "multinomial":
+        return True
+    if multi_class not in ("auto", "deprecated"):
+        return False
+    return len(classifier.classes_) > 2 and getattr(classifier, "solver", "") != (
+        "liblinear"
+    )
+
+
+def scores_to_probabilities(scores: np.ndarray, multinomial: bool) -> np.ndarray:
+    """
+    Converts decision values to class probabilities without rescoring.
+
+    Produces what LogisticRegression.predict_proba returns for the same
+    decision values: a softmax for multinomial models, otherwise normalized
+    per-class sigmoids ([1 - p, p] for binary models).
+
+    Returns:
+        np.ndarray: Shape (n_texts, n_classes); rows sum to 1.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if scores.ndim == 1:
+        positive = 1.0 / (1.0 + np.exp(-scores))
+        return np.column_stack([1.0 - positive, positive])
+    if multinomial:
+        exp = np.exp(scores - scores.max(axis=1, keepdims=True))
+    else:
+        exp = 1.0 / (1.0 + np.exp(-scores))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class CompiledLinearModel:
+    """
+    Flat inference artifact for a TF-IDF + linear classifier pipeline.
+
+    Holds, for every vocabulary term, the classifier weight premultiplied by
+    the term's idf, plus the idf itself (needed for normalization), the
+    intercept and the class labels. Scoring tokenizes with the vectorizer's
+    own `token_pattern` and computes decision values directly with numpy,
+    skipping sklearn's CSR construction and input validation.
+    """
+
+    def __init__(
+        self,
+        vocabulary: Any,
+        idf: np.ndarray,
+        weights: np.ndarray,
+        intercept: np.ndarray,
+        classes: np.ndarray,
+        token_pattern: str,
+        lowercase: bool = True,
+        norm: Optional[str] = "l2",
+        sublinear_tf: bool = False,
+        binary: bool = False,
+        multinomial: Optional[bool] = None,
+    ):
+        if norm not in SUPPORTED_NORMS:
+            raise ValueError(f"Unsupported norm '{norm}'.")
+        self.vocabulary = vocabulary  # Any backend from vocabulary.py
+        self.idf = idf
+        self.weights = weights  # Shape (n_terms, n_scores), idf * coef
+        self.intercept = intercept  # Shape (n_scores,)
+        self.classes_ = classes
+        self.token_pattern = token_pattern
+        self.lowercase = lowercase
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+        self.binary = binary
+        # How probabilities() maps scores; defaults like LogisticRegression
+        self.multinomial = len(classes) > 2 if multinomial is None else multinomial
+        self._token_re = re.compile(token_pattern)
+
+    @property
+    def n_terms(self) -> int:
+        return len(self.idf)
+
+    def tokenize(self, text: str) -> List[str]:
+        """Splits a text into tokens exactly like the source vectorizer."""
+        if self.lowercase:
+            text = text.lower()
+        return self._token_re.findall(text)
+
+    def _term_counts(
+        self, token_lists: List[List[str]]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns (row, column, term frequency) triples for in-vocabulary tokens."""
+        tokens: List[str] = []
+        lengths: List[int] = []
+        for text_tokens in token_lists:
+            tokens.extend(text_tokens)
+            lengths.append(len(text_tokens))
+        cols = self.vocabulary.lookup(tokens)
+        rows = np.repeat(np.arange(len(token_lists), dtype=np.int64), lengths)
+        known = cols != NOT_FOUND
+        rows, cols = rows[known], cols[known]
+        if not len(rows):
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0, dtype=np.float64)
+        # Merge repeated (row, column) pairs into counts
+        keys = rows * self.n_terms + cols
+        unique_keys, counts = np.unique(keys, return_counts=True)
+        return (
+            unique_keys // self.n_terms,
+            unique_keys % self.n_terms,
+            counts.astype(np.float64),
+        )
+
+    def decision_function(self, texts: List[str]) -> np.ndarray:
+        """
+        Computes classifier decision values for a batch of texts.
+
+        Args:
+            texts (List[str]): Preprocessed text strings.
+
+        Returns:
+            np.ndarray: Shape (n_texts,) for binary models, otherwise
+                        (n_texts, n_classes), matching sklearn.
+        """
+        return self.decision_function_tokens([self.tokenize(t) for t in texts])
+
+    def decision_function_tokens(self, token_lists: List[List[str]]) -> np.ndarray:
+        """Same as decision_function(), for texts that are already tokenized."""
+        n = len(token_lists)
+        rows, cols, tf = self._term_counts(token_lists)
+        if self.binary:
+            tf = np.ones_like(tf)
+        elif self.sublinear_tf:
+            tf = np.log(tf) + 1.0
+
+        n_scores = self.weights.shape[1]
+        scores = np.zeros((n, n_scores), dtype=np.float64)
+        for c in range(n_scores):
+            scores[:, c] = np.bincount(
+                rows, weights=tf * self.weights[cols, c], minlength=n
+            )
+
+        if self.norm is not None:
+            values = tf * self.idf[cols]
+            if self.norm == "l2":
+                norms = np.sqrt(np.bincount(rows, weights=values**2, minlength=n))
+            else:
+                norms = np.bincount(rows, weights=np.abs(values), minlength=n)
+            norms[norms == 0.0] = 1.0  # Empty rows stay at the intercept
+            scores /= norms[:, None]
+
+        scores += self.intercept
+        return scores.ravel() if n_scores == 1 else scores
+
+    def _labels(self, scores: np.ndarray) -> np.ndarray:
+        """Maps decision values to class labels like sklearn's linear models."""
+        return decision_labels(self.classes_, scores)
+
+    def probabilities(self, scores: np.ndarray) -> np.ndarray:
+        """Maps decision values to class probabilities like predict_proba."""
+        return scores_to_probabilities(scores, self.multinomial)
+
+    def predict(self, texts: List[str]) -> np.ndarray:
+        """Predicts class labels for a batch of preprocessed texts."""
+        return self._labels(self.decision_function(texts))
+
+    def predict_tokens(self, token_lists: List[List[str]]) -> np.ndarray:
+        """Predicts class labels for texts that are already tokenized."""
+        return self._labels(self.decision_function_tokens(token_lists))
+
+
+def _check_vectorizer(vectorizer: Any) -> None:
+    """Raises ValueError if the vectorizer cannot be reproduced from tokens."""
+    unsupported = {
+        "analyzer": (getattr(vectorizer, "analyzer", None), "word"),
+        "ngram_range": (tuple(getattr(vectorizer, "ngram_range", ())), (1, 1)),
+        "tokenizer": (getattr(vectorizer, "tokenizer", None), None),
+        "preprocessor": (getattr(vectorizer, "preprocessor", None), None),
+        "strip_accents": (getattr(vectorizer, "strip_accents", None), None),
+    }
+    for name, (actual, expected) in unsupported.items():
+        if actual != expected:
+            raise ValueError(
+                f"Cannot compile vectorizer with {name}={actual!r} "
+                f"(only {expected!r} is supported)."
+            )
+    if re.compile(vectorizer.token_pattern).groups > 1:
+        raise ValueError("token_pattern must have at most one capturing group.")
+
+
+def _split_pipeline(pipeline: Any) -> Tuple[Any, Any]:
+    """Returns the (vectorizer, classifier) of a supported two-step pipeline."""
+    steps = getattr(pipeline, "steps", None)
+    if not steps or len(steps) != 2:
+        raise ValueError("Expected a two-step (vectorizer, classifier) pipeline.")
+    vectorizer = steps[0][1]
+    _check_vectorizer(vectorizer)
+    return vectorizer, steps[1][1]
+
+
+def _identity_analyzer(tokens: List[str]) -> List[str]:
+    return tokens
+
+
+def token_fed_pipeline(pipeline: Any) -> Any:
+    """
+    Returns a copy of the pipeline whose vectorizer accepts token lists.
+
+    The fitted vocabulary, idf and classifier are shared with the original;
+    only the analyzer is replaced so tokens from preprocessing.tokenize_batch()
+    are counted directly instead of being lowercased and tokenized again.
+    Stop words need no filtering: they are never in the fitted vocabulary.
+    """
+    vectorizer, _ = _split_pipeline(pipeline)
+    token_vectorizer = copy.copy(vectorizer)
+    token_vectorizer.analyzer = _identity_analyzer
+    token_pipeline = copy.copy(pipeline)
+    token_pipeline.steps = [(pipeline.steps[0][0], token_vectorizer), pipeline.steps[1]]
+    return token_pipeline
+
+
+def compile_pipeline(pipeline: Any, vocabulary: str = "dict") -> CompiledLinearModel:
+    """
+    Exports a fitted TF-IDF + linear classifier pipeline as a CompiledLinearModel.
+
+    Args:
+        pipeline: A fitted sklearn Pipeline of (TfidfVectorizer, linear model).
+        vocabulary (str): Vocabulary backend, "dict", "sorted" or "compact"
+                          (see vocabulary.py).
+
+    Returns:
+        CompiledLinearModel: The flat inference artifact.
+
+    Raises:
+        ValueError: If the pipeline uses features the compiled scorer does not
+                    reproduce (custom analyzers, n-grams, accent stripping...).
+    """
+    vectorizer, classifier = _split_pipeline(pipeline)
+    for attr in ("coef_", "intercept_", "classes_"):
+        if not hasattr(classifier, attr):
+            raise ValueError(
+                f"Classifier has no '{attr}'; is it a fitted linear model?"
+            )
+
+    n_terms = len(vectorizer.vocabulary_)
+    if getattr(vectorizer, "use_idf", True):
+        idf = np.asarray(vectorizer.idf_, dtype=np.float64)
+    else:
+        idf = np.ones(n_terms, dtype=np.float64)
+    coef = np.asarray(classifier.coef_, dtype=np.float64)  # (n_scores, n_terms)
+
+    return CompiledLinearModel(
+        vocabulary=build_vocabulary(
+            {term: int(j) for term, j in vectorizer.vocabulary_.items()}, vocabulary
+        ),
+        idf=idf,
+        weights=np.ascontiguousarray((coef * idf).T),
+        intercept=np.asarray(classifier.intercept_, dtype=np.float64).ravel(),
+        classes=np.asarray(classifier.classes_),
+        token_pattern=vectorizer.token_pattern,
+        lowercase=vectorizer.lowercase,
+        norm=vectorizer.norm,
+        sublinear_tf=vectorizer.sublinear_tf,
+        binary=vectorizer.binary,
+        multinomial=uses_softmax(classifier),
+    )
+
+
+def prune_compiled(
+    model: CompiledLinearModel, threshold: float = 0.0, dtype: str = "float64"
+) -> CompiledLinearModel:
+    """
+    Returns a smaller copy of a compiled model for reduced-size export.
+
+    Terms whose largest absolute weight (idf * coefficient) across classes
+    is at or below `threshold` are dropped from the vocabulary, and idf and
+    weights are cast to `dtype`. Dropped terms no longer count towards the
+    L2/L1 norm either, so predictions can change; check them against the
+    original (export.label_agreement) before serving the result.
+
+    Args:
+        model (CompiledLinearModel): The full-precision model.
+        threshold (float): Weight magnitude at or below which a term is dropped;
+                           0 drops only terms with all-zero weights.
+        dtype (str): One of WEIGHT_DTYPES.
+
+    Returns:
+        CompiledLinearModel: The pruned model (dict vocabulary).
+    """
+    if dtype not in WEIGHT_DTYPES:
+        raise ValueError(f"Unknown dtype '{dtype}'. Expected one of {WEIGHT_DTYPES}.")
+    keep = np.abs(np.asarray(model.weights)).max(axis=1) > threshold
+    if not keep.any():
+        raise ValueError(f"Threshold {threshold} would drop every term.")
+    new_columns = np.cumsum(keep) - 1
+    vocabulary = {
+        term: int(new_columns[column])
+        for term, column in model.vocabulary.items()
+        if keep[column]
+    }
+    return CompiledLinearModel(
+        vocabulary=build_vocabulary(vocabulary, "dict"),
+        idf=np.asarray(model.idf)[keep].astype(dtype),
+        weights=np.ascontiguousarray(np.asarray(model.weights)[keep].astype(dtype)),
+        intercept=np.asarray(model.intercept, dtype=np.float64),
+        classes=np.asarray(model.classes_),
+        token_pattern=model.token_pattern,
+        lowercase=model.lowercase,
+        norm=model.norm,
+        sublinear_tf=model.sublinear_tf,
+        binary=model.binary,
+        multinomial=model.multinomial,
+    )
+
+
+def save_compiled(
+    model: CompiledLinearModel,
+    path: Path,
+    version: Optional[str] = None,
+    vocabulary: str = "compact",
+) -> Path:
+    """
+    Writes a compiled model as a directory of .npy arrays plus meta.json.
+
+    The arrays (including the vocabulary) are stored uncompressed so
+    load_compiled() can memory-map them and worker processes share the pages.
+    The artifact is written to a sibling directory and swapped in as a whole:
+    files of a published artifact are never rewritten, so processes that
+    have it memory-mapped keep reading the old arrays.
+
+    Args:
+        model (CompiledLinearModel): The model to save.
+        path (Path): Target directory (created if missing).
+        version (Optional[str]): Model version recorded in the metadata.
+        vocabulary (str): On-disk vocabulary backend, "compact" or "sorted".
+
+    Returns:
+        Path: The artifact directory.
+    """
+    path = Path(path)
+    if vocabulary not in ("compact", "sorted"):
+        raise ValueError(f"Cannot store a '{vocabulary}' vocabulary on disk.")
+    vocab = build_vocabulary(dict(model.vocabulary.items()), vocabulary)
+    final_path = path
+    path = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+    shutil.rmtree(path, ignore_errors=True)  # Left over by a crashed export
+    path.mkdir(parents=True)
+    try:
+        _write_artifact(model, vocab, vocabulary, version, path)
+    except BaseException:
+        shutil.rmtree(path, ignore_errors=True)
+        raise
+    _replace_directory(path, final_path)
+    return final_path
+
+
+def _write_artifact(
+    model: CompiledLinearModel,
+    vocab: Any,
+    vocabulary: str,
+    version: Optional[str],
+    path: Path,
+) -> None:
+    np.save(path / "idf.npy", np.ascontiguousarray(model.idf))
+    np.save(path / "weights.npy", np.ascontiguousarray(model.weights))
+    np.save(path / "intercept.npy", np.ascontiguousarray(model.intercept))
+    classes = np.asarray(model.classes_)
+    if classes.dtype == object:  # sklearn keeps string labels as objects
+        classes = classes.astype(str)
+    np.save(path / "classes.npy", classes)
+    if vocabulary == "compact":
+        np.save(path / "vocab_blob.npy", vocab.blob)
+        np.save(path / "vocab_bucket_lengths.npy", vocab.bucket_lengths)
+        np.save(path / "vocab_bucket_counts.npy", vocab.bucket_counts)
+    else:
+        np.save(path / "vocab_terms.npy", vocab.terms)
+    np.save(path / "vocab_columns.npy", vocab.columns)
+
+    meta = {
+        "format": ARTIFACT_FORMAT,
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "version": version,
+        "n_terms": model.n_terms,
+        "vocabulary": vocabulary,
+        "token_pattern": model.token_pattern,
+        "lowercase": model.lowercase,
+        "norm": model.norm,
+        "sublinear_tf": model.sublinear_tf,
+        "binary": model.binary,
+        "multinomial": model.multinomial,
+    }
+    with open(path / ARTIFACT_META_FILE, "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+def _replace_directory(source: Path, target: Path) -> None:
+    """
+    Moves directory `source` to `target`, replacing an existing one.
+
+    Two renames: `target` is missing for an instant in between, which the
+    model watcher treats as "no change". The old directory is then deleted;
+    its files stay readable by processes that have them mapped.
+    """
+    if not target.exists():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, target)
+        return
+    old = target.with_name(f".{target.name}.old-{os.getpid()}")
+    shutil.rmtree(old, ignore_errors=True)
+    os.replace(target, old)
+    os.replace(source, target)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def is_compiled_artifact(path: Path) -> bool:
+    """Returns True if `path` is a directory written by save_compiled()."""
+    return Path(path).is_dir() and (Path(path) / ARTIFACT_META_FILE).exists()
+
+
+def read_artifact_meta(path: Path, dir_fd: Optional[int] = None) -> Dict[str, Any]:
+    """Reads and validates the metadata of a compiled artifact."""
+    if dir_fd is None:
+        with open(Path(path) / ARTIFACT_META_FILE) as f:
+            meta = json.load(f)
+    else:
+        with open(ARTIFACT_META_FILE, opener=_opener(dir_fd)) as f:
+            meta = json.load(f)
+    if meta.get("format") != ARTIFACT_FORMAT:
+        raise ValueError(f"{path} is not a {ARTIFACT_FORMAT} artifact.")
+    if meta.get("format_version") != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported artifact format version {meta.get('format_version')}."
+        )
+    return meta
+
+
+def _opener(dir_fd: int):
+    """open() opener resolving names relative to an open directory."""
+    return lambda name, flags: os.open(name, flags, dir_fd=dir_fd)
+
+
+def _load_array(name: str, dir_fd: int, mmap: bool) -> np.ndarray:
+    """Loads (or read-only memory-maps) one .npy file of an open directory."""
+    with open(name, "rb", opener=_opener(dir_fd)) as f:
+        if not mmap:
+            return np.load(f, allow_pickle=False)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        return np.memmap(
+            f,
+            dtype=dtype,
+            mode="r",
+            offset=f.tell(),
+            shape=shape,
+            order="F" if fortran_order else "C",
+        )
+
+
+def load_compiled(path: Path, mmap: bool = True) -> CompiledLinearModel:
+    """
+    Loads a compiled model saved by save_compiled().
+
+    Args:
+        path (Path): The artifact directory.
+        mmap (bool): Memory-map the arrays read-only (shared between
+                     processes) instead of reading them into private memory.
+
+    Returns:
+        CompiledLinearModel: The loaded model.
+    """
+    # Every file is opened relative to the directory opened here, so a
+    # re-export swapping in a new directory meanwhile cannot mix old and
+    # new arrays
+    dir_fd = os.open(Path(path), os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+    try:
+        return _load_compiled(path, dir_fd, mmap)
+    finally:
+        os.close(dir_fd)
+
+
+def _load_compiled(path: Path, dir_fd: int, mmap: bool) -> CompiledLinearModel:
+    meta = read_artifact_meta(path, dir_fd)
+
+    def load(name: str, mode: bool = mmap) -> np.ndarray:
+        return _load_array(name, dir_fd, mode)
+
+    if meta.get("vocabulary", "sorted") == "compact":
+        vocabulary = CompactVocabulary(
+            load("vocab_blob.npy"),
+            load("vocab_columns.npy"),
+            load("vocab_bucket_lengths.npy", False),
+            load("vocab_bucket_counts.npy", False),
+        )
+    else:
+        vocabulary = SortedVocabulary(
+            load("vocab_terms.npy"), load("vocab_columns.npy")
+        )
+
+    return CompiledLinearModel(
+        vocabulary=vocabulary,
+        idf=load("idf.npy"),
+        weights=load("weights.npy"),
+        intercept=load("intercept.npy", False),  # Tiny, keep in memory
+        classes=load("classes.npy", False),
+        token_pattern=meta["token_pattern"],
+        lowercase=meta["lowercase"],
+        norm=meta["norm"],
+        sublinear_tf=meta["sublinear_tf"],
+        binary=meta["binary"],
+        multinomial=meta.get("multinomial"),  # Absent in older artifacts
+    )
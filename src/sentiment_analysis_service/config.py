@@ -18,11 +18,152 @@ LOG_DIR.mkdir(parents=True, exist_ok=True)
 # Model file name
 MODEL_FILE_NAME = "sentiment_pipeline.joblib"
 MODEL_PATH = MODEL_DIR / MODEL_FILE_NAME
+# Directory name of the memory-mapped artifact written by the export tool
+COMPILED_MODEL_NAME = "sentiment_pipeline.mmap"
+COMPILED_MODEL_PATH = MODEL_DIR / COMPILED_MODEL_NAME
+# The model actually served; point this at COMPILED_MODEL_PATH to share one
+# memory-mapped copy across uvicorn workers
+SERVING_MODEL_PATH = Path(os.getenv("SERVING_MODEL_PATH", MODEL_PATH))
+# Seconds between checks of SERVING_MODEL_PATH for a new model (0 disables)
+MODEL_WATCH_INTERVAL_S = float(os.getenv("MODEL_WATCH_INTERVAL_S", 5.0))
+# Warm-up inference passes run on a newly loaded model before it is activated
+MODEL_WARMUP_ROUNDS = int(os.getenv("MODEL_WARMUP_ROUNDS", 3))
+# Token required in the X-Admin-Token header by /admin endpoints; while it is
+# unset the /admin endpoints are disabled
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# Streaming endpoint (/predict/stream) configuration
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", 1000))  # Lines per predict()
+STREAM_MAX_LINE_BYTES = int(os.getenv("STREAM_MAX_LINE_BYTES", 1 << 20))
+
+# Offline bulk scoring (python -m sentiment_analysis_service.batch) defaults
+BATCH_SCORING_CHUNK_SIZE = int(os.getenv("BATCH_SCORING_CHUNK_SIZE", 50000))
+BATCH_SCORING_TEXT_COLUMN = os.getenv("BATCH_SCORING_TEXT_COLUMN", "text")
+
+# Streaming trainer (python -m sentiment_analysis_service.train) defaults
+TRAIN_DATA_PATH = Path(os.getenv("TRAIN_DATA_PATH", DATA_DIR / "raw_feedback.csv"))
+TRAIN_TEXT_COLUMN = os.getenv("TRAIN_TEXT_COLUMN", "text")
+TRAIN_LABEL_COLUMN = os.getenv("TRAIN_LABEL_COLUMN", "sentiment")
+TRAIN_CHUNK_SIZE = int(os.getenv("TRAIN_CHUNK_SIZE", 50000))  # Rows per chunk
+TRAIN_EPOCHS = int(os.getenv("TRAIN_EPOCHS", 5))  # Passes of partial_fit
+# Vocabulary pruning: terms in fewer than TRAIN_MIN_DF training documents are
+# dropped, and only the TRAIN_MAX_FEATURES most frequent are kept (0 = all)
+TRAIN_MIN_DF = int(os.getenv("TRAIN_MIN_DF", 2))
+TRAIN_MAX_FEATURES = int(os.getenv("TRAIN_MAX_FEATURES", 0))
+TRAIN_TEST_SIZE = float(os.getenv("TRAIN_TEST_SIZE", 0.2))  # Held-out fraction
+# MLflow experiment training runs are logged to (same as the notebook)
+MLFLOW_EXPERIMENT_NAME = os.getenv("MLFLOW_EXPERIMENT_NAME", "Sentiment Analysis Dev")
+
+# Reduced-size export: a pruned or float32/float16 artifact is only written if
+# its labels match the original pipeline on at least this fraction of the
+# held-out texts
+EXPORT_MIN_AGREEMENT = float(os.getenv("EXPORT_MIN_AGREEMENT", 0.99))
+
+# Inference engine used by predict():
+# "sklearn" runs the loaded Pipeline, "compiled" uses the flat linear scorer
+PREDICT_ENGINE = os.getenv("PREDICT_ENGINE", "sklearn")
+
+# Hand tokens from preprocessing straight to the model so the vectorizer does
+# not lowercase and tokenize the cleaned text a second time
+PREPROCESS_EMIT_TOKENS = os.getenv("PREPROCESS_EMIT_TOKENS", "true").lower() == "true"
+
+# Long-text policy, applied to raw texts before preprocessing so the cost per
+# item stays bounded: "truncate" keeps the head and tail of the text, "chunk"
+# scores up to LONG_TEXT_MAX_CHUNKS pieces and averages their scores, "none"
+# scores the full text
+LONG_TEXT_POLICY = os.getenv("LONG_TEXT_POLICY", "truncate")
+LONG_TEXT_MAX_CHARS = int(os.getenv("LONG_TEXT_MAX_CHARS", 5000))  # Also chunk size
+LONG_TEXT_HEAD_FRACTION = float(os.getenv("LONG_TEXT_HEAD_FRACTION", 0.25))
+LONG_TEXT_MAX_CHUNKS = int(os.getenv("LONG_TEXT_MAX_CHUNKS", 8))
+
+# Default /predict response path: "standard" (Pydantic response models),
+# "fast" (same JSON, serialized directly) or "columnar" (parallel arrays).
+# Clients can override it per request with ?format=...
+RESPONSE_FORMAT = os.getenv("RESPONSE_FORMAT", "standard")
 
 # Logging configuration
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 LOG_LEVEL = "INFO"  # Set log level (e.g., DEBUG, INFO, WARNING, ERROR, CRITICAL)
-LOG_FILE = LOG_DIR / "service.log"
+LOG_FILE = Path(os.getenv("LOG_FILE", LOG_DIR / "service.log"))
+# Write JSON records (one object per line) instead of LOG_FORMAT text
+LOG_JSON = os.getenv("LOG_JSON", "true").lower() == "true"
+# Records waiting for the background writer; further records are dropped
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+# Fraction of requests whose INFO/DEBUG records are kept (warnings always are)
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", 1.0))
+
+# Inference executor configuration
+# Model inference is CPU bound, so it runs on a pool instead of the event loop
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread")  # "thread" or "process"
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", os.cpu_count() or 1))
+# Maximum number of batches submitted to the pool at once; extra requests wait
+INFERENCE_MAX_IN_FLIGHT = int(
+    os.getenv("INFERENCE_MAX_IN_FLIGHT", 2 * (os.cpu_count() or 1))
+)
+
+# Admission control for /predict and /predict/binary (0 disables a limit)
+# Requests over a size limit get 413; requests arriving while the in-flight
+# item budget is used up are shed at once with 429 and Retry-After
+ADMISSION_MAX_ITEMS = int(os.getenv("ADMISSION_MAX_ITEMS", 10000))  # Per request
+# Texts up to this size are accepted; LONG_TEXT_POLICY bounds their cost
+ADMISSION_MAX_TEXT_CHARS = int(os.getenv("ADMISSION_MAX_TEXT_CHARS", 1000000))
+# Largest /predict or /predict/binary body, checked against Content-Length
+# before anything is read or parsed (decoding costs more than the limits above)
+ADMISSION_MAX_BODY_BYTES = int(os.getenv("ADMISSION_MAX_BODY_BYTES", 32 * 2**20))
+ADMISSION_MAX_IN_FLIGHT_ITEMS = int(os.getenv("ADMISSION_MAX_IN_FLIGHT_ITEMS", 50000))
+ADMISSION_RETRY_AFTER_S = int(os.getenv("ADMISSION_RETRY_AFTER_S", 1))
+# Optional client time budget in milliseconds, counted from request arrival
+DEADLINE_HEADER = os.getenv("DEADLINE_HEADER", "X-Request-Deadline-Ms")
+
+# Micro-batching configuration
+# When enabled, concurrent /predict calls are merged into a single predict() call
+BATCHING_ENABLED = os.getenv("BATCHING_ENABLED", "false").lower() == "true"
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", 256))  # Flush at this many texts
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", 5))  # ...or after this wait
+
+# Prediction cache configuration
+# Keyed on the preprocessed text plus the model version; 0 disables the cache
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", 10000))
+PREDICTION_CACHE_TTL_S = float(os.getenv("PREDICTION_CACHE_TTL_S", 0))  # 0 = no TTL
+
+# Shadow scoring: candidate models scored in the background on a copy of live
+# traffic, compared with production for agreement and latency. Format:
+# "name=path,name=path" (pickles or compiled artifacts); empty disables it
+SHADOW_MODELS = os.getenv("SHADOW_MODELS", "")
+SHADOW_SAMPLE_RATE = float(os.getenv("SHADOW_SAMPLE_RATE", 1.0))  # Batches mirrored
+SHADOW_QUEUE_SIZE = int(os.getenv("SHADOW_QUEUE_SIZE", 100))  # Extra batches dropped
+
+# Asynchronous jobs (/jobs): submitted batches and files are spooled to a
+# SQLite database in chunks and scored in the background, behind interactive
+# /predict traffic. Unfinished jobs resume when the service restarts
+JOBS_DB_PATH = Path(os.getenv("JOBS_DB_PATH", BASE_DIR / "spool" / "jobs.sqlite3"))
+JOBS_CHUNK_SIZE = int(os.getenv("JOBS_CHUNK_SIZE", 1000))  # Texts per predict() call
+JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", 1))  # Chunks scored at the same time
+JOBS_MAX_ITEMS = int(os.getenv("JOBS_MAX_ITEMS", 10000000))  # Per job (0 = no limit)
+# Idle workers look for new chunks at least this often (submissions wake them)
+JOBS_POLL_INTERVAL_S = float(os.getenv("JOBS_POLL_INTERVAL_S", 1.0))
+JOBS_RESULTS_PAGE_SIZE = int(os.getenv("JOBS_RESULTS_PAGE_SIZE", 1000))  # Max limit
+
+# Per-request profiling of /predict and /predict/binary (see profiling.py)
+# Requests sending PROFILE_HEADER with a mode ("stages", "memory" or
+# "cprofile") and a valid X-Admin-Token are profiled
+PROFILE_HEADER = os.getenv("PROFILE_HEADER", "X-Profile")
+# Fraction of all requests profiled in PROFILE_SAMPLE_MODE (0 disables);
+# "stages" is cheap enough to leave on at a low rate, and the only mode
+# sampled while ADMIN_TOKEN is unset
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0.0))
+PROFILE_SAMPLE_MODE = os.getenv("PROFILE_SAMPLE_MODE", "stages")
+PROFILE_STORE_SIZE = int(os.getenv("PROFILE_STORE_SIZE", 200))  # Reports kept
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", 20))  # Functions / allocation sites
+
+# Sharded inference for single huge predict() calls (opt-in)
+# Batches of at least PREDICT_SHARD_THRESHOLD texts are split into one shard
+# per worker and scored on a persistent process pool (0 or 1 worker disables)
+# The workers start with the server and each holds a model: a private copy
+# of a joblib pickle, or shared pages of a memory-mapped compiled artifact
+# (SERVING_MODEL_PATH=COMPILED_MODEL_PATH), so prefer that artifact with it
+PREDICT_SHARD_THRESHOLD = int(os.getenv("PREDICT_SHARD_THRESHOLD", 20000))
+PREDICT_SHARD_WORKERS = int(os.getenv("PREDICT_SHARD_WORKERS", 1))
 
 if __name__ == "__main__":
     # Print paths to verify they are correct when running this file directly
@@ -31,4 +172,5 @@ if __name__ == "__main__":
     print(f"Model Directory: {MODEL_DIR}")
     print(f"Log Directory: {LOG_DIR}")
     print(f"Model Path: {MODEL_PATH}")
+    print(f"Serving Model Path: {SERVING_MODEL_PATH}")
     print(f"Log File Path: {LOG_FILE}")
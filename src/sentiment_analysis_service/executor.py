@@ -0,0 +1,200 @@
+# src/sentiment_analysis_service/executor.py
+import asyncio
+import contextvars
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+
+from .config import INFERENCE_EXECUTOR, INFERENCE_WORKERS, INFERENCE_MAX_IN_FLIGHT
+from .logging_setup import is_request_sampled, run_sampled
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_KINDS = ("thread", "process")
+
+
+def _init_process_worker(model_path: Optional[str] = None):
+    """Loads the model once when a process-pool worker starts."""
+    # Imported here so the parent process does not pay for it at import time
+    from .predict import configure_shadow_models, load_model, set_sharding
+
+    set_sharding(False)  # One pool per server, not one per worker
+    load_model(Path(model_path) if model_path is not None else None)
+    configure_shadow_models()  # Workers score the batches, so they mirror them
+
+
+class InferenceExecutor:
+    """
+    Runs blocking inference calls on a worker pool so the event loop stays free.
+
+    The number of batches handed to the pool at the same time is capped by
+    `max_in_flight`; callers beyond the cap wait (asynchronously) for a slot.
+
+    Background calls (scoring jobs) yield to interactive ones: they only take
+    a slot while a worker is idle and no interactive call is waiting, so an
+    interactive request queues behind at most the background calls already
+    running.
+
+    Calls run in the caller's context (a copy of it on thread workers; only
+    the log sampling decision on process workers), so records they log are
+    sampled like the rest of the request.
+    """
+
+    def __init__(
+        self,
+        kind: str = INFERENCE_EXECUTOR,
+        max_workers: int = INFERENCE_WORKERS,
+        max_in_flight: int = INFERENCE_MAX_IN_FLIGHT,
+    ):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(
+                f"Unknown executor kind '{kind}'. Expected one of {EXECUTOR_KINDS}."
+            )
+        if max_workers < 1 or max_in_flight < 1:
+            raise ValueError("max_workers and max_in_flight must be at least 1.")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_in_flight = max_in_flight
+        self._pool: Optional[Executor] = None
+        self._model_path: Optional[str] = None  # Loaded by process workers
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._in_flight = 0
+        self._background_in_flight = 0
+        self._interactive_waiting = 0
+        # Futures of background calls waiting for a slot (bound to the
+        # caller's loop, so created per wait)
+        self._background_waiters: List[asyncio.Future] = []
+
+    @property
+    def in_flight(self) -> int:
+        """Number of batches currently submitted to the pool."""
+        return self._in_flight
+
+    @property
+    def background_in_flight(self) -> int:
+        """Number of background batches currently submitted to the pool."""
+        return self._background_in_flight
+
+    def _create_pool(self) -> Executor:
+        if self.kind == "process":
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_process_worker,
+                initargs=(self._model_path,),
+            )
+        return ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="inference"
+        )
+
+    def start(self) -> None:
+        """Creates the worker pool (idempotent)."""
+        if self._pool is not None:
+            return
+        self._pool = self._create_pool()
+        logger.info(
+            f"Inference executor started: kind={self.kind}, "
+            f"workers={self.max_workers}, max_in_flight={self.max_in_flight}"
+        )
+
+    async def _acquire_background(self) -> None:
+        """Waits until a slot and a worker are free and no interactive call waits."""
+        loop = asyncio.get_running_loop()
+        while (
+            self._slots.locked()
+            or self._interactive_waiting
+            or self._in_flight >= self.max_workers
+        ):
+            waiter = loop.create_future()
+            self._background_waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._background_waiters:
+                    self._background_waiters.remove(waiter)
+        await self._slots.acquire()  # Free, so this does not wait
+
+    async def run(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+        background: bool = False,
+    ) -> Any:
+        """
+        Runs `func(*args)` on the pool once an in-flight slot is available.
+
+        Args:
+            func (Callable): The blocking function to run. Must be picklable
+                             (module-level) when using the process pool.
+            *args: Positional arguments passed to `func`.
+            timeout (Optional[float]): Longest time in seconds to wait for a
+                                       slot; None waits indefinitely.
+            background (bool): Low priority: wait until no interactive call
+                               is waiting (timeout is ignored).
+
+        Returns:
+            Any: The return value of `func`.
+
+        Raises:
+            asyncio.TimeoutError: If no slot became free within `timeout`.
+        """
+        if self._pool is None:
+            self.start()
+        if background:
+            await self._acquire_background()
+            self._background_in_flight += 1
+        else:
+            self._interactive_waiting += 1
+            try:
+                if timeout is None or not self._slots.locked():
+                    await self._slots.acquire()
+                else:
+                    await asyncio.wait_for(self._slots.acquire(), max(timeout, 0))
+            finally:
+                self._interactive_waiting -= 1
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            if self.kind == "process":
+                return await loop.run_in_executor(
+                    self._pool, run_sampled, is_request_sampled(), func, *args
+                )
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(self._pool, context.run, func, *args)
+        finally:
+            self._in_flight -= 1
+            if background:
+                self._background_in_flight -= 1
+            self._slots.release()
+            # Background waiters re-check; woken interactive callers are
+            # still counted as waiting, so they go first
+            waiters, self._background_waiters = self._background_waiters, []
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    def recycle(self, model_path: Optional[Path] = None) -> None:
+        """
+        Replaces process-pool workers so they load the model at `model_path`.
+
+        Process workers each hold their own copy of the model, so a hot reload
+        in the parent does not reach them. The new pool takes all new work at
+        once; batches already submitted finish on the old workers, which then
+        exit. Thread workers share the parent's model, so this is a no-op.
+        """
+        if model_path is not None:
+            self._model_path = str(model_path)
+        if self.kind != "process" or self._pool is None:
+            return
+        old_pool, self._pool = self._pool, self._create_pool()
+        old_pool.shutdown(wait=False)
+        logger.info(f"Recycled process workers for model {self._model_path}.")
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stops the worker pool. Safe to call more than once."""
+        if self._pool is None:
+            return
+        logger.info("Shutting down inference executor...")
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+        self._pool = None
@@ -0,0 +1,347 @@
+# src/sentiment_analysis_service/export.py
+"""
+Exports the trained sklearn pipeline as a memory-mapped compiled artifact.
+
+Usage:
+    python -m sentiment_analysis_service.export [--compare-memory]
+        [--prune-threshold T] [--dtype float64|float32|float16]
+        [--holdout PATH] [--min-agreement 0.99] [--report]
+
+Serve the result by setting SERVING_MODEL_PATH to the output directory.
+
+With --prune-threshold and/or a reduced --dtype the artifact drops terms
+with negligible weights and stores idf and weights at lower precision. Such
+an export is only written if its labels agree with the original pipeline on
+a held-out set (by default the rows train.py held out of TRAIN_DATA_PATH)
+at least --min-agreement of the time. --report compares artifact size, load
+time and throughput of the pickle, the full compiled model and the export.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import joblib
+import numpy as np
+
+from .batch import infer_format, read_chunks
+from .config import (
+    COMPILED_MODEL_PATH,
+    EXPORT_MIN_AGREEMENT,
+    MODEL_PATH,
+    TRAIN_DATA_PATH,
+    TRAIN_TEST_SIZE,
+    TRAIN_TEXT_COLUMN,
+)
+from .compiled import (
+    WEIGHT_DTYPES,
+    compile_pipeline,
+    prune_compiled,
+    save_compiled,
+)
+from .model_manager import file_version, load_artifact
+from .preprocessing import preprocess_batch
+from .train import holdout_mask
+
+logger = logging.getLogger(__name__)
+
+
+class AgreementError(ValueError):
+    """Raised when a reduced export disagrees with the original too often."""
+
+    def __init__(self, agreement: float, target: float):
+        super().__init__(
+            f"Label agreement with the original pipeline is {agreement:.4%}, "
+            f"below the target of {target:.4%}; nothing was exported."
+        )
+        self.agreement = agreement
+        self.target = target
+
+
+def load_holdout_texts(
+    path: Path,
+    text_column: str = TRAIN_TEXT_COLUMN,
+    test_size: float = TRAIN_TEST_SIZE,
+    max_rows: Optional[int] = 20000,
+    seed: int = 42,
+) -> List[Any]:
+    """
+    Reads the texts to check an export against.
+
+    With `test_size` > 0 only the rows train.py held out of this file (same
+    split, same seed) are used, so the training corpus can be passed as is;
+    pass 0 to use every row of a separate evaluation file.
+    """
+    path = Path(path)
+    texts: List[Any] = []
+    rows_read = 0
+    for frame in read_chunks(path, infer_format(path), 50000):
+        if text_column not in frame.columns:
+            raise ValueError(
+                f"Text column '{text_column}' not found in {path}. "
+                f"Available columns: {list(frame.columns)}"
+            )
+        column = frame[text_column].to_numpy(dtype=object)
+        if test_size > 0:
+            column = column[holdout_mask(rows_read, len(frame), test_size, seed)]
+        rows_read += len(frame)
+        texts.extend(column.tolist())
+        if max_rows is not None and len(texts) >= max_rows:
+            return texts[:max_rows]
+    return texts
+
+
+def label_agreement(pipeline: Any, model: Any, texts: List[Any]) -> float:
+    """Returns the fraction of texts on which both models predict the same label."""
+    if not texts:
+        raise ValueError("Cannot measure agreement on an empty held-out set.")
+    cleaned = preprocess_batch(texts)
+    return float(np.mean(pipeline.predict(cleaned) == model.predict(cleaned)))
+
+
+def export_model(
+    model_path: Path = MODEL_PATH,
+    output: Path = COMPILED_MODEL_PATH,
+    vocabulary: str = "compact",
+    prune_threshold: float = 0.0,
+    dtype: str = "float64",
+    holdout_texts: Optional[List[Any]] = None,
+    min_agreement: float = EXPORT_MIN_AGREEMENT,
+):
+    """
+    Compiles the pipeline at `model_path` and saves it to `output`.
+
+    The vectorizer's vocabulary dict (and any `stop_words_` set) is not kept;
+    the artifact stores the term -> column mapping in the `vocabulary` backend.
+
+    A positive `prune_threshold` or a `dtype` other than float64 makes the
+    export lossy (see compiled.prune_compiled). It then requires
+    `holdout_texts` and is only written if its labels agree with the
+    pipeline's on at least `min_agreement` of them.
+
+    Returns:
+        Path: The artifact directory.
+
+    Raises:
+        AgreementError: If the agreement is below `min_agreement`.
+    """
+    pipeline = joblib.load(model_path)
+    compiled = compile_pipeline(pipeline)
+    # Reuse the pickle's version so cached predictions stay valid across formats
+    version = file_version(model_path)
+    lossy = prune_threshold > 0 or dtype != "float64"
+    if lossy:
+        compiled = prune_compiled(compiled, prune_threshold, dtype)
+        # Predictions may differ from the pickle's, so cache entries must too
+        version = f"{version}-p{prune_threshold:g}-{dtype}"
+        if holdout_texts is None:
+            raise ValueError("A pruned or reduced-precision export needs a holdout.")
+    if holdout_texts is not None:
+        agreement = label_agreement(pipeline, compiled, holdout_texts)
+        logger.info(
+            f"Label agreement on {len(holdout_texts)} held-out texts: "
+            f"{agreement:.4%} (target {min_agreement:.4%})"
+        )
+        if agreement < min_agreement:
+            raise AgreementError(agreement, min_agreement)
+    path = save_compiled(compiled, output, version=version, vocabulary=vocabulary)
+    logger.info(
+        f"Exported compiled model ({compiled.n_terms} terms, {dtype}) to {path}"
+    )
+    return path
+
+
+def artifact_size(path: Path) -> int:
+    """Returns the size in bytes of a model file or artifact directory."""
+    path = Path(path)
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+    return path.stat().st_size
+
+
+def measure_throughput(model: Any, texts: List[Any], min_seconds: float = 0.5) -> float:
+    """Returns texts/sec for model.predict() on preprocessed `texts`."""
+    cleaned = preprocess_batch(texts)
+    model.predict(cleaned[:100])  # Warm up lazy state (mmap pages, regexes)
+    scored = 0
+    start = time.perf_counter()
+    while True:
+        model.predict(cleaned)
+        scored += len(cleaned)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return scored / elapsed
+
+
+def export_report(
+    model_path: Path, artifact_path: Path, holdout_texts: List[Any]
+) -> List[Dict[str, Any]]:
+    """
+    Compares the pickle, the full compiled model and an exported artifact.
+
+    Load time and memory are measured in fresh processes; throughput and
+    label agreement with the pickle on `holdout_texts` in this one.
+
+    Returns:
+        List[Dict[str, Any]]: One row per model with name, path, bytes,
+                              n_terms, load_seconds, rss_delta_bytes,
+                              texts_per_sec and agreement.
+    """
+    pipeline = joblib.load(model_path)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        full_path = save_compiled(
+            compile_pipeline(pipeline), Path(tmp_dir) / "full.mmap", version="full"
+        )
+        paths = {
+            "pickle": Path(model_path),
+            "compiled": full_path,
+            "export": Path(artifact_path),
+        }
+        load_info = compare_load_memory(*paths.values())
+        rows = []
+        for name, path in paths.items():
+            model = load_artifact(path).model
+            info = load_info[str(path)]
+            rows.append(
+                {
+                    "name": name,
+                    "path": str(path),
+                    "bytes": artifact_size(path),
+                    "n_terms": (
+                        model.n_terms
+                        if name != "pickle"
+                        else len(pipeline.steps[0][1].vocabulary_)
+                    ),
+                    "load_seconds": info["load_seconds"],
+                    "rss_delta_bytes": info["rss_delta_bytes"],
+                    "texts_per_sec": measure_throughput(model, holdout_texts),
+                    "agreement": label_agreement(pipeline, model, holdout_texts),
+                }
+            )
+    return rows
+
+
+def _load_in_fresh_process(model_path: str) -> Dict[str, Any]:
+    """Loads a model in this (fresh) process and returns its load info."""
+    from .predict import load_model, get_model_load_info
+
+    load_model(Path(model_path))
+    return get_model_load_info()
+
+
+def compare_load_memory(*model_paths: Path) -> Dict[str, Dict[str, Any]]:
+    """
+    Loads each model in a separate fresh process and reports its memory cost.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Load info (format, load time, RSS deltas)
+                                   per model path.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for path in model_paths:
+        with context.Pool(1) as pool:
+            results[str(path)] = pool.apply(_load_in_fresh_process, (str(path),))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model-path", type=Path, default=MODEL_PATH)
+    parser.add_argument("--output", type=Path, default=COMPILED_MODEL_PATH)
+    parser.add_argument(
+        "--vocabulary",
+        choices=("compact", "sorted"),
+        default="compact",
+        help="On-disk vocabulary backend.",
+    )
+    parser.add_argument(
+        "--compare-memory",
+        action="store_true",
+        help="Report load time and resident-memory cost of pickle vs mmap.",
+    )
+    parser.add_argument(
+        "--prune-threshold",
+        type=float,
+        default=0.0,
+        help="Drop terms whose largest |idf * coefficient| is at or below this.",
+    )
+    parser.add_argument("--dtype", choices=WEIGHT_DTYPES, default="float64")
+    parser.add_argument(
+        "--holdout",
+        type=Path,
+        help="Texts to check label agreement on (default: TRAIN_DATA_PATH).",
+    )
+    parser.add_argument("--text-column", default=TRAIN_TEXT_COLUMN)
+    parser.add_argument(
+        "--test-size",
+        type=float,
+        default=TRAIN_TEST_SIZE,
+        help="Use only the rows train.py held out of --holdout (0: all rows).",
+    )
+    parser.add_argument("--max-holdout-rows", type=int, default=20000)
+    parser.add_argument("--min-agreement", type=float, default=EXPORT_MIN_AGREEMENT)
+    parser.add_argument(
+        "--report",
+        action="store_true",
+        help="Compare size, load time and throughput before and after export.",
+    )
+    args = parser.parse_args(argv)
+
+    holdout_path = args.holdout
+    if holdout_path is None and TRAIN_DATA_PATH.exists():
+        holdout_path = TRAIN_DATA_PATH
+    holdout_texts = None
+    if holdout_path is not None:
+        holdout_texts = load_holdout_texts(
+            holdout_path, args.text_column, args.test_size, args.max_holdout_rows
+        )
+    if (args.prune_threshold > 0 or args.dtype != "float64") and not holdout_texts:
+        raise SystemExit(
+            "--prune-threshold and --dtype need held-out texts; pass --holdout."
+        )
+    try:
+        path = export_model(
+            args.model_path,
+            args.output,
+            args.vocabulary,
+            prune_threshold=args.prune_threshold,
+            dtype=args.dtype,
+            holdout_texts=holdout_texts,
+            min_agreement=args.min_agreement,
+        )
+    except AgreementError as e:
+        raise SystemExit(f"Refusing to export: {e}")
+    print(f"Compiled model written to {path}")
+
+    if args.compare_memory:
+        for model_path, info in compare_load_memory(args.model_path, path).items():
+            print(
+                f"{info['format']:>6}: load={info['load_seconds'] * 1000:.1f}ms "
+                f"rss_delta={info['rss_delta_bytes']}B "
+                f"private={info['rss_anon_delta_bytes']}B "
+                f"shared={info['rss_file_delta_bytes']}B  ({model_path})"
+            )
+
+    if args.report:
+        if not holdout_texts:
+            raise SystemExit("--report needs held-out texts; pass --holdout.")
+        print(
+            f"{'model':>8} {'size KB':>9} {'terms':>8} {'load ms':>8} "
+            f"{'rss KB':>8} {'texts/sec':>10} {'agreement':>9}"
+        )
+        for row in export_report(args.model_path, path, holdout_texts):
+            print(
+                f"{row['name']:>8} {row['bytes'] / 1024:>9.1f} {row['n_terms']:>8} "
+                f"{row['load_seconds'] * 1000:>8.1f} "
+                f"{(row['rss_delta_bytes'] or 0) / 1024:>8.0f} "
+                f"{row['texts_per_sec']:>10.0f} {row['agreement']:>9.4%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
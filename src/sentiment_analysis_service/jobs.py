@@ -0,0 +1,504 @@
+# src/sentiment_analysis_service/jobs.py
+"""
+Asynchronous scoring jobs, spooled to SQLite.
+
+A job's inputs are written to the spool in chunks as they are submitted
+(JobStore). Background workers (JobRunner) claim pending chunks one at a
+time, score them with predict() on the inference executor as low-priority
+calls, and write the results back next to the inputs. Everything a job needs
+lives in the database, so after a restart recover() puts chunks that were
+being scored back in the queue and the workers carry on where they stopped.
+
+Each chunk entry is either a text to score or an error record for a
+malformed input line, kept in position so result i always belongs to input i.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import JOBS_DB_PATH, JOBS_POLL_INTERVAL_S, JOBS_WORKERS
+from .streaming import Entry, chunk_texts, merge_results
+
+logger = logging.getLogger(__name__)
+
+# receiving: inputs still being uploaded; queued/running: chunks left to
+# score; succeeded, failed and cancelled are final
+JOB_STATUSES = ("receiving", "queued", "running", "succeeded", "failed", "cancelled")
+FINAL_STATUSES = ("succeeded", "failed", "cancelled")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    probabilities INTEGER NOT NULL,
+    total_items INTEGER NOT NULL DEFAULT 0,
+    processed_items INTEGER NOT NULL DEFAULT 0,
+    n_chunks INTEGER NOT NULL DEFAULT 0,
+    chunks_done INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    job_id TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    start_item INTEGER NOT NULL,
+    n_items INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    inputs TEXT NOT NULL,
+    results TEXT,
+    PRIMARY KEY (job_id, chunk_index)
+);
+CREATE INDEX IF NOT EXISTS chunks_pending ON chunks (status, job_id, chunk_index);
+"""
+
+
+class JobNotFoundError(KeyError):
+    """Raised for an unknown job id."""
+
+
+class JobStateError(ValueError):
+    """Raised when a job is not in a state that allows the operation."""
+
+
+class JobStore:
+    """
+    Jobs and their chunks in a SQLite database.
+
+    One connection is shared by all threads and serialized with a lock; the
+    event loop calls the methods through asyncio.to_thread(). The database
+    is opened (and created) on first use.
+    """
+
+    def __init__(self, path: Path = JOBS_DB_PATH):
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _transaction(self, func, *args):
+        """Runs `func(conn, *args)` in one transaction under the lock."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(conn, *args)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # --- Submission ---
+
+    def create_job(self, probabilities: bool = False) -> str:
+        """Creates a job in the "receiving" state and returns its id."""
+        job_id = uuid.uuid4().hex
+
+        def insert(conn):
+            conn.execute(
+                "INSERT INTO jobs (id, status, probabilities, created_at) "
+                "VALUES (?, 'receiving', ?, ?)",
+                (job_id, int(probabilities), time.time()),
+            )
+
+        self._transaction(insert)
+        return job_id
+
+    def add_chunk(self, job_id: str, entries: List[Entry]) -> None:
+        """Appends a chunk of inputs to a job that is still receiving."""
+
+        def insert(conn):
+            job = self._job_row(conn, job_id)
+            if job["status"] != "receiving":
+                raise JobStateError(f"Job {job_id} is {job['status']}.")
+            conn.execute(
+                "INSERT INTO chunks (job_id, chunk_index, start_item, n_items, "
+                "status, inputs) VALUES (?, ?, ?, ?, 'pending', ?)",
+                (
+                    job_id,
+                    job["n_chunks"],
+                    job["total_items"],
+                    len(entries),
+                    json.dumps(entries),
+                ),
+            )
+            conn.execute(
+                "UPDATE jobs SET n_chunks = n_chunks + 1, "
+                "total_items = total_items + ? WHERE id = ?",
+                (len(entries), job_id),
+            )
+
+        self._transaction(insert)
+
+    def finish_submission(self, job_id: str) -> None:
+        """Queues a fully received job (an empty job succeeds at once)."""
+
+        def update(conn):
+            job = self._job_row(conn, job_id)
+            if job["status"] != "receiving":
+                raise JobStateError(f"Job {job_id} is {job['status']}.")
+            if job["n_chunks"]:
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued' WHERE id = ?", (job_id,)
+                )
+            else:
+                now = time.time()
+                conn.execute(
+                    "UPDATE jobs SET status = 'succeeded', started_at = ?, "
+                    "finished_at = ? WHERE id = ?",
+                    (now, now, job_id),
+                )
+
+        self._transaction(update)
+
+    # --- Processing ---
+
+    def claim_chunk(self) -> Optional[Tuple[str, int, List[Entry], bool]]:
+        """
+        Marks the next pending chunk as running and returns it.
+
+        Jobs are served oldest first, chunks in order. Returns
+        (job id, chunk index, entries, probabilities), or None if there is
+        nothing to score.
+        """
+
+        def claim(conn):
+            row = conn.execute(
+                "SELECT c.job_id, c.chunk_index, c.inputs, j.probabilities "
+                "FROM chunks c JOIN jobs j ON j.id = c.job_id "
+                "WHERE c.status = 'pending' AND j.status IN ('queued', 'running') "
+                "ORDER BY j.created_at, c.chunk_index LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE chunks SET status = 'running' "
+                "WHERE job_id = ? AND chunk_index = ?",
+                (row["job_id"], row["chunk_index"]),
+            )
+            conn.execute(
+                "UPDATE jobs SET status = 'running', "
+                "started_at = COALESCE(started_at, ?) WHERE id = ?",
+                (time.time(), row["job_id"]),
+            )
+            return (
+                row["job_id"],
+                row["chunk_index"],
+                json.loads(row["inputs"]),
+                bool(row["probabilities"]),
+            )
+
+        return self._transaction(claim)
+
+    def complete_chunk(
+        self, job_id: str, chunk_index: int, results: List[Dict[str, Any]]
+    ) -> None:
+        """Stores a chunk's results; the last chunk marks the job succeeded."""
+
+        def update(conn):
+            updated = conn.execute(
+                "UPDATE chunks SET status = 'done', results = ? "
+                "WHERE job_id = ? AND chunk_index = ? AND status = 'running'",
+                (json.dumps(results), job_id, chunk_index),
+            ).rowcount
+            if not updated:  # Job deleted or cancelled meanwhile
+                return
+            conn.execute(
+                "UPDATE jobs SET chunks_done = chunks_done + 1, "
+                "processed_items = processed_items + ? WHERE id = ?",
+                (len(results), job_id),
+            )
+            conn.execute(
+                "UPDATE jobs SET status = 'succeeded', finished_at = ? "
+                "WHERE id = ? AND status = 'running' AND chunks_done = n_chunks",
+                (time.time(), job_id),
+            )
+
+        self._transaction(update)
+
+    def fail_job(self, job_id: str, error: str) -> None:
+        """Marks an unfinished job as failed; its pending chunks are skipped."""
+        self._finish(job_id, "failed", error)
+
+    def cancel_job(self, job_id: str) -> Dict[str, Any]:
+        """Cancels an unfinished job and returns its status."""
+        self._finish(job_id, "cancelled", None)
+        return self.get_job(job_id)
+
+    def _finish(self, job_id: str, status: str, error: Optional[str]) -> None:
+        def update(conn):
+            job = self._job_row(conn, job_id)
+            if job["status"] in FINAL_STATUSES:
+                raise JobStateError(f"Job {job_id} is already {job['status']}.")
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, error, time.time(), job_id),
+            )
+            conn.execute(
+                "UPDATE chunks SET status = 'skipped' "
+                "WHERE job_id = ? AND status != 'done'",
+                (job_id,),
+            )
+
+        self._transaction(update)
+
+    def delete_job(self, job_id: str) -> None:
+        """Removes a job and its spooled inputs and results."""
+
+        def delete(conn):
+            self._job_row(conn, job_id)
+            conn.execute("DELETE FROM chunks WHERE job_id = ?", (job_id,))
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+        self._transaction(delete)
+
+    def recover(self) -> Dict[str, int]:
+        """
+        Prepares the spool after a restart.
+
+        Chunks left running by a stopped process are queued again. Jobs
+        whose upload was interrupted cannot be completed and are marked
+        failed. Returns how many of each were found.
+        """
+
+        def update(conn):
+            requeued = conn.execute(
+                "UPDATE chunks SET status = 'pending' WHERE status = 'running'"
+            ).rowcount
+            interrupted = conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, "
+                "error = 'Upload interrupted by a restart.' "
+                "WHERE status = 'receiving'",
+                (time.time(),),
+            ).rowcount
+            conn.execute(
+                "UPDATE chunks SET status = 'skipped' WHERE status = 'pending' "
+                "AND job_id IN (SELECT id FROM jobs WHERE status = 'failed')"
+            )
+            resumed = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchone()[0]
+            return {
+                "requeued_chunks": requeued,
+                "interrupted_uploads": interrupted,
+                "resumed_jobs": resumed,
+            }
+
+        return self._transaction(update)
+
+    # --- Queries ---
+
+    @staticmethod
+    def _job_row(conn: sqlite3.Connection, job_id: str) -> sqlite3.Row:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise JobNotFoundError(job_id)
+        return row
+
+    @staticmethod
+    def _job_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["job_id"] = job.pop("id")
+        job["probabilities"] = bool(job["probabilities"])
+        return job
+
+    def get_job(self, job_id: str) -> Dict[str, Any]:
+        """Returns a job's status and progress counters."""
+        return self._job_dict(self._transaction(self._job_row, job_id))
+
+    def get_results(self, job_id: str, offset: int, limit: int) -> Dict[str, Any]:
+        """
+        Returns up to `limit` results starting at item `offset`.
+
+        Only results of finished chunks are returned, stopping at the first
+        chunk still to be scored. `next_offset` is where the next page
+        starts, or None once the page reaches the end of the job.
+        """
+
+        def select(conn):
+            job = self._job_row(conn, job_id)
+            rows = conn.execute(
+                "SELECT start_item, status, results FROM chunks WHERE job_id = ? "
+                "AND start_item < ? AND start_item + n_items > ? "
+                "ORDER BY chunk_index",
+                (job_id, offset + limit, offset),
+            ).fetchall()
+            return job, rows
+
+        job, rows = self._transaction(select)
+        results: List[Dict[str, Any]] = []
+        for row in rows:
+            if row["status"] != "done":
+                break
+            chunk = json.loads(row["results"])
+            start = max(offset - row["start_item"], 0)
+            results.extend(chunk[start : start + limit - len(results)])
+        end = offset + len(results)
+        return {
+            "job_id": job_id,
+            "status": job["status"],
+            "offset": offset,
+            "results": results,
+            "next_offset": end if end < job["total_items"] else None,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns job counts by status and the number of chunks left to score."""
+
+        def select(conn):
+            jobs = dict(
+                conn.execute(
+                    "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+                ).fetchall()
+            )
+            pending = conn.execute(
+                "SELECT COUNT(*) FROM chunks WHERE status IN ('pending', 'running')"
+            ).fetchone()[0]
+            return {"jobs": jobs, "pending_chunks": pending}
+
+        return {"path": str(self.path), **self._transaction(select)}
+
+
+class JobRunner:
+    """
+    Background workers that score spooled chunks with predict().
+
+    Each worker claims one chunk at a time and runs it on the inference
+    executor with background=True, so interactive requests always get the
+    next free slot. Workers wake up on notify() (a new submission) or every
+    `poll_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        executor,
+        workers: int = JOBS_WORKERS,
+        poll_interval: float = JOBS_POLL_INTERVAL_S,
+    ):
+        self.store = store
+        self.executor = executor
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._wake: Optional[asyncio.Event] = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Recovers the spool and starts the workers on the running loop."""
+        if self._tasks:
+            return
+        recovered = await asyncio.to_thread(self.store.recover)
+        if any(recovered.values()):
+            logger.info(f"Job spool recovered: {recovered}")
+        # Created here: asyncio primitives belong to the loop that uses them
+        self._wake = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(
+            f"Job runner started: workers={self.workers}, spool={self.store.path}"
+        )
+
+    async def stop(self) -> None:
+        """
+        Stops the workers. Chunks being scored stay "running" in the spool
+        and are scored again after the next start().
+        """
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def notify(self) -> None:
+        """Wakes idle workers after a submission."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _work(self) -> None:
+        # Imported here: predict imports the model stack, jobs only needs it
+        # once a worker runs
+        from .predict import is_model_loaded
+
+        while True:
+            self._wake.clear()
+            claimed = None
+            try:
+                if is_model_loaded():
+                    claimed = await asyncio.to_thread(self.store.claim_chunk)
+                if claimed is not None:
+                    await self._process(*claimed)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # Never let the worker die
+                logger.error(f"Job worker failed: {e}", exc_info=True)
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _process(
+        self,
+        job_id: str,
+        chunk_index: int,
+        entries: List[Entry],
+        probabilities: bool,
+    ) -> None:
+        from .predict import predict
+
+        texts = chunk_texts(entries)
+        try:
+            scored = (
+                await self.executor.run(predict, texts, probabilities, background=True)
+                if texts
+                else []
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Job {job_id} failed on chunk {chunk_index}: {e}")
+            try:
+                await asyncio.to_thread(
+                    self.store.fail_job, job_id, f"{type(e).__name__}: {e}"
+                )
+            except (JobNotFoundError, JobStateError):
+                pass  # Deleted or cancelled meanwhile
+            return
+        await asyncio.to_thread(
+            self.store.complete_chunk,
+            job_id,
+            chunk_index,
+            merge_results(entries, scored),
+        )
@@ -0,0 +1,213 @@
+# src/sentiment_analysis_service/logging_setup.py
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import multiprocessing.util
+import os
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+from .config import (
+    LOG_FORMAT,
+    LOG_LEVEL,
+    LOG_FILE,
+    LOG_JSON,
+    LOG_QUEUE_SIZE,
+    LOG_SAMPLE_RATE,
+)
+
+# Whether the request being handled was picked for INFO-level logging.
+# Defaults to True so code running outside a request logs normally.
+_request_sampled: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "request_sampled", default=True
+)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+_configure_lock = threading.Lock()
+# Arguments of the active configure_logging() call, reapplied in forked children
+_config: Optional[dict] = None
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+def sample_request(rate: float = LOG_SAMPLE_RATE) -> bool:
+    """Decides whether the current request logs at INFO and below."""
+    sampled = rate >= 1.0 or random.random() < rate
+    _request_sampled.set(sampled)
+    return sampled
+
+
+def is_request_sampled() -> bool:
+    """Returns True if INFO-level records of the current request are kept."""
+    return _request_sampled.get()
+
+
+def run_sampled(sampled: bool, func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Runs `func(*args)` under a request's sampling decision.
+
+    Context variables do not reach process-pool workers, so the executor
+    sends the decision along and this (picklable) wrapper restores it.
+    """
+    token = _request_sampled.set(sampled)
+    try:
+        return func(*args)
+    finally:
+        _request_sampled.reset(token)
+
+
+class SamplingFilter(logging.Filter):
+    """Drops records below WARNING for requests that were not sampled."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or _request_sampled.get()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line.
+
+    Structured fields passed with `extra={"fields": {...}}` (or any other
+    extra attribute) become top-level keys, so log entries need no json.dumps
+    on the request path.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key == "fields" and isinstance(value, dict):
+                entry.update(value)
+            elif key not in _RESERVED_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """LOG_FORMAT text formatter that appends structured fields as JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            text = f"{text} {json.dumps(fields, default=str)}"
+        return text
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never blocks and never formats on the calling thread.
+
+    The stock QueueHandler renders the message in `prepare()`, i.e. on the
+    request path. Here the record is queued as is, so `%`-style arguments are
+    only formatted by the listener thread once the record is written. When the
+    queue is full the record is dropped and counted instead of blocking.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(
+    level: str = LOG_LEVEL, json_records: bool = LOG_JSON, force: bool = False
+) -> None:
+    """
+    Routes all service logging through a queue to a background file writer.
+
+    Idempotent: later calls are no-ops unless `force` is True. Request code
+    only pays for a level check, the sampling filter and a queue put.
+
+    Args:
+        level (str): Root log level, e.g. "INFO".
+        json_records (bool): Write JSON lines instead of LOG_FORMAT text.
+        force (bool): Replace an existing configuration.
+    """
+    global _listener, _queue_handler, _config
+    with _configure_lock:
+        if _listener is not None and not force:
+            return
+        shutdown_logging()
+        _config = {"level": level, "json_records": json_records}
+
+        file_handler = logging.FileHandler(LOG_FILE, mode="a", encoding="utf-8")
+        file_handler.setFormatter(
+            JsonFormatter() if json_records else TextFormatter(LOG_FORMAT)
+        )
+        log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        _queue_handler = NonBlockingQueueHandler(log_queue)
+        _queue_handler.addFilter(SamplingFilter())
+        _listener = logging.handlers.QueueListener(
+            log_queue, file_handler, respect_handler_level=True
+        )
+        _listener.start()
+
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(_queue_handler)
+
+
+def dropped_records() -> int:
+    """Number of records dropped because the log queue was full."""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def shutdown_logging() -> None:
+    """Flushes queued records and stops the background writer."""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()  # Processes everything still queued
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def _reconfigure_after_fork() -> None:
+    """
+    Rebuilds the queue and writer thread in a forked child.
+
+    A child inherits the parent's queue handler but not its listener thread,
+    so records would pile up on a queue nothing drains. The inherited objects
+    are dropped without stopping them (they belong to the parent) and the
+    same configuration is set up again for the child.
+    """
+    global _listener, _queue_handler, _configure_lock
+    _configure_lock = threading.Lock()  # May have been held at fork time
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+    _listener = _queue_handler = None
+    if _config is not None:
+        configure_logging(**_config)
+        # multiprocessing children leave through os._exit(), skipping atexit
+        multiprocessing.util.Finalize(None, shutdown_logging, exitpriority=0)
+
+
+atexit.register(shutdown_logging)
+os.register_at_fork(after_in_child=_reconfigure_after_fork)
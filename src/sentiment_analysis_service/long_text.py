@@ -0,0 +1,136 @@
+# src/sentiment_analysis_service/long_text.py
+"""
+Bounded-cost handling of very long input texts.
+
+Preprocessing and vectorizing are linear in the text length, so a single
+multi-megabyte paste can hold a worker for far longer than normal traffic.
+The policy is applied to raw texts before preprocessing:
+
+- "truncate": keep the first `head_fraction` of `max_chars` characters and
+  the last remainder. Openings and conclusions carry most of the sentiment
+  of long reviews.
+- "chunk": split into pieces of `max_chars` characters, score each one and
+  average the decision scores. Texts with more than `max_chunks` pieces are
+  represented by `max_chunks` evenly spaced pieces, including the first and
+  last.
+- "none": score the full text.
+
+Cuts are moved to the nearest whitespace (within a short window) so words
+are not split.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+
+from .config import (
+    LONG_TEXT_HEAD_FRACTION,
+    LONG_TEXT_MAX_CHARS,
+    LONG_TEXT_MAX_CHUNKS,
+    LONG_TEXT_POLICY,
+)
+
+LONG_TEXT_POLICIES = ("none", "truncate", "chunk")
+# Action reported per item, by policy mode
+ACTIONS = {"truncate": "truncated", "chunk": "chunked"}
+
+# How far a cut may move to reach whitespace
+_BOUNDARY_WINDOW = 64
+_WHITESPACE_RE = re.compile(r"\s")
+_LAST_WHITESPACE_RE = re.compile(r"\s(?=\S*$)")
+
+
+def _cut_end(text: str, end: int) -> int:
+    """Moves a slice end back to the last whitespace before it."""
+    if end >= len(text):
+        return len(text)
+    window_start = max(0, end - _BOUNDARY_WINDOW)
+    match = _LAST_WHITESPACE_RE.search(text, window_start, end)
+    return match.start() if match else end
+
+
+def _cut_start(text: str, start: int) -> int:
+    """Moves a slice start forward past the next whitespace after it."""
+    if start <= 0:
+        return 0
+    match = _WHITESPACE_RE.search(text, start, start + _BOUNDARY_WINDOW)
+    return match.end() if match else start
+
+
+@dataclass(frozen=True)
+class LongTextPolicy:
+    """How texts longer than `max_chars` are reduced before scoring."""
+
+    mode: str = LONG_TEXT_POLICY
+    max_chars: int = LONG_TEXT_MAX_CHARS
+    head_fraction: float = LONG_TEXT_HEAD_FRACTION
+    max_chunks: int = LONG_TEXT_MAX_CHUNKS
+
+    def __post_init__(self):
+        if self.mode not in LONG_TEXT_POLICIES:
+            raise ValueError(
+                f"Unknown long-text policy '{self.mode}'. "
+                f"Expected one of {LONG_TEXT_POLICIES}."
+            )
+        if self.max_chars < 1 or self.max_chunks < 1:
+            raise ValueError("max_chars and max_chunks must be at least 1.")
+        if not 0.0 <= self.head_fraction <= 1.0:
+            raise ValueError("head_fraction must be between 0 and 1.")
+
+    def actions(self, texts: Sequence[Any]) -> Dict[int, str]:
+        """
+        Returns {index: action} for the texts this policy changes.
+
+        The action is "truncated" or "chunked"; texts within `max_chars`
+        (and every text under the "none" policy) are left out.
+        """
+        if self.mode == "none":
+            return {}
+        action = ACTIONS[self.mode]
+        max_chars = self.max_chars
+        return {
+            i: action
+            for i, text in enumerate(texts)
+            if isinstance(text, str) and len(text) > max_chars
+        }
+
+    def truncate(self, text: str) -> str:
+        """Keeps the head and tail of `text`, at most `max_chars` characters."""
+        if len(text) <= self.max_chars:
+            return text
+        head_chars = int(self.max_chars * self.head_fraction)
+        tail_chars = self.max_chars - head_chars
+        head = text[: _cut_end(text, head_chars)] if head_chars else ""
+        tail = text[_cut_start(text, len(text) - tail_chars) :] if tail_chars else ""
+        return f"{head} {tail}" if head and tail else head or tail
+
+    def chunks(self, text: str) -> List[str]:
+        """Splits `text` into at most `max_chunks` pieces of up to `max_chars`."""
+        size = self.max_chars
+        if len(text) <= size:
+            return [text]
+        if len(text) <= size * self.max_chunks:
+            # Contiguous pieces sharing their cut points, so no word is lost
+            pieces = []
+            start = 0
+            while start < len(text) and len(pieces) <= self.max_chunks:
+                end = _cut_end(text, start + size)
+                if end <= start:
+                    end = start + size  # No whitespace nearby: hard cut
+                pieces.append(text[start:end])
+                start = end
+            if len(pieces) <= self.max_chunks:
+                return pieces
+        # Evenly spaced windows; only these slices are ever copied
+        last = len(text) - size
+        starts = [
+            round(i * last / (self.max_chunks - 1)) if self.max_chunks > 1 else 0
+            for i in range(self.max_chunks)
+        ]
+        pieces = []
+        for start in starts:
+            begin, end = _cut_start(text, start), _cut_end(text, start + size)
+            pieces.append(
+                text[begin:end] if end > begin else text[start : start + size]
+            )
+        return pieces
@@ -1,25 +1,120 @@
 # src/sentiment_analysis_service/main.py
+import asyncio
 import logging
+import secrets
 import time  # Import time module for latency calculation
-import json  # Import json for structured logging
-from fastapi import FastAPI, HTTPException, Request, Response  # Added Response
+from collections import Counter
+from pathlib import Path
+from typing import Literal, Optional, Union
+from fastapi import (  # Added Response
+    Body,
+    FastAPI,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 
 # Import schemas, config, and prediction function
-from .schemas import PredictRequest, PredictResponse, PredictionResult
-from .config import LOG_FORMAT, LOG_LEVEL, LOG_FILE, MODEL_PATH
+from .schemas import (
+    ColumnarPredictResponse,
+    JobResults,
+    JobStatus,
+    PredictRequest,
+    PredictResponse,
+    PredictionResult,
+    ProfilingRequest,
+    ReloadRequest,
+)
+from .config import (
+    ADMIN_TOKEN,
+    BATCHING_ENABLED,
+    DEADLINE_HEADER,
+    JOBS_CHUNK_SIZE,
+    JOBS_MAX_ITEMS,
+    JOBS_RESULTS_PAGE_SIZE,
+    MODEL_DIR,
+    PROFILE_HEADER,
+    PROFILE_SAMPLE_MODE,
+    RESPONSE_FORMAT,
+    SERVING_MODEL_PATH,
+)
+from .logging_setup import (
+    configure_logging,
+    dropped_records,
+    is_request_sampled,
+    sample_request,
+    shutdown_logging,
+)
+from .admission import AdmissionController, AdmissionError, parse_deadline, remaining
+from .binary import (
+    BinaryRequestError,
+    UnsupportedFormatError,
+    binary_format,
+    decode_request,
+    encode_response,
+    media_type as binary_media_type,
+)
 from .predict import (
     predict,
+    predict_labels,
+    predict_probabilities,
     load_model,
-    _model_pipeline,
-)  # Import _model_pipeline for check
+    is_model_loaded,
+    get_cache_stats,
+    get_model_version,
+    get_model_load_info,
+    get_model_manager,
+    get_model_status,
+    get_long_text_policy,
+    get_sharding_stats,
+    get_shadow_stats,
+    configure_shadow_models,
+    shutdown_shadow_scoring,
+    start_shard_pool,
+    shutdown_shard_pool,
+)
+from .metrics import (
+    BATCH_SIZE,
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    REGISTRY,
+    REQUEST_SECONDS,
+    REQUESTS_IN_FLIGHT,
+    STAGE_SECONDS,
+    Gauge,
+    render as render_metrics,
+)
+from .serialization import (
+    RESPONSE_FORMATS,
+    FastJSONResponse,
+    columnar_payload,
+    standard_payload,
+)
+from .executor import InferenceExecutor
+from .batching import MicroBatcher
+from .jobs import JobNotFoundError, JobRunner, JobStateError, JobStore
+from .profiling import Profiler, run_profiled, server_timing
+from .streaming import (
+    LineTooLongError,
+    RequestStreamingResponse,
+    chunk_texts,
+    is_ndjson,
+    iter_chunks,
+    iter_lines,
+    merge_results,
+    to_ndjson,
+)
 from . import __version__
 
 # --- Logging Setup ---
 # Configure logging (ensure it's set up before FastAPI instance)
-# Consider using a JSON formatter for better parsing in Cloud Logging later
-# For now, stick to basic formatting configured in config.py
-logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT, filename=LOG_FILE, filemode="a")
+# Records go through a queue to a background writer as JSON lines (LOG_JSON)
+# and INFO records are kept for a LOG_SAMPLE_RATE fraction of requests
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # --- Application Metadata ---
@@ -39,29 +134,143 @@ app = FastAPI(
 )
 
 
+# --- Inference Executor ---
+# Runs predict() off the event loop so /health and other requests stay responsive
+inference_executor = InferenceExecutor()
+# Optional layer that merges concurrent small requests into one predict() call
+batcher = MicroBatcher(inference_executor) if BATCHING_ENABLED else None
+# Sheds requests over the size limits or the in-flight item budget
+admission = AdmissionController()
+# Endpoints that read their whole body before the handler runs; their size
+# is checked against ADMISSION_MAX_BODY_BYTES first
+_BUFFERED_BODY_PATHS = ("/predict", "/predict/binary")
+# Scores /jobs submissions from the SQLite spool (JOBS_DB_PATH) as
+# low-priority executor calls, behind interactive requests
+job_runner = JobRunner(JobStore(), inference_executor)
+# Opt-in per-request profiling (PROFILE_HEADER, PROFILE_SAMPLE_RATE). Without
+# an admin token only the cheap "stages" mode can be sampled
+if not ADMIN_TOKEN and PROFILE_SAMPLE_MODE != "stages":
+    logger.warning(
+        f"PROFILE_SAMPLE_MODE={PROFILE_SAMPLE_MODE} needs ADMIN_TOKEN; "
+        "sampling stage timings only."
+    )
+profiler = Profiler(sample_mode=PROFILE_SAMPLE_MODE if ADMIN_TOKEN else "stages")
+# Process workers hold their own model copy; restart them after a hot reload
+get_model_manager().add_listener(lambda loaded: inference_executor.recycle(loaded.path))
+
+# Executor and batcher gauges are read when /metrics is scraped
+Gauge(
+    "sentiment_executor_in_flight",
+    "predict() calls queued or running on the inference executor.",
+    registry=REGISTRY,
+).set_function(lambda: inference_executor.in_flight)
+Gauge(
+    "sentiment_batcher_queue_depth",
+    "Texts waiting in the micro-batcher queue.",
+    registry=REGISTRY,
+).set_function(lambda: batcher.stats()["queue_depth"] if batcher is not None else 0)
+Gauge(
+    "sentiment_admission_in_flight_items",
+    "Items of admitted prediction requests still being processed.",
+    registry=REGISTRY,
+).set_function(lambda: admission.in_flight_items)
+
+
 # --- Middleware for Request Logging and Timing ---
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     """Middleware to log requests and calculate processing time."""
-    start_time = time.time()
+    start_time = time.perf_counter()  # Monotonic: immune to wall-clock jumps
+    # Shared with the endpoint, which times its own stages from here
+    request.state.start_time = start_time
+    # Decide once per request whether its INFO records are logged
+    sample_request()
+    # Oversized bodies are refused before they are read, let alone decoded
+    if request.method == "POST" and request.url.path in _BUFFERED_BODY_PATHS:
+        try:
+            admission.check_body_size(request.headers.get("Content-Length"))
+        except AdmissionError as e:
+            return await admission_exception_handler(request, e)
+    # ...and whether it is profiled; nothing else is done when profiling is off
+    requested_profile = request.headers.get(PROFILE_HEADER)
+    if requested_profile is not None or profiler.sample_rate:
+        # Any client could otherwise turn on process-wide tracemalloc
+        if requested_profile is not None and not _admin_token_valid(
+            request.headers.get("X-Admin-Token")
+        ):
+            return JSONResponse(
+                status_code=403,
+                content={"detail": f"{PROFILE_HEADER} needs a valid X-Admin-Token."},
+            )
+        try:
+            request.state.profile_mode = profiler.choose_mode(requested_profile)
+        except ValueError as e:
+            return JSONResponse(status_code=400, content={"detail": str(e)})
     # Log basic request info before processing
     # logger.info(f"Request started: {request.method} {request.url.path}") # Can be verbose
 
-    response = await call_next(request)  # Process the request
+    REQUESTS_IN_FLIGHT.inc()
+    try:
+        response = await call_next(request)  # Process the request
+    finally:
+        REQUESTS_IN_FLIGHT.dec()
 
-    process_time = (time.time() - start_time) * 1000  # Calculate time in ms
+    end_time = time.perf_counter()
+    # Response stage: from predictions being ready to the rendered response
+    response_start = getattr(request.state, "response_start", None)
+    if response_start is not None:
+        STAGE_SECONDS.labels("response").observe(end_time - response_start)
+    # Label by route template, not raw path, to keep the series bounded
+    route = request.scope.get("route")
+    REQUEST_SECONDS.labels(getattr(route, "path", "unmatched")).observe(
+        end_time - start_time
+    )
+    process_time = (end_time - start_time) * 1000  # Calculate time in ms
     formatted_process_time = f"{process_time:.2f}"
 
     # Log basic info after processing, including status code and time
     logger.info(
-        f"Request completed: {request.method} {request.url.path} "
-        f"Status={response.status_code} Duration={formatted_process_time}ms"
+        "Request completed: %s %s Status=%s Duration=%sms",
+        request.method,
+        request.url.path,
+        response.status_code,
+        formatted_process_time,
     )
     # Add custom header with process time
     response.headers["X-Process-Time-Ms"] = formatted_process_time
+    profile = getattr(request.state, "profile", None)
+    if profile is not None:
+        _save_profile(request, response, profile, start_time, end_time)
     return response
 
 
+def _save_profile(
+    request: Request,
+    response: Response,
+    profile: dict,
+    start_time: float,
+    end_time: float,
+) -> None:
+    """Adds the request-level stages to a profile, stores it and reports it."""
+    stages = {}
+    parse_seconds = getattr(request.state, "parse_seconds", None)
+    if parse_seconds is not None:
+        stages["parse"] = {"seconds": parse_seconds, "calls": 1}
+    stages.update(profile["stages"])  # queue, then the predict() stages
+    response_start = getattr(request.state, "response_start", None)
+    if response_start is not None:
+        stages["response"] = {"seconds": end_time - response_start, "calls": 1}
+    profile.update(
+        stages=stages,
+        request_seconds=end_time - start_time,
+        status_code=response.status_code,
+        request_id=request.headers.get("X-Request-ID"),
+        created_at=time.time(),
+    )
+    response.headers["X-Profile-Id"] = profiler.save(profile)
+    response.headers["Server-Timing"] = server_timing(profile)
+
+
 # --- Model Loading on Startup ---
 @app.on_event("startup")
 async def startup_event():
@@ -72,6 +281,35 @@ async def startup_event():
         logger.info("Model loaded successfully.")
     except Exception as e:
         logger.error(f"Application startup: Failed to load model: {e}", exc_info=True)
+    # Picks up new artifacts at SERVING_MODEL_PATH (MODEL_WATCH_INTERVAL_S)
+    get_model_manager().start_watching()
+    try:
+        configure_shadow_models()  # SHADOW_MODELS
+    except Exception as e:
+        # A broken candidate must not keep production from serving
+        logger.error(f"Failed to load shadow models: {e}", exc_info=True)
+    if is_model_loaded():
+        # Shard workers load the model now, not on the first huge batch
+        await asyncio.to_thread(start_shard_pool)
+    inference_executor.start()
+    if batcher is not None:
+        batcher.start()
+    # Resumes jobs left unfinished by the previous process
+    await job_runner.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the batcher and inference executor when the application shuts down."""
+    get_model_manager().stop_watching()
+    # Chunks being scored are scored again after the next startup
+    await job_runner.stop()
+    if batcher is not None:
+        await batcher.stop()
+    inference_executor.shutdown()
+    shutdown_shard_pool()
+    shutdown_shadow_scoring()
+    shutdown_logging()  # Flush queued log records
 
 
 # --- Custom Exception Handler ---
@@ -87,6 +325,91 @@ async def generic_exception_handler(request: Request, exc: Exception):
     )
 
 
+@app.exception_handler(AdmissionError)
+async def admission_exception_handler(request: Request, exc: AdmissionError):
+    """Answers shed requests at once, with Retry-After when retrying can help."""
+    headers = {"Retry-After": str(exc.retry_after)} if exc.retry_after else None
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": str(exc), "reason": exc.reason},
+        headers=headers,
+    )
+
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """
+    Answers the size limits in PredictRequest like admission control (413).
+
+    The schema checks them during validation, before a handler could call
+    admission.check_size(); everything else gets FastAPI's usual 422.
+    """
+    for error in exc.errors():
+        loc = error["loc"]
+        if error["type"] == "too_long" and loc == ("body", "inputs"):
+            shed = admission.too_many_items(error["ctx"]["actual_length"])
+            return await admission_exception_handler(request, shed)
+        if error["type"] == "string_too_long" and loc[:2] == ("body", "inputs"):
+            shed = admission.text_too_long(loc[2], len(error["input"]))
+            return await admission_exception_handler(request, shed)
+    return await request_validation_exception_handler(request, exc)
+
+
+async def _run_admitted(raw_request: Request, func, texts, *args):
+    """
+    Admits `texts` and runs `func(texts, *args)` on the inference executor.
+
+    The request's deadline header, if any, bounds the wait for an executor
+    slot. Merged micro-batches (plain predict() with batching enabled) go
+    through the batcher instead, without a slot deadline.
+
+    Raises:
+        AdmissionError: If the request is shed (see admission.py).
+    """
+    deadline = parse_deadline(
+        raw_request.headers.get(DEADLINE_HEADER), raw_request.state.start_time
+    )
+    profile_mode = getattr(raw_request.state, "profile_mode", None)
+    admission.check_size(texts)
+    with admission.admit(len(texts), deadline):
+        if func is predict and not args and batcher is not None and not profile_mode:
+            return await batcher.submit(texts)
+        try:
+            if profile_mode is not None:
+                return await _run_profiled(
+                    raw_request, profile_mode, deadline, func, texts, *args
+                )
+            return await inference_executor.run(
+                func, texts, *args, timeout=remaining(deadline)
+            )
+        except asyncio.TimeoutError:
+            raise admission.deadline_exceeded()
+
+
+async def _run_profiled(
+    raw_request: Request, mode: str, deadline: Optional[float], func, texts, *args
+):
+    """
+    Runs `func(texts, *args)` under profiling on the inference executor.
+
+    Profiled calls skip the micro-batcher so the report covers this
+    request alone, but wait for a slot within the deadline like any other.
+    The report is left on the request for the middleware.
+    """
+    submitted = time.perf_counter()
+    result, profile = await inference_executor.run(
+        run_profiled, mode, func, texts, *args, timeout=remaining(deadline)
+    )
+    waited = time.perf_counter() - submitted - profile["seconds"]
+    profile["stages"] = {
+        "queue": {"seconds": max(waited, 0.0), "calls": 1},
+        **profile["stages"],
+    }
+    profile.update(path=raw_request.url.path, items=len(texts))
+    raw_request.state.profile = profile
+    return result
+
+
 # --- API Endpoints ---
 
 
@@ -100,7 +423,7 @@ async def read_root():
 @app.get("/health", tags=["General"])
 # ... (keep health endpoint as before, maybe add check for model object) ...
 async def health_check():
-    model_loaded = _model_pipeline is not None  # Check if model object exists
+    model_loaded = is_model_loaded()  # Check if model object exists
     status = "OK" if model_loaded else "ERROR"
     status_code = 200 if model_loaded else 503  # 503 Service Unavailable
     logger.info(f"Health check performed. Model loaded: {model_loaded}")
@@ -110,23 +433,207 @@ async def health_check():
     )
 
 
-@app.post("/predict", response_model=PredictResponse, tags=["Prediction"])
-async def post_predict(request: PredictRequest) -> PredictResponse:
+@app.get("/stats", tags=["Monitoring"])
+async def get_stats():
+    """Returns runtime statistics for the inference executor and batcher."""
+    return {
+        "executor": {
+            "kind": inference_executor.kind,
+            "workers": inference_executor.max_workers,
+            "max_in_flight": inference_executor.max_in_flight,
+            "in_flight": inference_executor.in_flight,
+            "background_in_flight": inference_executor.background_in_flight,
+        },
+        "jobs": await asyncio.to_thread(job_runner.store.stats),
+        "batching": batcher.stats() if batcher is not None else None,
+        "sharding": get_sharding_stats(),
+        # Per-process, like the cache: process workers mirror their own batches
+        "shadow": get_shadow_stats(),
+        # Per-process: with the process executor each worker keeps its own cache
+        "cache": get_cache_stats(),
+        "model_version": get_model_version(),
+        "model_load": get_model_load_info(),
+        "model": get_model_status(),
+        "admission": {
+            "in_flight_items": admission.in_flight_items,
+            "max_in_flight_items": admission.max_in_flight_items,
+            "max_items": admission.max_items,
+            "max_text_chars": admission.max_text_chars,
+            "max_body_bytes": admission.max_body_bytes,
+        },
+        "profiling": profiler.stats(),
+        "log_dropped_records": dropped_records(),
+    }
+
+
+@app.get("/metrics", tags=["Monitoring"])
+async def get_metrics():
+    """Exposes latency, batch-size and in-flight metrics in Prometheus format."""
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
+def _allowed_model_path(model_path: Optional[str]) -> Optional[Path]:
+    """Resolves a requested artifact path; it must be inside the models directory."""
+    if model_path is None:
+        return None
+    path = Path(model_path)
+    if not path.is_absolute():
+        path = MODEL_DIR / path
+    path = path.resolve()
+    allowed = (MODEL_DIR.resolve(), SERVING_MODEL_PATH.resolve().parent)
+    if not any(path.is_relative_to(root) for root in allowed):
+        raise HTTPException(
+            status_code=400, detail="model_path must be inside the models directory."
+        )
+    return path
+
+
+def _admin_token_valid(x_admin_token: Optional[str]) -> bool:
+    """True if ADMIN_TOKEN is configured and `x_admin_token` matches it."""
+    if not ADMIN_TOKEN or x_admin_token is None:
+        return False
+    return secrets.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode())
+
+
+def _check_admin_token(x_admin_token: Optional[str]) -> None:
+    """Rejects /admin requests without the right X-Admin-Token."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=403, detail="Admin endpoints are disabled; set ADMIN_TOKEN."
+        )
+    if not _admin_token_valid(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token.")
+
+
+@app.post("/admin/reload", tags=["Admin"])
+async def post_admin_reload(
+    request: Optional[ReloadRequest] = Body(None),
+    x_admin_token: Optional[str] = Header(None),
+):
+    """
+    Loads, warms up and swaps in a model without dropping requests.
+
+    In-flight requests finish on the previous model. If the new artifact
+    fails to load or warm up, the previous model keeps serving and the error
+    is returned. Requires ADMIN_TOKEN to be set and sent as X-Admin-Token.
+    """
+    _check_admin_token(x_admin_token)
+    model_path = _allowed_model_path(request.model_path if request else None)
+    manager = get_model_manager()
+    previous = get_model_version()
+    try:
+        # Loading and warm-up run off the event loop; serving continues meanwhile
+        await asyncio.to_thread(manager.load, model_path)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Model reload failed, keeping current model: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail={"error": f"Reload failed: {e}", "model": get_model_status()},
+        )
+    logger.info(f"Model reloaded: {previous} -> {get_model_version()}")
+    return {"previous_version": previous, "model": get_model_status()}
+
+
+@app.get("/admin/profiling", tags=["Admin"])
+async def get_admin_profiling(x_admin_token: Optional[str] = Header(None)):
+    """Returns the profiling settings and how many requests were profiled."""
+    _check_admin_token(x_admin_token)
+    return profiler.stats()
+
+
+@app.post("/admin/profiling", tags=["Admin"])
+async def post_admin_profiling(
+    request: ProfilingRequest, x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Turns sampled profiling on or off at runtime.
+
+    A fraction `sample_rate` of /predict and /predict/binary requests is
+    profiled in `sample_mode`; 0 turns sampling off. Requests sending the
+    PROFILE_HEADER header are profiled regardless.
+    """
+    _check_admin_token(x_admin_token)
+    try:
+        profiler.configure(request.sample_rate, request.sample_mode)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logger.info(f"Profiling settings changed: {profiler.stats()}")
+    return profiler.stats()
+
+
+@app.get("/admin/profiles", tags=["Admin"])
+async def get_admin_profiles(x_admin_token: Optional[str] = Header(None)):
+    """Lists the stored request profiles, newest first."""
+    _check_admin_token(x_admin_token)
+    return {"profiles": profiler.list()}
+
+
+@app.get("/admin/profiles/{profile_id}", tags=["Admin"])
+async def get_admin_profile(
+    profile_id: str, x_admin_token: Optional[str] = Header(None)
+):
+    """Returns one stored profile (the id is in the X-Profile-Id header)."""
+    _check_admin_token(x_admin_token)
+    try:
+        return profiler.get(profile_id)
+    except KeyError:
+        raise HTTPException(
+            status_code=404, detail=f"Profile {profile_id} not found or evicted."
+        )
+
+
+# standard and fast share PredictResponse; columnar has its own shape
+@app.post(
+    "/predict",
+    response_model=Union[PredictResponse, ColumnarPredictResponse],
+    tags=["Prediction"],
+)
+async def post_predict(
+    request: PredictRequest,
+    raw_request: Request,
+    response_format: Optional[Literal[RESPONSE_FORMATS]] = Query(
+        None,
+        alias="format",
+        description="standard (default), fast (same JSON, no per-item models) "
+        "or columnar (parallel arrays).",
+    ),
+    probabilities: bool = Query(
+        False,
+        description="Also return confidence and per-label probabilities, "
+        "computed in the same model pass as the labels.",
+    ),
+    top_k: Optional[int] = Query(
+        None,
+        ge=1,
+        description="Only return the k most probable labels (implies "
+        "probabilities=true).",
+    ),
+) -> Union[PredictResponse, Response]:
     """
     Perform sentiment analysis on a batch of text inputs.
 
-    Logs input summary and prediction results for monitoring.
+    Logs input summary and prediction results for monitoring. The standard
+    and fast formats answer with a PredictResponse, columnar with a
+    ColumnarPredictResponse; fast and columnar are serialized directly
+    into a Response, without building the models.
     """
-    request_id = request.headers.get(
+    # Parse stage: body read, JSON decoding and validation, done by FastAPI
+    # between the middleware and this handler
+    raw_request.state.parse_seconds = time.perf_counter() - raw_request.state.start_time
+    STAGE_SECONDS.labels("parse").observe(raw_request.state.parse_seconds)
+    request_id = raw_request.headers.get(
         "X-Request-ID", "N/A"
     )  # Get request ID if available from upstream (e.g., API Gateway/LB)
     num_items = len(request.inputs)
+    BATCH_SIZE.labels("request").observe(num_items)
     logger.info(
-        f"Prediction request received. RequestID={request_id}, Items={num_items}"
+        "Prediction request received. RequestID=%s, Items=%d", request_id, num_items
     )
 
     # Check if model is loaded (important after startup)
-    if _model_pipeline is None:
+    if not is_model_loaded():
         logger.error("Prediction attempt failed: Model is not loaded.")
         raise HTTPException(
             status_code=503, detail="Model not available. Please check service health."
@@ -141,40 +648,55 @@ async def post_predict(request: PredictRequest) -> PredictResponse:
 
     # Call the prediction logic from predict.py
     try:
-        prediction_dicts = predict(
-            input_texts
-        )  # This function already has some logging
-        prediction_results = [PredictionResult(**p) for p in prediction_dicts]
+        # Runs on the inference executor; this function already has some logging
+        if probabilities or top_k is not None:
+            prediction_dicts = await _run_admitted(
+                raw_request, predict, input_texts, True, top_k
+            )
+        else:
+            prediction_dicts = await _run_admitted(raw_request, predict, input_texts)
+        # Building and serializing the response is timed by the middleware
+        raw_request.state.response_start = time.perf_counter()
+        response_format = response_format or RESPONSE_FORMAT
+        if response_format == "columnar":
+            response = FastJSONResponse(columnar_payload(prediction_dicts))
+        elif response_format == "fast":
+            response = FastJSONResponse(standard_payload(prediction_dicts))
+        else:
+            prediction_results = [PredictionResult(**p) for p in prediction_dicts]
+            response = PredictResponse(predictions=prediction_results)
 
         # --- Enhanced Logging for Monitoring ---
         # Log summary and potentially sampled data
         # Avoid logging all data if volume is high or data is sensitive
-        log_entry = {
-            "request_id": request_id,
-            "input_count": len(input_texts),
-            "output_count": len(prediction_results),
-            # Example: Log first input text (truncated) and its prediction
-            "sample_input": (
-                input_texts[0][:100] if input_texts else None
-            ),  # Log first 100 chars
-            "sample_output": (
-                prediction_results[0].model_dump() if prediction_results else None
-            ),  # Use .model_dump() for Pydantic v2+
-            # Example: Log distribution of predictions in this batch
-            "prediction_distribution": {
-                sentiment: sum(
-                    1 for p in prediction_results if p.sentiment == sentiment
-                )
-                for sentiment in set(
-                    p.sentiment for p in prediction_results if p.sentiment
-                )
-            },
-        }
-        # Use json.dumps for structured logging (easier parsing in Cloud Logging)
-        logger.info(f"Prediction batch processed: {json.dumps(log_entry)}")
+        # The summary is only built if the record will actually be written
+        if logger.isEnabledFor(logging.INFO) and is_request_sampled():
+            log_entry = {
+                "request_id": request_id,
+                "input_count": len(input_texts),
+                "output_count": len(prediction_dicts),
+                # Example: Log first input text (truncated) and its prediction
+                "sample_input": (
+                    input_texts[0][:100] if input_texts else None
+                ),  # Log first 100 chars
+                "sample_output": (
+                    prediction_dicts[0] if prediction_dicts else None
+                ),  # Serialized by the log formatter
+                # Distribution of predictions in this batch (single pass)
+                "prediction_distribution": dict(
+                    Counter(
+                        p["sentiment"] for p in prediction_dicts if p.get("sentiment")
+                    )
+                ),
+                "response_format": response_format,
+            }
+            # Structured fields are serialized by the log formatter, off the hot path
+            logger.info("Prediction batch processed", extra={"fields": log_entry})
 
-        return PredictResponse(predictions=prediction_results)
+        return response
 
+    except AdmissionError:
+        raise  # Answered by admission_exception_handler
     except FileNotFoundError as e:
         logger.error(f"Prediction error: Model file not found: {e}", exc_info=True)
         raise HTTPException(status_code=503, detail="Model not available.")
@@ -183,3 +705,249 @@ async def post_predict(request: PredictRequest) -> PredictResponse:
             f"Prediction error: An unexpected error occurred: {e}", exc_info=True
         )
         raise HTTPException(status_code=500, detail=f"Prediction failed: {e}")
+
+
+@app.post("/predict/binary", tags=["Prediction"])
+async def post_predict_binary(
+    raw_request: Request,
+    probabilities: bool = Query(
+        False, description="Also return confidence and per-label probabilities."
+    ),
+):
+    """
+    Sentiment analysis for internal high-throughput clients, in binary framing.
+
+    Accepts a msgpack map `{"texts": [...]}` (`Content-Type:
+    application/msgpack`) or an Arrow IPC stream with a string column
+    `text` (`application/vnd.apache.arrow.stream`), and answers in the same
+    format with the labels as one column (see binary.py). Texts follow the
+    same rules as /predict; errors use the same status codes and JSON
+    `detail` bodies.
+    """
+    request_id = raw_request.headers.get("X-Request-ID", "N/A")
+    try:
+        fmt = binary_format(raw_request.headers.get("content-type", ""))
+        texts = decode_request(await raw_request.body(), fmt)
+    except UnsupportedFormatError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except BinaryRequestError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+    raw_request.state.parse_seconds = time.perf_counter() - raw_request.state.start_time
+    STAGE_SECONDS.labels("parse").observe(raw_request.state.parse_seconds)
+    BATCH_SIZE.labels("request").observe(len(texts))
+    logger.info(
+        "Binary prediction request received. RequestID=%s, Items=%d, Format=%s",
+        request_id,
+        len(texts),
+        fmt,
+    )
+
+    if not is_model_loaded():
+        logger.error("Binary prediction failed: Model is not loaded.")
+        raise HTTPException(
+            status_code=503, detail="Model not available. Please check service health."
+        )
+
+    try:
+        # Labels (and probability arrays) only: no per-item dicts are built
+        # for binary clients
+        matrix = classes = None
+        if probabilities:
+            labels, matrix, classes = await _run_admitted(
+                raw_request, predict_probabilities, texts
+            )
+        else:
+            labels = await _run_admitted(raw_request, predict_labels, texts)
+        raw_request.state.response_start = time.perf_counter()
+        # Same policy predict_labels() applied, recomputed from lengths only
+        long_text = get_long_text_policy().actions(texts)
+        return Response(
+            content=encode_response(labels, fmt, long_text, matrix, classes),
+            media_type=binary_media_type(fmt),
+        )
+    except AdmissionError:
+        raise  # Answered by admission_exception_handler
+    except FileNotFoundError as e:
+        logger.error(f"Prediction error: Model file not found: {e}", exc_info=True)
+        raise HTTPException(status_code=503, detail="Model not available.")
+    except Exception as e:
+        logger.error(
+            f"Prediction error: An unexpected error occurred: {e}", exc_info=True
+        )
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {e}")
+
+
+@app.post("/predict/stream", tags=["Prediction"])
+async def post_predict_stream(raw_request: Request):
+    """
+    Stream sentiment predictions for very large batches.
+
+    The request body is read incrementally as newline-delimited JSON
+    (`Content-Type: application/x-ndjson`, one `{"text": ...}` object or JSON
+    string per line) or as plain text with one input per line. Lines are
+    scored in chunks and results are streamed back as NDJSON, one record per
+    input line in input order (blank lines are skipped), as soon as each
+    chunk finishes. A malformed line produces an `{"line": n, "error": ...}`
+    record in its place instead of failing the whole request.
+    """
+    request_id = raw_request.headers.get("X-Request-ID", "N/A")
+    if not is_model_loaded():
+        logger.error("Streaming prediction failed: Model is not loaded.")
+        raise HTTPException(
+            status_code=503, detail="Model not available. Please check service health."
+        )
+    ndjson = is_ndjson(raw_request.headers.get("content-type", ""))
+
+    async def results():
+        total = 0
+        try:
+            lines = iter_lines(raw_request.stream())
+            async for entries in iter_chunks(lines, ndjson):
+                texts = chunk_texts(entries)
+                results = await inference_executor.run(predict, texts) if texts else []
+                yield to_ndjson(merge_results(entries, results))
+                total += len(texts)
+        except LineTooLongError as e:
+            logger.warning(f"Streaming prediction aborted. RequestID={request_id}: {e}")
+            yield to_ndjson([{"error": str(e)}])
+        logger.info(
+            f"Streaming prediction completed. RequestID={request_id}, Items={total}"
+        )
+
+    return RequestStreamingResponse(results(), media_type="application/x-ndjson")
+
+
+def _job_not_found(job_id: str) -> HTTPException:
+    return HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+
+
+def _check_job_size(n_items: int) -> None:
+    if JOBS_MAX_ITEMS and n_items > JOBS_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413, detail=f"Jobs are limited to {JOBS_MAX_ITEMS} items."
+        )
+
+
+@app.post("/jobs", response_model=JobStatus, status_code=202, tags=["Jobs"])
+async def post_job(
+    request: PredictRequest,
+    probabilities: bool = Query(
+        False, description="Also return confidence and per-label probabilities."
+    ),
+):
+    """
+    Submit a batch for asynchronous scoring.
+
+    The inputs are spooled to disk and scored in the background, after any
+    interactive /predict traffic. Poll GET /jobs/{job_id} for progress and
+    page through GET /jobs/{job_id}/results.
+    """
+    texts = [item.text for item in request.inputs]
+    _check_job_size(len(texts))
+    store = job_runner.store
+
+    def spool():
+        job_id = store.create_job(probabilities)
+        for start in range(0, len(texts), JOBS_CHUNK_SIZE):
+            store.add_chunk(job_id, texts[start : start + JOBS_CHUNK_SIZE])
+        store.finish_submission(job_id)
+        return store.get_job(job_id)
+
+    job = await asyncio.to_thread(spool)
+    job_runner.notify()
+    logger.info(f"Job submitted: JobID={job['job_id']}, Items={len(texts)}")
+    return job
+
+
+@app.post("/jobs/file", response_model=JobStatus, status_code=202, tags=["Jobs"])
+async def post_job_file(
+    raw_request: Request,
+    probabilities: bool = Query(
+        False, description="Also return confidence and per-label probabilities."
+    ),
+):
+    """
+    Submit a file for asynchronous scoring.
+
+    The body is read like /predict/stream (NDJSON or one text per line) and
+    spooled in chunks as it arrives, so files of any size can be submitted.
+    Each malformed line gets an `{"line": n, "error": ...}` record in its
+    place in the results.
+    """
+    ndjson = is_ndjson(raw_request.headers.get("content-type", ""))
+    store = job_runner.store
+    job_id = await asyncio.to_thread(store.create_job, probabilities)
+    n_items = 0
+    try:
+        lines = iter_lines(raw_request.stream())
+        async for entries in iter_chunks(lines, ndjson, JOBS_CHUNK_SIZE):
+            n_items += len(entries)
+            _check_job_size(n_items)
+            await asyncio.to_thread(store.add_chunk, job_id, entries)
+        await asyncio.to_thread(store.finish_submission, job_id)
+    except Exception as e:
+        # The partial upload is kept as a failed job so its id stays valid
+        await asyncio.to_thread(store.fail_job, job_id, f"Upload failed: {e}")
+        if isinstance(e, LineTooLongError):
+            raise HTTPException(status_code=413, detail=str(e))
+        raise
+    job_runner.notify()
+    logger.info(f"File job submitted: JobID={job_id}, Items={n_items}")
+    return await asyncio.to_thread(store.get_job, job_id)
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus, tags=["Jobs"])
+async def get_job(job_id: str):
+    """Returns a job's status and progress."""
+    try:
+        return await asyncio.to_thread(job_runner.store.get_job, job_id)
+    except JobNotFoundError:
+        raise _job_not_found(job_id)
+
+
+@app.get("/jobs/{job_id}/results", response_model=JobResults, tags=["Jobs"])
+async def get_job_results(
+    job_id: str,
+    offset: int = Query(0, ge=0, description="Index of the first result."),
+    limit: int = Query(
+        JOBS_RESULTS_PAGE_SIZE,
+        ge=1,
+        le=JOBS_RESULTS_PAGE_SIZE,
+        description="Page size.",
+    ),
+):
+    """
+    Returns one page of a job's results, in input order.
+
+    Results are available as soon as their chunk is scored, so a running
+    job can be paged through while it progresses: a page shorter than
+    `limit` with a `next_offset` means the following items are not scored
+    yet.
+    """
+    try:
+        return await asyncio.to_thread(
+            job_runner.store.get_results, job_id, offset, limit
+        )
+    except JobNotFoundError:
+        raise _job_not_found(job_id)
+
+
+@app.post("/jobs/{job_id}/cancel", response_model=JobStatus, tags=["Jobs"])
+async def post_job_cancel(job_id: str):
+    """Stops scoring a job; results scored so far stay available."""
+    try:
+        return await asyncio.to_thread(job_runner.store.cancel_job, job_id)
+    except JobNotFoundError:
+        raise _job_not_found(job_id)
+    except JobStateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@app.delete("/jobs/{job_id}", status_code=204, tags=["Jobs"])
+async def delete_job(job_id: str):
+    """Cancels a job if needed and removes its inputs and results from the spool."""
+    try:
+        await asyncio.to_thread(job_runner.store.delete_job, job_id)
+    except JobNotFoundError:
+        raise _job_not_found(job_id)
+    return Response(status_code=204)
@@ -0,0 +1,384 @@
+# src/sentiment_analysis_service/metrics.py
+"""
+Minimal Prometheus metrics: counters, gauges and histograms.
+
+Collectors are written for the request path: every thread records into its
+own shard (a plain list), so observing a value takes no lock. Shards are only
+summed when /metrics is scraped; a scrape may miss an observation that is
+being recorded at the same moment, which Prometheus tolerates.
+
+Values are per process. With INFERENCE_EXECUTOR=process the model stages run
+in the worker processes and are not visible here.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .profiling import current_profile
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds: 50us .. 10s
+LATENCY_BUCKETS = (
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+# Items per batch
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Sharded:
+    """Per-thread value slots that are summed when read."""
+
+    def __init__(self, size: int):
+        self._size = size
+        self._shards: List[List[float]] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()  # Only taken when a thread first records
+
+    def shard(self) -> List[float]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = [0.0] * self._size
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def totals(self) -> List[float]:
+        with self._lock:
+            shards = list(self._shards)
+        totals = [0.0] * self._size
+        for shard in shards:
+            for i, value in enumerate(shard):
+                totals[i] += value
+        return totals
+
+
+class _Metric:
+    """Base class handling labelled children and registration."""
+
+    kind = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional["Registry"] = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+        self._children_lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self, *values: str) -> "_Metric":
+        """Returns the child metric for the given label values."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}.")
+            with self._children_lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._new_child()
+                    self._children[key] = child
+        return child
+
+    def _new_child(self) -> "_Metric":
+        raise NotImplementedError
+
+    def _series(self) -> Iterator[Tuple[Tuple[str, ...], "_Metric"]]:
+        if self.labelnames:
+            with self._children_lock:
+                children = list(self._children.items())
+            yield from children
+        else:
+            yield (), self
+
+    def _samples(self, labels: List[Tuple[str, str]]) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for values, series in self._series():
+            lines.extend(series._samples(list(zip(self.labelnames, values))))
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self._values = _Sharded(1)
+
+    def _new_child(self) -> "Counter":
+        return Counter(self.name, self.documentation)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._values.shard()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._values.totals()[0]
+
+    def _samples(self, labels):
+        yield f"{self.name}{_format_labels(labels)} {_format_value(self.value)}"
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down.
+
+    inc()/dec() are sharded like counters (safe from any thread). set() is
+    for values with a single writer, set_function() for values read on
+    scrape; do not mix them with inc()/dec() on the same gauge.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self._values = _Sharded(1)
+        self._set_value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def _new_child(self) -> "Gauge":
+        return Gauge(self.name, self.documentation)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._values.shard()[0] += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._values.shard()[0] -= amount
+
+    def set(self, value: float) -> None:
+        self._set_value = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Reads the value from `function` at scrape time."""
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        if self._function is not None:
+            return float(self._function())
+        return self._set_value + self._values.totals()[0]
+
+    def _samples(self, labels):
+        yield f"{self.name}{_format_labels(labels)} {_format_value(self.value)}"
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name,
+        documentation,
+        labelnames=(),
+        registry=None,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+        # Slots: one per bucket, +Inf, then the running sum
+        self._values = _Sharded(len(self.buckets) + 2)
+
+    def _new_child(self) -> "Histogram":
+        return Histogram(self.name, self.documentation, buckets=self.buckets)
+
+    def observe(self, value: float) -> None:
+        shard = self._values.shard()
+        shard[bisect.bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observes the duration of the block in seconds (monotonic clock)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, object]:
+        """Returns cumulative bucket counts, total count and sum."""
+        totals = self._values.totals()
+        cumulative = []
+        running = 0
+        for count in totals[:-1]:
+            running += int(count)
+            cumulative.append(running)
+        return {
+            "buckets": dict(zip(self.buckets + (float("inf"),), cumulative)),
+            "count": running,
+            "sum": totals[-1],
+        }
+
+    def _samples(self, labels):
+        snapshot = self.snapshot()
+        for bound, count in snapshot["buckets"].items():
+            bucket_labels = labels + [("le", _format_value(bound))]
+            yield f"{self.name}_bucket{_format_labels(bucket_labels)} {count}"
+        yield f"{self.name}_count{_format_labels(labels)} {snapshot['count']}"
+        yield (
+            f"{self.name}_sum{_format_labels(labels)} "
+            f"{_format_value(snapshot['sum'])}"
+        )
+
+
+class Registry:
+    """Collection of metrics rendered together in the text exposition format."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            if any(m.name == metric.name for m in self._metrics):
+                raise ValueError(f"Metric {metric.name} is already registered.")
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = Histogram(
+    "sentiment_request_duration_seconds",
+    "Total time spent handling a request.",
+    ("path",),
+    registry=REGISTRY,
+)
+STAGE_SECONDS = Histogram(
+    "sentiment_stage_duration_seconds",
+    "Time spent in each stage of a prediction request "
+    "(parse, preprocess, tokenize, transform, classify, response).",
+    ("stage",),
+    registry=REGISTRY,
+)
+BATCH_SIZE = Histogram(
+    "sentiment_batch_size",
+    "Items per batch: per request, per micro-batch and per model call "
+    "(after deduplication and caching).",
+    ("source",),
+    registry=REGISTRY,
+    buckets=SIZE_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "sentiment_requests_in_flight",
+    "HTTP requests currently being handled.",
+    registry=REGISTRY,
+)
+MODEL_LOAD_SECONDS = Gauge(
+    "sentiment_model_load_seconds",
+    "Duration of the last model load.",
+    registry=REGISTRY,
+)
+MODEL_RELOADS = Counter(
+    "sentiment_model_loads_total",
+    "Model loads and hot reloads, by outcome.",
+    ("status",),
+    registry=REGISTRY,
+)
+LONG_TEXTS = Counter(
+    "sentiment_long_texts_total",
+    "Texts over LONG_TEXT_MAX_CHARS, by the action the long-text policy took.",
+    ("action",),
+    registry=REGISTRY,
+)
+ADMISSIONS = Counter(
+    "sentiment_admission_total",
+    "Prediction requests admitted or shed by admission control, by reason.",
+    ("decision", "reason"),
+    registry=REGISTRY,
+)
+
+SHADOW_BATCHES = Counter(
+    "sentiment_shadow_batches_total",
+    "Production batches mirrored to shadow models, scored or dropped.",
+    ("outcome",),
+    registry=REGISTRY,
+)
+SHADOW_PREDICTIONS = Counter(
+    "sentiment_shadow_predictions_total",
+    "Shadow model predictions, by whether they agreed with production.",
+    ("model", "outcome"),
+    registry=REGISTRY,
+)
+SHADOW_SECONDS = Histogram(
+    "sentiment_shadow_duration_seconds",
+    'Time to score a mirrored batch, per shadow model; model="production" '
+    "is the production pass for the same batches.",
+    ("model",),
+    registry=REGISTRY,
+)
+
+
+def observe_stage(stage: str):
+    """
+    Context manager timing one stage into STAGE_SECONDS, and into the
+    profile of the current call when it is being profiled.
+    """
+    profile = current_profile()
+    if profile is None:
+        return STAGE_SECONDS.labels(stage).time()
+    return profile.stage(stage, STAGE_SECONDS.labels(stage).time())
+
+
+def render() -> str:
+    """Renders all registered metrics in the Prometheus text format."""
+    return REGISTRY.render()
@@ -0,0 +1,329 @@
+# src/sentiment_analysis_service/model_manager.py
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import joblib
+
+from .config import SERVING_MODEL_PATH, MODEL_WATCH_INTERVAL_S
+from .compiled import (
+    CompiledLinearModel,
+    is_compiled_artifact,
+    load_compiled,
+    read_artifact_meta,
+)
+from .metrics import MODEL_LOAD_SECONDS, MODEL_RELOADS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LoadedModel:
+    """
+    One loaded model artifact and everything derived from it.
+
+    Requests take a reference to the active LoadedModel once and use it until
+    they finish, so a reload never mixes two models within one request.
+    """
+
+    model: Any  # sklearn Pipeline, or a CompiledLinearModel for mmap artifacts
+    version: Optional[str]
+    path: Path
+    format: str  # "pickle" or "mmap"
+    load_info: Dict[str, Any] = field(default_factory=dict)
+    # Flat linear scorer for the "compiled" engine (the model itself for mmap)
+    compiled: Optional[CompiledLinearModel] = None
+
+
+def file_version(path: Path) -> str:
+    """Returns a short content hash identifying a model file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def memory_usage() -> Dict[str, Optional[int]]:
+    """
+    Returns this process's resident memory split into private and file-backed.
+
+    Memory-mapped model arrays show up as file-backed (shareable) pages, while
+    an unpickled model lives in private anonymous memory. Values are bytes, or
+    None where /proc is not available.
+    """
+    usage: Dict[str, Optional[int]] = {"rss": None, "rss_anon": None, "rss_file": None}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                name = {"VmRSS": "rss", "RssAnon": "rss_anon", "RssFile": "rss_file"}
+                if key in name:
+                    usage[name[key]] = int(value.split()[0]) * 1024
+    except OSError:
+        pass
+    return usage
+
+
+def artifact_signature(path: Path) -> Optional[Tuple[int, int]]:
+    """
+    Returns (mtime_ns, size) of a model file, or of the newest file in an
+    artifact directory; None if the path does not exist.
+    """
+    path = Path(path)
+    try:
+        if path.is_dir():
+            stats = [p.stat() for p in path.iterdir() if p.is_file()]
+            if not stats:
+                return None
+            return (
+                max(s.st_mtime_ns for s in stats),
+                sum(s.st_size for s in stats),
+            )
+        stat = path.stat()
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+
+def load_artifact(model_path: Path) -> LoadedModel:
+    """
+    Loads a model from disk without activating it.
+
+    `model_path` may be a joblib pickle of the sklearn pipeline, or a
+    directory written by `python -m sentiment_analysis_service.export`, whose
+    arrays are memory-mapped so all worker processes share one copy.
+    """
+    model_path = Path(model_path)
+    if not model_path.exists():
+        logger.error(f"Model file not found at {model_path}")
+        raise FileNotFoundError(f"Model file not found at {model_path}")
+
+    logger.info(f"Loading model from {model_path}...")
+    memory_before = memory_usage()
+    start = time.perf_counter()
+    if is_compiled_artifact(model_path):
+        # Memory-mapped compiled artifact: there is no sklearn pipeline, the
+        # compiled model serves both engines.
+        version = read_artifact_meta(model_path).get("version")
+        model = compiled = load_compiled(model_path, mmap=True)
+        model_format = "mmap"
+    else:
+        model = joblib.load(model_path)
+        version = file_version(model_path)
+        compiled = None
+        model_format = "pickle"
+    memory_after = memory_usage()
+    load_info = {
+        "path": str(model_path),
+        "format": model_format,
+        "load_seconds": time.perf_counter() - start,
+        **{
+            f"{key}_delta_bytes": (
+                memory_after[key] - memory_before[key]
+                if memory_after[key] is not None
+                else None
+            )
+            for key in memory_after
+        },
+    }
+    logger.info(
+        f"Model loaded successfully. Version={version}, "
+        f"Format={model_format}, "
+        f"LoadTime={load_info['load_seconds'] * 1000:.1f}ms, "
+        f"RSSDelta={load_info['rss_delta_bytes']}B "
+        f"(private={load_info['rss_anon_delta_bytes']}B, "
+        f"shared/file={load_info['rss_file_delta_bytes']}B)"
+    )
+    return LoadedModel(
+        model=model,
+        version=version,
+        path=model_path,
+        format=model_format,
+        load_info=load_info,
+        compiled=compiled,
+    )
+
+
+class ModelManager:
+    """
+    Owns the active model and replaces it without downtime.
+
+    A reload loads the new artifact on the calling (background) thread,
+    runs `prepare` on it (compilation, warm-up inference) and only then swaps
+    the active reference. That swap is a single assignment. Requests that
+    already hold the old model finish on it, and new requests see the new
+    one. If loading or warm-up fails, the old model keeps serving.
+
+    Reloads can be triggered explicitly (admin endpoint) or by a watcher
+    thread that polls the artifact's modification time.
+    """
+
+    def __init__(
+        self,
+        model_path: Path = SERVING_MODEL_PATH,
+        prepare: Optional[Callable[[LoadedModel], None]] = None,
+        watch_interval: float = MODEL_WATCH_INTERVAL_S,
+    ):
+        self.model_path = Path(model_path)
+        self.watch_interval = watch_interval
+        self._prepare = prepare
+        self._active: Optional[LoadedModel] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._reload_lock = threading.Lock()
+        self._listeners: List[Callable[[LoadedModel], None]] = []
+        self._reloads = 0
+        self._failures = 0
+        self._last_error: Optional[str] = None
+        self._activated_at: Optional[float] = None
+        self._reloading = False
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+
+    @property
+    def active(self) -> Optional[LoadedModel]:
+        """The model new requests should use (None before the first load)."""
+        return self._active
+
+    def add_listener(self, listener: Callable[[LoadedModel], None]) -> None:
+        """Calls `listener(new_model)` after every successful swap."""
+        self._listeners.append(listener)
+
+    def load(self, model_path: Optional[Path] = None) -> LoadedModel:
+        """
+        Loads, prepares and activates a model. Concurrent calls are serialized.
+
+        Args:
+            model_path (Optional[Path]): Artifact to load; defaults to the
+                                         currently configured path.
+
+        Returns:
+            LoadedModel: The newly active model.
+
+        Raises:
+            FileNotFoundError: If the artifact does not exist.
+            Exception: Any load or warm-up error; the old model stays active.
+        """
+        path = Path(model_path) if model_path is not None else self.model_path
+        with self._reload_lock:
+            self._reloading = True
+            try:
+                signature = artifact_signature(path)
+                new_model = load_artifact(path)
+                if self._prepare is not None:
+                    self._prepare(new_model)
+            except Exception as e:
+                self._failures += 1
+                self._last_error = f"{type(e).__name__}: {e}"
+                MODEL_RELOADS.labels("failure").inc()
+                raise
+            finally:
+                self._reloading = False
+
+            previous = self._active
+            self._active = new_model  # The atomic swap
+            self.model_path = path
+            self._signature = signature
+            self._activated_at = time.time()
+            self._last_error = None
+            if previous is not None:
+                self._reloads += 1
+            MODEL_RELOADS.labels("success").inc()
+            MODEL_LOAD_SECONDS.set(new_model.load_info["load_seconds"])
+        logger.info(
+            f"Active model is now version {new_model.version} from {path} "
+            f"(previous: {previous.version if previous else None})."
+        )
+        for listener in self._listeners:
+            try:
+                listener(new_model)
+            except Exception as e:
+                logger.error(f"Model swap listener failed: {e}", exc_info=True)
+        return new_model
+
+    def ensure_loaded(self, model_path: Optional[Path] = None) -> LoadedModel:
+        """Returns the active model, loading it first if none (or another) is active."""
+        active = self._active
+        path = Path(model_path) if model_path is not None else self.model_path
+        if active is not None and active.path == path:
+            return active
+        return self.load(path)
+
+    def check_for_update(self) -> bool:
+        """
+        Reloads if the artifact changed on disk since it was loaded.
+
+        A change is only acted on once the file has stopped changing between
+        two checks, so a partially copied artifact is never loaded.
+
+        Returns:
+            bool: True if a reload happened.
+        """
+        signature = artifact_signature(self.model_path)
+        if signature is None or signature == self._signature:
+            return False
+        time.sleep(min(self.watch_interval, 1.0) if self.watch_interval else 0.5)
+        if artifact_signature(self.model_path) != signature:
+            return False  # Still being written; try again next poll
+        logger.info(f"Model artifact {self.model_path} changed on disk; reloading.")
+        try:
+            self.load(self.model_path)
+        except Exception as e:
+            # Keep serving the old model; remember the signature so a broken
+            # artifact is not retried on every poll
+            self._signature = signature
+            logger.error(f"Hot reload failed, keeping current model: {e}")
+            return False
+        return True
+
+    def _watch(self) -> None:
+        while not self._stop_watching.wait(self.watch_interval):
+            try:
+                self.check_for_update()
+            except Exception as e:  # Never let the watcher die
+                logger.error(f"Model watcher error: {e}", exc_info=True)
+
+    def start_watching(self) -> None:
+        """Starts polling the artifact for changes (no-op if interval <= 0)."""
+        if self.watch_interval <= 0 or self._watcher is not None:
+            return
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, name="model-watcher", daemon=True
+        )
+        self._watcher.start()
+        logger.info(
+            f"Watching {self.model_path} for changes every {self.watch_interval}s."
+        )
+
+    def stop_watching(self) -> None:
+        """Stops the watcher thread."""
+        if self._watcher is None:
+            return
+        self._stop_watching.set()
+        self._watcher.join(timeout=5)
+        self._watcher = None
+
+    def status(self) -> Dict[str, Any]:
+        """Returns the active version, load time and reload counters."""
+        active = self._active
+        return {
+            "loaded": active is not None,
+            "version": active.version if active else None,
+            "path": str(active.path) if active else str(self.model_path),
+            "format": active.format if active else None,
+            "load_seconds": active.load_info.get("load_seconds") if active else None,
+            "warmup_seconds": (
+                active.load_info.get("warmup_seconds") if active else None
+            ),
+            "activated_at": self._activated_at,
+            "reloads": self._reloads,
+            "failed_reloads": self._failures,
+            "last_error": self._last_error,
+            "reloading": self._reloading,
+            "watching": self._watcher is not None,
+        }
@@ -1,97 +1,696 @@
 # src/sentiment_analysis_service/predict.py
-import joblib
 import logging
-from typing import List, Dict, Any  # For type hinting
+import time
+from typing import List, Dict, Any, Optional, Tuple  # For type hinting
 from pathlib import Path
 
+import numpy as np
+
 # Import configurations and preprocessing function
-from .config import MODEL_PATH, LOG_FORMAT, LOG_LEVEL, LOG_FILE  # Relative import
-from .preprocessing import preprocess_batch
+from .config import (
+    LOG_FILE,
+    MODEL_WARMUP_ROUNDS,
+    PREDICTION_CACHE_SIZE,
+    PREDICTION_CACHE_TTL_S,
+    PREDICT_ENGINE,
+    PREPROCESS_EMIT_TOKENS,
+    SHADOW_MODELS,
+)  # Relative import
+from .preprocessing import preprocess_batch, tokenize_batch
+from .cache import PredictionCache, MISSING
+from .logging_setup import configure_logging
+from .metrics import BATCH_SIZE, LONG_TEXTS, observe_stage
+from .long_text import LongTextPolicy
+from .sharding import ShardPool, split_shards
+from .shadow import ShadowBatch, ShadowScorer, parse_shadow_models
+from .compiled import (
+    CompiledLinearModel,
+    compile_pipeline,
+    decision_labels,
+    scores_to_probabilities,
+    token_fed_pipeline,
+    uses_softmax,
+)
+from .model_manager import (  # noqa: F401
+    LoadedModel,
+    ModelManager,
+    load_artifact,
+    memory_usage,
+)
 
-# Configure logging
-logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT, filename=LOG_FILE, filemode="a")
+# Configure logging (queue-based, see logging_setup.py)
+configure_logging()
 logger = logging.getLogger(__name__)
 
-# Global variable to hold the loaded model pipeline
-# Initialize to None, load lazily or on startup
-_model_pipeline = None
+ENGINES = ("sklearn", "compiled")
+_engine = PREDICT_ENGINE
+# Copy of the pipeline that accepts token lists (built lazily, see _score_texts)
+_token_pipeline = None
+# Applied to raw texts before preprocessing (see long_text.py)
+_long_text_policy = LongTextPolicy()
+
+# Texts scored on a freshly loaded model before it starts serving, so the
+# first real requests do not pay for lazy initialization
+WARMUP_TEXTS = [
+    "This product is amazing, I love it!",
+    "Terrible quality, very disappointed.",
+    "It arrived on time and works okay.",
+]
+
+
+def _prepare_model(loaded: LoadedModel) -> None:
+    """Compiles (for the compiled engine) and warms up a model before activation."""
+    if _engine == "compiled" and loaded.compiled is None:
+        _compile_model(loaded)
+    start = time.perf_counter()
+    cleaned = preprocess_batch(WARMUP_TEXTS)
+    for _ in range(MODEL_WARMUP_ROUNDS):
+        _score_texts(cleaned, loaded)
+    loaded.load_info["warmup_seconds"] = time.perf_counter() - start
+
+
+# Owns the active model; swapped atomically on reload (see model_manager.py)
+_manager = ModelManager(prepare=_prepare_model)
+
+# Scores huge batches in parallel shards (see sharding.py); None when disabled
+_shard_pool: Optional[ShardPool] = ShardPool()
+# Shard workers hold their own model copy; restart them after a hot reload
+_manager.add_listener(
+    lambda loaded: _shard_pool.recycle(loaded.path) if _shard_pool else None
+)
+
+# Candidate models scored in the background on sampled batches (see shadow.py)
+_shadow = ShadowScorer()
+
+# Cache of predictions keyed on (preprocessed text, model version)
+_prediction_cache = (
+    PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL_S)
+    if PREDICTION_CACHE_SIZE > 0
+    else None
+)
 
 
-def load_model(model_path: Path = MODEL_PATH):
-    """Loads the trained pipeline from the specified path."""
-    global _model_pipeline
-    if _model_pipeline is not None:
-        logger.info("Model pipeline already loaded.")
-        return _model_pipeline
+def load_model(model_path: Optional[Path] = None):
+    """
+    Loads the trained model from the specified path and makes it active.
 
-    if not model_path.exists():
-        logger.error(f"Model file not found at {model_path}")
-        raise FileNotFoundError(f"Model file not found at {model_path}")
+    Returns the already active model if it was loaded from the same path;
+    a different path is loaded and swapped in (see ModelManager.load for
+    hot reloads of the same path). If loading fails the previous model, if
+    any, stays active.
 
+    `model_path` may be a joblib pickle of the sklearn pipeline, or a
+    directory written by `python -m sentiment_analysis_service.export`, whose
+    arrays are memory-mapped so all worker processes share one copy.
+    """
     try:
-        logger.info(f"Loading model from {model_path}...")
-        _model_pipeline = joblib.load(model_path)
-        logger.info("Model loaded successfully.")
-        return _model_pipeline
+        return _manager.ensure_loaded(model_path).model
     except Exception as e:
         logger.error(f"Error loading model: {e}", exc_info=True)  # Log stack trace
         raise
 
 
-def predict(input_data: List[str]) -> List[Dict[str, Any]]:
+def reload_model(model_path: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Loads, warms up and atomically activates a model, even if the same path
+    is already loaded. Requests in flight finish on the previous model.
+
+    Returns:
+        Dict[str, Any]: The model status after the swap.
+    """
+    _manager.load(model_path)
+    return get_model_status()
+
+
+def get_model_manager() -> ModelManager:
+    """Returns the process-wide ModelManager."""
+    return _manager
+
+
+def _active_model() -> LoadedModel:
+    """Returns the active model, loading the configured one on first use."""
+    return _manager.active or _manager.ensure_loaded()
+
+
+def _compile_model(loaded: LoadedModel) -> None:
+    """Builds the compiled linear scorer from a loaded pipeline."""
+    logger.info("Compiling model pipeline for the 'compiled' engine...")
+    loaded.compiled = compile_pipeline(loaded.model)
+    logger.info(f"Compiled model ready: {loaded.compiled.n_terms} terms.")
+
+
+def set_engine(engine: str) -> None:
+    """
+    Selects the inference engine used by predict().
+
+    Args:
+        engine (str): "sklearn" to run the pipeline, or "compiled" to use the
+                      flat linear scorer (compiled on first use).
+    """
+    global _engine
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Expected one of {ENGINES}.")
+    _engine = engine
+    active = _manager.active
+    if engine == "compiled" and active is not None and active.compiled is None:
+        _compile_model(active)
+    logger.info(f"Inference engine set to '{engine}'.")
+
+
+def get_engine() -> str:
+    """Returns the inference engine currently used by predict()."""
+    return _engine
+
+
+def set_long_text_policy(policy: LongTextPolicy) -> None:
+    """Replaces the long-text policy used by predict() and predict_labels()."""
+    global _long_text_policy
+    _long_text_policy = policy
+    logger.info(f"Long-text policy set to {policy}.")
+
+
+def get_long_text_policy() -> LongTextPolicy:
+    """Returns the long-text policy used by predict() and predict_labels()."""
+    return _long_text_policy
+
+
+def set_sharding(
+    enabled: bool, workers: Optional[int] = None, threshold: Optional[int] = None
+) -> None:
+    """
+    Enables or disables sharding of large batches in this process.
+
+    Worker processes (shard, executor and bulk-scoring workers) disable it so
+    they never start pools of their own. Passing `workers` or `threshold`
+    replaces the pool with one using those settings.
+    """
+    global _shard_pool
+    if _shard_pool is not None and (not enabled or workers or threshold):
+        _shard_pool.shutdown()
+        _shard_pool = None
+    if enabled and _shard_pool is None:
+        settings = {"workers": workers, "threshold": threshold}
+        _shard_pool = ShardPool(**{k: v for k, v in settings.items() if v})
+
+
+def start_shard_pool() -> None:
+    """Starts the shard workers ahead of the first large batch, if enabled."""
+    if _shard_pool is not None and _shard_pool.enabled:
+        _shard_pool.start(_active_model().path)
+
+
+def get_sharding_stats() -> Optional[Dict[str, Any]]:
+    """Returns shard pool settings and state, or None if sharding is disabled."""
+    if _shard_pool is None or not _shard_pool.enabled:
+        return None
+    return {
+        "workers": _shard_pool.workers,
+        "threshold": _shard_pool.threshold,
+        "running": _shard_pool.running,
+    }
+
+
+def shutdown_shard_pool() -> None:
+    """Stops the shard workers, if any were started."""
+    if _shard_pool is not None:
+        _shard_pool.shutdown()
+
+
+def register_shadow_model(name: str, model_path: Path) -> None:
+    """
+    Loads a candidate model and scores sampled production batches with it.
+
+    The candidate never affects responses; see get_shadow_stats() for how
+    it compares with production.
+    """
+    _shadow.register(name, load_artifact(Path(model_path)))
+
+
+def unregister_shadow_model(name: str) -> None:
+    """Stops shadow scoring with a candidate model."""
+    _shadow.unregister(name)
+
+
+def configure_shadow_models(spec: str = SHADOW_MODELS) -> None:
+    """Registers the shadow models listed in SHADOW_MODELS ("name=path,...")."""
+    for name, path in parse_shadow_models(spec).items():
+        register_shadow_model(name, path)
+
+
+def get_shadow_stats() -> Optional[Dict[str, Any]]:
+    """Returns agreement and latency per shadow model, or None if there are none."""
+    return _shadow.stats() if _shadow.active else None
+
+
+def flush_shadow_scoring() -> None:
+    """Waits until all mirrored batches have been scored by the shadows."""
+    if _shadow.active:
+        _shadow.flush()
+
+
+def shutdown_shadow_scoring() -> None:
+    """Stops the shadow scorer and drops all shadow models."""
+    _shadow.shutdown()
+
+
+def _scoring_model(loaded: Optional[LoadedModel] = None):
+    """Returns the object whose predict() scores preprocessed texts."""
+    loaded = loaded or _active_model()
+    if _engine == "compiled" and loaded.compiled is not None:
+        return loaded.compiled
+    return loaded.model
+
+
+def _classify(classifier: Any, features: Any, with_probabilities: bool = False) -> Any:
+    """
+    Predicts labels, and optionally probabilities, from one set of features.
+
+    Linear classifiers are scored once: labels and probabilities both come
+    from the same decision values, so labels match classifier.predict().
+    """
+    if not with_probabilities:
+        return classifier.predict(features)
+    if hasattr(classifier, "coef_") and hasattr(classifier, "decision_function"):
+        scores = classifier.decision_function(features)
+        return (
+            decision_labels(classifier.classes_, scores),
+            scores_to_probabilities(scores, uses_softmax(classifier)),
+        )
+    probabilities = classifier.predict_proba(features)
+    return classifier.classes_[probabilities.argmax(axis=1)], probabilities
+
+
+def _run_pipeline(
+    model: Any,
+    inputs: List[Any],
+    with_probabilities: bool = False,
+    features_out: Optional[Dict[str, Any]] = None,
+) -> Any:
+    """
+    Runs transform steps and the final predict separately to time each stage.
+
+    If `features_out` is given, the classifier's input matrix is stored in it
+    under "features" (for shadow models sharing the vectorizer).
+    """
+    steps = getattr(model, "steps", None)
+    if not steps:
+        with observe_stage("classify"):
+            return _classify(model, inputs, with_probabilities)
+    features = inputs
+    with observe_stage("transform"):
+        for _, step in steps[:-1]:
+            if step is not None and step != "passthrough":
+                features = step.transform(features)
+    if features_out is not None:
+        features_out["features"] = features
+    with observe_stage("classify"):
+        return _classify(steps[-1][1], features, with_probabilities)
+
+
+def _score_texts(
+    cleaned_texts: List[str],
+    loaded: Optional[LoadedModel] = None,
+    with_probabilities: bool = False,
+    features_out: Optional[Dict[str, Any]] = None,
+) -> Any:
+    """
+    Runs a model (default: the active one) on preprocessed texts.
+
+    Returns the labels, or a (labels, probabilities) tuple if
+    `with_probabilities` is set. Both come from a single vectorization,
+    which is kept in `features_out` if given (sklearn engine only).
+    """
+    global _token_pipeline
+    model = _scoring_model(loaded)
+    if isinstance(model, CompiledLinearModel):
+        with observe_stage("tokenize"):
+            if PREPROCESS_EMIT_TOKENS:
+                tokens = tokenize_batch(cleaned_texts, model.token_pattern)
+            else:
+                tokens = [model.tokenize(text) for text in cleaned_texts]
+        with observe_stage("transform"):
+            scores = model.decision_function_tokens(tokens)
+        with observe_stage("classify"):
+            if with_probabilities:
+                return model._labels(scores), model.probabilities(scores)
+            return model._labels(scores)
+    if PREPROCESS_EMIT_TOKENS:
+        if _token_pipeline is None or _token_pipeline[0] is not model:
+            try:
+                _token_pipeline = (model, token_fed_pipeline(model))
+            except ValueError as e:
+                logger.warning(f"Cannot feed tokens to this pipeline: {e}")
+                _token_pipeline = (model, None)
+        token_model = _token_pipeline[1]
+        if token_model is not None:
+            token_pattern = token_model.steps[0][1].token_pattern
+            with observe_stage("tokenize"):
+                tokens = tokenize_batch(cleaned_texts, token_pattern)
+            return _run_pipeline(token_model, tokens, with_probabilities, features_out)
+    return _run_pipeline(model, cleaned_texts, with_probabilities, features_out)
+
+
+def is_model_loaded() -> bool:
+    """Returns True if a model is active in this process."""
+    return _manager.active is not None
+
+
+def get_model_version() -> Optional[str]:
+    """Returns the version (content hash) of the active model, if any."""
+    active = _manager.active
+    return active.version if active is not None else None
+
+
+def get_model_load_info() -> Dict[str, Any]:
+    """Returns format, load time and memory deltas of the active model's load."""
+    active = _manager.active
+    return dict(active.load_info) if active is not None else {}
+
+
+def get_model_status() -> Dict[str, Any]:
+    """Returns the active model's version and load time plus reload counters."""
+    return _manager.status()
+
+
+def get_cache_stats() -> Optional[Dict[str, Any]]:
+    """Returns prediction cache statistics, or None if the cache is disabled."""
+    return _prediction_cache.stats() if _prediction_cache is not None else None
+
+
+def clear_prediction_cache() -> None:
+    """Drops all cached predictions (e.g. before timing the model itself)."""
+    if _prediction_cache is not None:
+        _prediction_cache.clear()
+
+
+def _predict_cleaned(
+    cleaned_batch: List[str],
+    loaded: LoadedModel,
+    with_probabilities: bool = False,
+    features_out: Optional[Dict[str, Any]] = None,
+) -> List[Any]:
+    """
+    Predicts labels for preprocessed texts, scoring each distinct text once.
+
+    Texts that normalize to the same string are deduplicated within the batch
+    and looked up in the prediction cache; only the remaining misses are sent
+    to the model pipeline. All of it uses `loaded`, so a concurrent reload
+    cannot mix two models (or cache versions) within one batch.
+
+    With `with_probabilities`, each entry is a (label, probabilities row)
+    tuple instead, cached separately from plain labels. `features_out`
+    receives the feature matrix of the scored misses ("features") and
+    their texts ("texts").
+    """
+    version = (
+        (loaded.version, "probabilities") if with_probabilities else loaded.version
+    )
+    labels: Dict[str, Any] = {}
+    misses = []
+    for text in dict.fromkeys(cleaned_batch):  # Distinct texts, order preserved
+        if _prediction_cache is not None:
+            cached = _prediction_cache.get((text, version))
+            if cached is not MISSING:
+                labels[text] = cached
+                continue
+        misses.append(text)
+
+    if misses:
+        BATCH_SIZE.labels("model").observe(len(misses))
+        scored = _score_texts(misses, loaded, with_probabilities, features_out)
+        if features_out is not None and "features" in features_out:
+            features_out["texts"] = misses
+        if with_probabilities:
+            scored = list(zip(*scored))
+        for text, label in zip(misses, scored):
+            labels[text] = label
+            if _prediction_cache is not None:
+                _prediction_cache.put((text, version), label)
+
+    return [labels[text] for text in cleaned_batch]
+
+
+def _decision_scores(cleaned_texts: List[str], loaded: LoadedModel) -> np.ndarray:
+    """Classifier decision values of preprocessed texts, as sklearn returns them."""
+    model = _scoring_model(loaded)
+    with observe_stage("transform"):
+        return model.decision_function(cleaned_texts)
+
+
+def _predict_chunked(
+    chunk_lists: List[List[str]], loaded: LoadedModel, with_probabilities: bool = False
+) -> List[Any]:
+    """
+    Predicts one label per text from the mean decision scores of its chunks.
+
+    All chunks of all texts are preprocessed and scored in one call. Chunk
+    scores bypass the prediction cache, which stores labels only. Entries
+    are (label, probabilities row) tuples with `with_probabilities`.
+    """
+    flat = [chunk for chunks in chunk_lists for chunk in chunks]
+    with observe_stage("preprocess"):
+        cleaned = preprocess_batch(flat)
+    scores = np.asarray(_decision_scores(cleaned, loaded))
+    means = np.stack(
+        [
+            scores[offset : offset + len(chunks)].mean(axis=0)
+            for offset, chunks in zip(
+                np.cumsum([0] + [len(c) for c in chunk_lists[:-1]]), chunk_lists
+            )
+        ]
+    )
+    model = _scoring_model(loaded)
+    labels = list(decision_labels(model.classes_, means))
+    if not with_probabilities:
+        return labels
+    multinomial = (
+        model.multinomial
+        if isinstance(model, CompiledLinearModel)
+        else uses_softmax(model.steps[-1][1])
+    )
+    return list(zip(labels, scores_to_probabilities(means, multinomial)))
+
+
+def _predict_shard(
+    texts: List[Any],
+    with_probabilities: bool,
+    model_path: str,
+    engine: str,
+    policy: LongTextPolicy,
+) -> Tuple[List[Any], Dict[int, str]]:
+    """Scores one shard inside a shard worker, with the caller's settings."""
+    global _long_text_policy
+    loaded = _manager.ensure_loaded(Path(model_path))
+    if engine != _engine:
+        set_engine(engine)
+    _long_text_policy = policy
+    return _predict_raw(texts, loaded, with_probabilities)
+
+
+def _predict_sharded(
+    input_data: List[Any], loaded: LoadedModel, with_probabilities: bool
+) -> Tuple[List[Any], Dict[int, str]]:
+    """Scores a large batch as parallel shards and reassembles it in order."""
+    shards = split_shards(input_data, _shard_pool.workers)
+    BATCH_SIZE.labels("shard").observe(len(shards[0]))
+    results = _shard_pool.map(
+        _predict_shard,
+        shards,
+        with_probabilities,
+        str(loaded.path),
+        _engine,
+        _long_text_policy,
+    )
+    labels: List[Any] = []
+    actions: Dict[int, str] = {}
+    for (shard_labels, shard_actions), shard in zip(results, shards):
+        offset = len(labels)
+        actions.update({offset + i: a for i, a in shard_actions.items()})
+        labels.extend(shard_labels)
+    return labels, actions
+
+
+def _predict_raw(
+    input_data: List[Any], loaded: LoadedModel, with_probabilities: bool = False
+) -> Tuple[List[Any], Dict[int, str]]:
+    """
+    Preprocesses and predicts raw texts, applying the long-text policy first.
+
+    Batches of at least PREDICT_SHARD_THRESHOLD texts are scored in parallel
+    shards on the shard pool instead (see sharding.py).
+
+    Returns:
+        Tuple[List[Any], Dict[int, str]]: One label (or (label, probabilities)
+            tuple) per input, and the long-text action ("truncated" or
+            "chunked") per changed index.
+    """
+    if _shard_pool is not None and _shard_pool.should_shard(len(input_data)):
+        # Not mirrored to shadow models: the texts are preprocessed in the
+        # shard workers
+        return _predict_sharded(input_data, loaded, with_probabilities)
+    shadow = _shadow.active and _shadow.should_sample()
+    features: Optional[Dict[str, Any]] = {} if shadow else None
+    start = time.perf_counter()
+    policy = _long_text_policy
+    actions = policy.actions(input_data)
+    texts = input_data
+    chunked: Dict[int, List[str]] = {}
+    if actions:
+        texts = list(input_data)
+        for i, action in actions.items():
+            LONG_TEXTS.labels(action).inc()
+            if action == "chunked":
+                chunked[i] = policy.chunks(texts[i])
+                texts[i] = ""  # Scored from its chunks below
+            else:
+                texts[i] = policy.truncate(texts[i])
+    with observe_stage("preprocess"):
+        cleaned_batch = preprocess_batch(texts)
+    labels = _predict_cleaned(cleaned_batch, loaded, with_probabilities, features)
+    if chunked:
+        chunk_labels = _predict_chunked(
+            list(chunked.values()), loaded, with_probabilities
+        )
+        for i, label in zip(chunked, chunk_labels):
+            labels[i] = label
+    if shadow:
+        # Only queued here; the shadow thread does the scoring
+        _shadow.submit(
+            ShadowBatch(
+                cleaned=cleaned_batch,
+                labels=list(labels),  # The caller owns `labels`
+                primary=loaded,
+                primary_seconds=time.perf_counter() - start,
+                with_probabilities=with_probabilities,
+                exclude=set(chunked),
+                features=features.get("features"),
+                feature_texts=features.get("texts"),
+            )
+        )
+    return labels, actions
+
+
+def predict_labels(input_data: List[Any]) -> List[Any]:
+    """
+    Predicts sentiment labels only, without building per-item result dicts.
+
+    Used for offline bulk scoring. Unlike predict(), failures are raised to
+    the caller instead of being returned as per-item error dicts.
+
+    Args:
+        input_data (List[Any]): A list of raw text strings.
+
+    Returns:
+        List[Any]: One predicted label per input, in order.
+    """
+    loaded = _active_model()  # Held for the whole call (see ModelManager)
+    if not input_data:
+        return []
+    return _predict_raw(input_data, loaded)[0]
+
+
+def predict_probabilities(
+    input_data: List[Any],
+) -> Tuple[List[Any], np.ndarray, np.ndarray]:
+    """
+    Predicts labels and class probabilities in one pass over the model.
+
+    Like predict_labels(), failures are raised to the caller.
+
+    Args:
+        input_data (List[Any]): A list of raw text strings.
+
+    Returns:
+        Tuple[List[Any], np.ndarray, np.ndarray]: The labels, a
+            (n_inputs, n_classes) probability matrix and the class labels
+            in column order.
+    """
+    loaded = _active_model()
+    classes = _scoring_model(loaded).classes_
+    if not input_data:
+        return [], np.empty((0, len(classes))), classes
+    pairs = _predict_raw(input_data, loaded, with_probabilities=True)[0]
+    labels, rows = zip(*pairs)
+    return list(labels), np.vstack(rows), classes
+
+
+def _probability_fields(
+    rows: List[np.ndarray], classes: np.ndarray, top_k: Optional[int]
+) -> List[Dict[str, Any]]:
+    """Builds the confidence and probabilities fields of every result."""
+    matrix = np.vstack(rows)
+    # Sorted once for the whole batch; Python floats via a single tolist()
+    orders = np.argsort(-matrix, axis=1, kind="stable")[:, :top_k].tolist()
+    values = matrix.tolist()
+    names = [str(c) for c in classes]
+    return [
+        {
+            "confidence": row[order[0]],
+            "probabilities": {names[j]: row[j] for j in order},
+        }
+        for row, order in zip(values, orders)
+    ]
+
+
+def predict(
+    input_data: List[str], probabilities: bool = False, top_k: Optional[int] = None
+) -> List[Dict[str, Any]]:
     """
     Makes sentiment predictions on a batch of text data.
 
     Args:
         input_data (List[str]): A list of raw text strings.
+        probabilities (bool): Also return `confidence` (probability of the
+                              predicted label) and `probabilities` per label,
+                              from the same model pass as the label.
+        top_k (Optional[int]): Only include the k most probable labels in
+                               `probabilities` (implies `probabilities`).
 
     Returns:
         List[Dict[str, Any]]: A list of dictionaries, each containing the
                                original text and its predicted sentiment.
                                Returns empty list on error or empty input.
     """
-    global _model_pipeline
-    if _model_pipeline is None:
-        # Attempt to load the model if not already loaded
-        # In a web server context, you'd typically load this at startup
-        load_model()
-        if _model_pipeline is None:  # Check again if loading failed
-            logger.error("Model pipeline is not loaded. Cannot predict.")
-            # Depending on requirements, could return error dicts or raise exception
-            return [{"error": "Model not available"} for _ in input_data]
+    # Attempt to load the model if not already loaded
+    # In a web server context, you'd typically load this at startup.
+    # The model is held for the whole call, so a concurrent hot reload only
+    # affects later calls.
+    loaded = _active_model()
+    with_probabilities = probabilities or top_k is not None
 
     if not input_data:
         logger.warning("Received empty list for prediction.")
         return []
 
     try:
-        logger.info(f"Received {len(input_data)} items for prediction.")
-        # 1. Preprocess the input text batch
-        cleaned_batch = preprocess_batch(input_data)
-        logger.debug(
-            f"Preprocessed data: {cleaned_batch}"
-        )  # Use DEBUG for verbose logs
-
-        # 2. Make predictions using the loaded pipeline
-        predictions = _model_pipeline.predict(cleaned_batch)
-        logger.info(f"Generated {len(predictions)} predictions.")
-
-        # (Optional) 3. Predict probabilities if needed
-        # try:
-        #     probabilities = _model_pipeline.predict_proba(cleaned_batch)
-        #     # Process probabilities (e.g., get probability for the predicted class)
-        # except AttributeError:
-        #     logger.warning("Model pipeline does not support predict_proba.")
-        #     probabilities = [None] * len(predictions) # Placeholder
+        # Per-batch details are DEBUG; post_predict logs one INFO summary.
+        # %-style arguments are only formatted if the record is written.
+        logger.debug("Received %d items for prediction.", len(input_data))
+        # 1. Shorten very long texts (LONG_TEXT_POLICY), preprocess the batch
+        # 2. and predict with the loaded pipeline (deduplicated and cached)
+        predictions, long_text_actions = _predict_raw(
+            input_data, loaded, with_probabilities
+        )
+        logger.debug("Generated %d predictions.", len(predictions))
+
+        # 3. Probabilities come from the same decision values as the labels
+        # (see _classify), so the text is only vectorized once
 
         # 4. Format the output
         results = []
-        for text, prediction in zip(input_data, predictions):
-            results.append({"input_text": text, "sentiment": prediction})
-            # Example adding probability if available:
-            # results.append({"input_text": text, "sentiment": prediction, "confidence": max(prob)})
+        if with_probabilities:
+            labels, rows = zip(*predictions)
+            fields = _probability_fields(rows, _scoring_model(loaded).classes_, top_k)
+            for text, prediction, extra in zip(input_data, labels, fields):
+                results.append({"input_text": text, "sentiment": prediction, **extra})
+        else:
+            for text, prediction in zip(input_data, predictions):
+                results.append({"input_text": text, "sentiment": prediction})
+        # Report which items were truncated or chunked
+        for i, action in long_text_actions.items():
+            results[i]["long_text"] = action
 
-        logger.info("Prediction batch completed successfully.")
+        logger.debug("Prediction batch completed successfully.")
         return results
 
     except Exception as e:
@@ -1,8 +1,18 @@
 # src/sentiment_analysis_service/preprocessing.py
 import re
 import string
+from functools import lru_cache
 from typing import List  # Use List for type hinting
 
+# Built once at import instead of on every call
+_PUNCTUATION_TABLE = str.maketrans("", "", string.punctuation)
+_WHITESPACE_RE = re.compile(r"\s+")
+# Joins a batch into one string so lower()/translate() run once per batch.
+# It is neither punctuation nor whitespace, so cleaning leaves it in place.
+_BATCH_SEPARATOR = "\x00"
+# TfidfVectorizer's default token pattern
+DEFAULT_TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+
 
 def preprocess_text(text: str) -> str:
     """
@@ -23,10 +33,10 @@ def preprocess_text(text: str) -> str:
         return ""
     text = text.lower()
     # Ensure punctuation removal handles unicode correctly if necessary
-    # Using str.maketrans is generally efficient
-    text = text.translate(str.maketrans("", "", string.punctuation))
-    text = re.sub(
-        r"\s+", " ", text
+    # The translation table is built once at module import
+    text = text.translate(_PUNCTUATION_TABLE)
+    text = _WHITESPACE_RE.sub(
+        " ", text
     ).strip()  # Replace multiple spaces with single and strip ends
     return text
 
@@ -35,13 +45,51 @@ def preprocess_batch(texts: List[str]) -> List[str]:
     """
     Applies preprocessing to a list of text strings.
 
+    Produces exactly the same output as calling preprocess_text() on each
+    item, but lowercases and strips punctuation for the whole batch in one
+    pass over a single joined string.
+
     Args:
         texts (List[str]): A list of text strings.
 
     Returns:
         List[str]: A list of cleaned text strings.
     """
-    return [preprocess_text(text) for text in texts]
+    if not texts:
+        return []
+    strings = [text if isinstance(text, str) else "" for text in texts]
+    joined = _BATCH_SEPARATOR.join(strings)
+    if joined.count(_BATCH_SEPARATOR) != len(strings) - 1:
+        # A text contains the separator itself; fall back to per-item cleaning
+        return [preprocess_text(text) for text in texts]
+    parts = joined.lower().translate(_PUNCTUATION_TABLE).split(_BATCH_SEPARATOR)
+    # str.split() splits on exactly the characters matched by \s
+    return [" ".join(part.split()) for part in parts]
+
+
+@lru_cache(maxsize=8)
+def _token_regex(token_pattern: str) -> "re.Pattern":
+    return re.compile(token_pattern)
+
+
+def tokenize_batch(
+    cleaned_texts: List[str], token_pattern: str = DEFAULT_TOKEN_PATTERN
+) -> List[List[str]]:
+    """
+    Splits already preprocessed texts into vectorizer tokens.
+
+    Cleaned text is already lowercase, so the tokens can be handed straight
+    to the model without the vectorizer lowercasing and tokenizing again.
+
+    Args:
+        cleaned_texts (List[str]): Output of preprocess_batch().
+        token_pattern (str): The vectorizer's token pattern.
+
+    Returns:
+        List[List[str]]: The tokens of each text.
+    """
+    findall = _token_regex(token_pattern).findall
+    return [findall(text) for text in cleaned_texts]
 
 
 # Example usage (optional, for testing the module directly)
@@ -0,0 +1,289 @@
+# src/sentiment_analysis_service/profiling.py
+"""
+Opt-in per-request profiling.
+
+A profiled request runs its predict() call through run_profiled(), on the
+inference executor like any other call. While it runs, the stages timed by
+metrics.observe_stage() (preprocess, tokenize, transform, classify) are also
+recorded in a RequestProfile held in a context variable of the worker thread
+or process, so concurrent requests never mix their breakdowns. Modes:
+
+- "stages": stage timings only; cheap enough to sample in production.
+- "memory": stage timings plus tracemalloc allocations per stage and the top
+  allocation sites. tracemalloc traces the whole process while it is on, so
+  allocations of concurrent requests are counted too.
+- "cprofile": stage timings plus the functions with the most cumulative time.
+
+When no request is being profiled the only cost is one context-variable
+lookup per stage.
+"""
+
+import contextvars
+import cProfile
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import (
+    PROFILE_SAMPLE_MODE,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_STORE_SIZE,
+    PROFILE_TOP_N,
+)
+
+PROFILE_MODES = ("stages", "memory", "cprofile")
+
+# Profile of the call running in this thread (None: not profiled)
+_current_profile: contextvars.ContextVar[Optional["RequestProfile"]] = (
+    contextvars.ContextVar("current_profile", default=None)
+)
+
+# tracemalloc is process-wide: it runs while any "memory" profile is active
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+def current_profile() -> Optional["RequestProfile"]:
+    """Returns the profile of the call running in this thread, if any."""
+    return _current_profile.get()
+
+
+def check_mode(mode: str) -> str:
+    """Validates a profiling mode name (ValueError if unknown)."""
+    if mode not in PROFILE_MODES:
+        raise ValueError(
+            f"Unknown profiling mode '{mode}'. Expected one of {PROFILE_MODES}."
+        )
+    return mode
+
+
+def _start_tracemalloc() -> None:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users += 1
+        if _tracemalloc_users == 1 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+def _stop_tracemalloc() -> None:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+
+
+class _StageTimer:
+    """Times one stage into both its histogram timer and the profile."""
+
+    def __init__(self, profile: "RequestProfile", stage: str, timer: Any):
+        self.profile = profile
+        self.stage = stage
+        self.timer = timer
+
+    def __enter__(self):
+        self.timer.__enter__()
+        if self.profile.memory:
+            tracemalloc.reset_peak()
+            self.memory_start = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.start
+        stage = self.profile.stages.setdefault(self.stage, {"seconds": 0.0, "calls": 0})
+        stage["seconds"] += seconds
+        stage["calls"] += 1
+        if self.profile.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            stage["allocated_bytes"] = stage.get("allocated_bytes", 0) + (
+                current - self.memory_start
+            )
+            stage["peak_bytes"] = max(
+                stage.get("peak_bytes", 0), peak - self.memory_start
+            )
+            # reset_peak() above also cleared the call-wide peak
+            self.profile.peak_memory = max(self.profile.peak_memory, peak)
+        return self.timer.__exit__(*exc_info)
+
+
+class RequestProfile:
+    """Stage timings (and allocations or function stats) of one call."""
+
+    def __init__(self, mode: str = "stages", top_n: int = PROFILE_TOP_N):
+        self.mode = check_mode(mode)
+        self.memory = mode == "memory"
+        self.top_n = top_n
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.peak_memory = 0  # Highest traced memory seen, in bytes
+
+    def stage(self, stage: str, timer: Any) -> _StageTimer:
+        return _StageTimer(self, stage, timer)
+
+    def run(self, func: Callable[..., Any], *args: Any) -> Tuple[Any, Dict[str, Any]]:
+        """Runs `func(*args)` under this profile; returns (result, report)."""
+        token = _current_profile.set(self)
+        profiler = cProfile.Profile() if self.mode == "cprofile" else None
+        if self.memory:
+            _start_tracemalloc()
+            memory_start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            if profiler is not None:
+                result = profiler.runcall(func, *args)
+            else:
+                result = func(*args)
+            report: Dict[str, Any] = {"mode": self.mode}
+            report["seconds"] = time.perf_counter() - start
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                snapshot = tracemalloc.take_snapshot()
+                report["memory"] = {
+                    "allocated_bytes": current - memory_start,
+                    "peak_bytes": max(peak, self.peak_memory) - memory_start,
+                    "top_sites": self._top_sites(snapshot),
+                }
+        finally:
+            if self.memory:
+                _stop_tracemalloc()
+            _current_profile.reset(token)
+        report["stages"] = self.stages
+        # Time outside the timed stages: cache lookups, result building, ...
+        report["stages"]["other"] = {
+            "seconds": max(
+                report["seconds"]
+                - sum(stage["seconds"] for stage in self.stages.values()),
+                0.0,
+            ),
+            "calls": 1,
+        }
+        if profiler is not None:
+            report["functions"] = self._top_functions(profiler)
+        return result, report
+
+    def _top_sites(self, snapshot: tracemalloc.Snapshot) -> List[Dict[str, Any]]:
+        snapshot = snapshot.filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+        return [
+            {
+                "site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "size_bytes": stat.size,
+                "count": stat.count,
+            }
+            for stat in snapshot.statistics("lineno")[: self.top_n]
+        ]
+
+    def _top_functions(self, profiler: cProfile.Profile) -> List[Dict[str, Any]]:
+        # {(file, line, name): (primitive calls, calls, tottime, cumtime, callers)}
+        stats = pstats.Stats(profiler).stats
+        rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                "function": f"{file}:{line}({name})",
+                "calls": calls,
+                "tottime": tottime,
+                "cumtime": cumtime,
+            }
+            for (file, line, name), (_, calls, tottime, cumtime, _) in rows[
+                : self.top_n
+            ]
+        ]
+
+
+def run_profiled(mode: str, func: Callable[..., Any], *args: Any) -> Tuple[Any, Any]:
+    """
+    Runs `func(*args)` with profiling; returns (result, report).
+
+    Module-level so it can be sent to process workers, where the stages are
+    recorded in the worker's own context.
+    """
+    return RequestProfile(mode).run(func, *args)
+
+
+def server_timing(report: Dict[str, Any]) -> str:
+    """Formats a report's stage timings as a Server-Timing header value."""
+    return ", ".join(
+        f"{name};dur={stage['seconds'] * 1000:.3f}"
+        for name, stage in report["stages"].items()
+    )
+
+
+class Profiler:
+    """
+    Decides which requests are profiled and keeps their reports.
+
+    Requests are profiled when they ask for it (see PROFILE_HEADER) or, at
+    `sample_rate`, in `sample_mode`. The last `store_size` reports are kept
+    in memory by id.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = PROFILE_SAMPLE_RATE,
+        sample_mode: str = PROFILE_SAMPLE_MODE,
+        store_size: int = PROFILE_STORE_SIZE,
+    ):
+        self.sample_rate = sample_rate
+        self.sample_mode = check_mode(sample_mode)
+        self.store_size = store_size
+        self._reports: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.profiled = 0
+
+    def configure(
+        self, sample_rate: Optional[float] = None, sample_mode: Optional[str] = None
+    ) -> None:
+        """Changes the sampling settings at runtime."""
+        if sample_mode is not None:
+            self.sample_mode = check_mode(sample_mode)
+        if sample_rate is not None:
+            if not 0.0 <= sample_rate <= 1.0:
+                raise ValueError("sample_rate must be between 0 and 1.")
+            self.sample_rate = sample_rate
+
+    def choose_mode(self, requested: Optional[str]) -> Optional[str]:
+        """Returns the mode to profile a request in, or None."""
+        if requested:
+            return check_mode(requested)
+        if self.sample_rate and random.random() < self.sample_rate:
+            return self.sample_mode
+        return None
+
+    def save(self, report: Dict[str, Any]) -> str:
+        """Stores a report and returns its id."""
+        profile_id = uuid.uuid4().hex[:16]
+        report["id"] = profile_id
+        self._reports[profile_id] = report
+        while len(self._reports) > self.store_size:
+            self._reports.popitem(last=False)
+        self.profiled += 1
+        return profile_id
+
+    def get(self, profile_id: str) -> Dict[str, Any]:
+        """Returns a stored report (KeyError if unknown or evicted)."""
+        return self._reports[profile_id]
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Summaries of the stored reports, newest first."""
+        return [
+            {
+                key: report.get(key)
+                for key in ("id", "path", "mode", "items", "seconds", "created_at")
+            }
+            for report in reversed(self._reports.values())
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sample_rate": self.sample_rate,
+            "sample_mode": self.sample_mode,
+            "stored": len(self._reports),
+            "store_size": self.store_size,
+            "profiled": self.profiled,
+        }
@@ -1,18 +1,27 @@
 # src/sentiment_analysis_service/schemas.py
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+from pydantic_core import PydanticCustomError
 from typing import (
+    Dict,
     List,
     Optional,
     Any,
 )  # Use Any for flexibility in sentiment type if needed
 
+from .config import ADMISSION_MAX_ITEMS, ADMISSION_MAX_TEXT_CHARS
+
 # --- Request Models ---
 
 
 class TextInput(BaseModel):
     """Schema for a single text input item."""
 
-    text: str = Field(..., min_length=1, description="The text content to analyze.")
+    text: str = Field(
+        ...,
+        min_length=1,
+        max_length=ADMISSION_MAX_TEXT_CHARS or None,
+        description="The text content to analyze.",
+    )
     # Example: Add optional ID if needed
     # id: Optional[str] = None
 
@@ -21,7 +30,45 @@ class PredictRequest(BaseModel):
     """Schema for the prediction request body."""
 
     inputs: List[TextInput] = Field(
-        ..., description="List of text inputs for sentiment analysis."
+        ...,
+        max_length=ADMISSION_MAX_ITEMS or None,
+        description="List of text inputs for sentiment analysis.",
+    )
+
+    @field_validator("inputs", mode="before")
+    @classmethod
+    def _check_item_count(cls, inputs: Any) -> Any:
+        # Before the items are validated, so an oversized batch is rejected
+        # without building a model per item (max_length checks afterwards)
+        if ADMISSION_MAX_ITEMS and isinstance(inputs, list):
+            if len(inputs) > ADMISSION_MAX_ITEMS:
+                raise PydanticCustomError(
+                    "too_long",
+                    "List should have at most {max_length} items, "
+                    "not {actual_length}",
+                    {"max_length": ADMISSION_MAX_ITEMS, "actual_length": len(inputs)},
+                )
+        return inputs
+
+
+class ReloadRequest(BaseModel):
+    """Schema for the /admin/reload request body."""
+
+    model_path: Optional[str] = Field(
+        None,
+        description="Model artifact to load, inside the models directory. "
+        "Defaults to the currently served path.",
+    )
+
+
+class ProfilingRequest(BaseModel):
+    """Schema for the /admin/profiling request body."""
+
+    sample_rate: Optional[float] = Field(
+        None, ge=0.0, le=1.0, description="Fraction of requests profiled."
+    )
+    sample_mode: Optional[str] = Field(
+        None, description='Mode of sampled profiles: "stages", "memory" or "cprofile".'
     )
 
 
@@ -34,6 +81,12 @@ class PredictionResult(BaseModel):
     input_text: str
     sentiment: str
     error: Optional[str] = None  # Include field for potential errors per item
+    # "truncated" or "chunked" when the long-text policy changed the input
+    long_text: Optional[str] = None
+    # Only with ?probabilities=true (or ?top_k=k): probability of the
+    # predicted label, and probability per label (the k most probable)
+    confidence: Optional[float] = None
+    probabilities: Optional[Dict[str, float]] = None
 
 
 class PredictResponse(BaseModel):
@@ -41,3 +94,54 @@ class PredictResponse(BaseModel):
 
     predictions: Optional[List[PredictionResult]] = None
     error: Optional[str] = None  # For top-level errors (e.g., model loading failed)
+
+
+class ColumnarPredictResponse(BaseModel):
+    """
+    Schema for /predict?format=columnar: parallel arrays, one entry per input.
+
+    Input texts are not echoed back. The optional keys are left out, rather
+    than set to null, when they do not apply.
+    """
+
+    count: int
+    labels: List[str]
+    error: Optional[str] = None
+    # Input index (as a string) -> "truncated" or "chunked", for the inputs
+    # the long-text policy changed
+    long_text: Optional[Dict[str, str]] = None
+    # Only with ?probabilities=true (or ?top_k=k); a label's array holds null
+    # where top_k left it out
+    confidence: Optional[List[float]] = None
+    probabilities: Optional[Dict[str, List[Optional[float]]]] = None
+
+
+class JobStatus(BaseModel):
+    """Schema for the status of an asynchronous /jobs job."""
+
+    job_id: str
+    # receiving, queued, running, succeeded, failed or cancelled
+    status: str
+    probabilities: bool
+    total_items: int
+    processed_items: int
+    n_chunks: int
+    chunks_done: int
+    error: Optional[str] = None
+    # Unix timestamps
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
+class JobResults(BaseModel):
+    """Schema for one page of a job's results."""
+
+    job_id: str
+    status: str
+    offset: int
+    # One record per input, in input order: a prediction (as in /predict) or
+    # an {"line": n, "error": ...} record for a malformed file line
+    results: List[Dict[str, Any]]
+    # Offset of the next page; None once this page reaches the last item
+    next_offset: Optional[int] = None
@@ -0,0 +1,106 @@
+# src/sentiment_analysis_service/serialization.py
+import json
+from typing import Any, Dict, List
+
+from fastapi.responses import Response
+
+try:  # Optional: several times faster than the stdlib encoder
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+RESPONSE_FORMATS = ("standard", "fast", "columnar")
+
+
+def _default(obj: Any) -> Any:
+    """Converts numpy scalars and arrays for the stdlib encoder."""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serializes `obj` to compact UTF-8 JSON.
+
+    Uses orjson when installed, otherwise the stdlib encoder with the same
+    compact separators. numpy labels and arrays are supported either way.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(
+        obj, ensure_ascii=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with dumps(), bypassing response_model validation."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _check_item(item: Dict[str, Any]) -> None:
+    # The Pydantic path fails the request when an item has no sentiment
+    # (predict() reports batch failures that way); keep the same behavior.
+    if "sentiment" not in item:
+        raise ValueError(item.get("error") or "Prediction result has no sentiment.")
+
+
+def standard_payload(prediction_dicts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Builds the PredictResponse JSON structure directly from predict() output.
+
+    Produces the same keys, order and nulls as
+    `PredictResponse(predictions=[PredictionResult(**p) ...])`, without
+    creating a model object per item.
+    """
+    predictions = []
+    for item in prediction_dicts:
+        _check_item(item)
+        predictions.append(
+            {
+                "input_text": item["input_text"],
+                "sentiment": item["sentiment"],
+                "error": item.get("error"),
+                "long_text": item.get("long_text"),
+                "confidence": item.get("confidence"),
+                "probabilities": item.get("probabilities"),
+            }
+        )
+    return {"predictions": predictions, "error": None}
+
+
+def columnar_payload(prediction_dicts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Builds a columnar response: parallel arrays instead of one object per item.
+
+    `labels[i]` belongs to input i. Input texts are not echoed back. If the
+    long-text policy changed any input, `long_text` maps those indices (as
+    strings) to the action taken; the key is absent otherwise. When
+    probabilities were requested, `confidence` is one more array and
+    `probabilities` maps each label to an array (null where top_k left the
+    label out).
+    """
+    labels = []
+    long_text = {}
+    for i, item in enumerate(prediction_dicts):
+        _check_item(item)
+        labels.append(item["sentiment"])
+        if item.get("long_text"):
+            long_text[str(i)] = item["long_text"]
+    payload = {"count": len(labels), "labels": labels, "error": None}
+    if long_text:
+        payload["long_text"] = long_text
+    if prediction_dicts and "confidence" in prediction_dicts[0]:
+        payload["confidence"] = [item["confidence"] for item in prediction_dicts]
+        names = dict.fromkeys(
+            name for item in prediction_dicts for name in item["probabilities"]
+        )
+        payload["probabilities"] = {
+            name: [item["probabilities"].get(name) for item in prediction_dicts]
+            for name in sorted(names)
+        }
+    return payload
@@ -0,0 +1,332 @@
+# src/sentiment_analysis_service/shadow.py
+"""
+Shadow scoring: candidate models scored on the same traffic as production.
+
+predict() hands each preprocessed batch, with the labels production returned
+for it, to ShadowScorer.submit(), which only enqueues it. A background thread
+scores the batch with every registered shadow model and records, per model,
+how often it agreed with production and how long it took next to the
+production pass. None of this is on the response path: when the queue is
+full the batch is dropped (and counted), never waited for.
+
+Preprocessing runs once, in the production pass. Shadow models whose
+vectorizer is identical to production's (same vocabulary, idf and settings)
+also share the feature matrix: the rows production already computed for its
+cache misses are reused, the remaining texts are transformed once for all
+of them, and only their classifiers run per model.
+"""
+
+import hashlib
+import json
+import logging
+import queue
+import random
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .config import SHADOW_QUEUE_SIZE, SHADOW_SAMPLE_RATE
+from .metrics import SHADOW_BATCHES, SHADOW_PREDICTIONS, SHADOW_SECONDS
+from .model_manager import LoadedModel
+
+logger = logging.getLogger(__name__)
+
+# Vectorizer settings that change transform() output (vocabulary_ and idf_
+# are hashed separately)
+_VECTORIZER_PARAMS = (
+    "analyzer",
+    "binary",
+    "dtype",
+    "lowercase",
+    "ngram_range",
+    "norm",
+    "preprocessor",
+    "strip_accents",
+    "sublinear_tf",
+    "token_pattern",
+    "tokenizer",
+    "use_idf",
+)
+# Fingerprints are computed once per pipeline object
+_vectorizer_keys: "weakref.WeakKeyDictionary[Any, Optional[str]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def parse_shadow_models(spec: str) -> Dict[str, Path]:
+    """Parses SHADOW_MODELS ("name=path,name=path") into {name: path}."""
+    models = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, sep, path = entry.partition("=")
+        if not sep or not name.strip() or not path.strip():
+            raise ValueError(f"Invalid shadow model '{entry}'; expected name=path.")
+        models[name.strip()] = Path(path.strip())
+    return models
+
+
+def vectorizer_key(model: Any) -> Optional[str]:
+    """
+    Fingerprints the vectorizer of a (vectorizer, classifier) pipeline.
+
+    Two pipelines with the same key produce identical feature matrices, so
+    one matrix can feed both classifiers. Returns None for models without a
+    shareable vectorizer (compiled artifacts, other pipeline shapes).
+    """
+    steps = getattr(model, "steps", None)
+    if not steps or len(steps) != 2:
+        return None
+    try:
+        return _vectorizer_keys[model]
+    except KeyError:
+        pass
+    vectorizer = steps[0][1]
+    key = None
+    if hasattr(vectorizer, "vocabulary_") and hasattr(vectorizer, "transform"):
+        params = vectorizer.get_params()
+        digest = hashlib.sha256(
+            json.dumps(
+                {name: repr(params.get(name)) for name in _VECTORIZER_PARAMS},
+                sort_keys=True,
+            ).encode()
+        )
+        digest.update(
+            json.dumps(sorted(vectorizer.vocabulary_.items()), default=int).encode()
+        )
+        if getattr(vectorizer, "use_idf", False):
+            digest.update(np.asarray(vectorizer.idf_, dtype=np.float64).tobytes())
+        key = digest.hexdigest()[:16]
+    _vectorizer_keys[model] = key
+    return key
+
+
+@dataclass
+class ShadowBatch:
+    """One production batch, as handed to the shadow scorer."""
+
+    cleaned: List[str]  # Preprocessed texts, one per input
+    labels: List[Any]  # Production's result per input
+    primary: LoadedModel  # The production model that scored the batch
+    primary_seconds: float  # Production preprocessing + scoring time
+    with_probabilities: bool = False  # labels are (label, probabilities) tuples
+    exclude: Set[int] = field(default_factory=set)  # Chunked long texts
+    # Feature rows production computed for its cache misses, if any
+    features: Any = None
+    feature_texts: Optional[List[str]] = None
+
+
+class ShadowModel:
+    """A registered candidate model and its comparison with production."""
+
+    def __init__(self, name: str, loaded: LoadedModel):
+        self.name = name
+        self.loaded = loaded
+        self.key = vectorizer_key(loaded.model)
+        self.batches = 0
+        self.items = 0
+        self.agreed = 0
+        self.seconds = 0.0
+        self.primary_seconds = 0.0
+        self.reused_rows = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+
+    def stats(self, primary_key: Optional[str]) -> Dict[str, Any]:
+        return {
+            "version": self.loaded.version,
+            "path": str(self.loaded.path),
+            "shares_vectorizer": self.key is not None and self.key == primary_key,
+            "batches": self.batches,
+            "items": self.items,
+            "agreement": self.agreed / self.items if self.items else None,
+            "mean_seconds": self.seconds / self.batches if self.batches else None,
+            "mean_primary_seconds": (
+                self.primary_seconds / self.batches if self.batches else None
+            ),
+            "relative_latency": (
+                self.seconds / self.primary_seconds if self.primary_seconds else None
+            ),
+            "reused_rows": self.reused_rows,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+
+class ShadowScorer:
+    """
+    Scores sampled production batches with registered shadow models.
+
+    submit() never blocks: batches beyond `queue_size` are dropped. The
+    worker thread is started with the first registered model.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = SHADOW_SAMPLE_RATE,
+        queue_size: int = SHADOW_QUEUE_SIZE,
+    ):
+        self.sample_rate = sample_rate
+        self.queue_size = queue_size
+        self._models: Dict[str, ShadowModel] = {}
+        self._queue: "queue.Queue[Optional[ShadowBatch]]" = queue.Queue(queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._dropped = 0
+        self._primary_key: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        """True if any shadow model is registered."""
+        return bool(self._models)
+
+    def register(self, name: str, loaded: LoadedModel) -> None:
+        """Adds (or replaces) a shadow model and starts the worker if needed."""
+        model = ShadowModel(name, loaded)
+        with self._lock:
+            self._models = {**self._models, name: model}
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="shadow-scorer", daemon=True
+                )
+                self._thread.start()
+        logger.info(
+            f"Shadow model '{name}' registered: version={loaded.version}, "
+            f"path={loaded.path}"
+        )
+
+    def unregister(self, name: str) -> None:
+        """Stops scoring with a shadow model (KeyError if unknown)."""
+        with self._lock:
+            models = dict(self._models)
+            del models[name]
+            self._models = models
+        logger.info(f"Shadow model '{name}' unregistered.")
+
+    def should_sample(self) -> bool:
+        """Decides whether the current batch is mirrored to the shadows."""
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def submit(self, batch: ShadowBatch) -> bool:
+        """Queues a batch for shadow scoring; returns False if it was dropped."""
+        try:
+            self._queue.put_nowait(batch)
+        except queue.Full:
+            self._dropped += 1
+            SHADOW_BATCHES.labels("dropped").inc()
+            return False
+        self._submitted += 1
+        return True
+
+    def flush(self) -> None:
+        """Blocks until every queued batch has been scored."""
+        self._queue.join()
+
+    def shutdown(self) -> None:
+        """Scores what is queued, then stops the worker and drops all models."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._models = {}
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._queue.get()
+            try:
+                if batch is None:
+                    return
+                self._score(batch)
+            except Exception as e:  # Never let the worker die
+                logger.error(f"Shadow scoring failed: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    def _shared_features(
+        self, batch: ShadowBatch, texts: List[str]
+    ) -> Tuple[List[str], Any, int]:
+        """
+        Builds production's feature matrix for `texts`, reusing the rows
+        production computed. Returns (row texts, matrix, reused row count).
+        """
+        import scipy.sparse as sp
+
+        order: List[str] = []
+        parts = []
+        known: Set[str] = set()
+        if batch.features is not None and batch.feature_texts:
+            order.extend(batch.feature_texts)
+            parts.append(batch.features)
+            known.update(batch.feature_texts)
+        missing = [text for text in texts if text not in known]
+        if missing:
+            order.extend(missing)
+            parts.append(batch.primary.model.steps[0][1].transform(missing))
+        matrix = parts[0] if len(parts) == 1 else sp.vstack(parts, format="csr")
+        return order, matrix, len(order) - len(missing)
+
+    def _score(self, batch: ShadowBatch) -> None:
+        indices = [i for i in range(len(batch.cleaned)) if i not in batch.exclude]
+        if not indices:
+            return
+        production = [
+            str(label[0] if batch.with_probabilities else label)
+            for label in batch.labels
+        ]
+        distinct = list(dict.fromkeys(batch.cleaned[i] for i in indices))
+        self._primary_key = primary_key = vectorizer_key(batch.primary.model)
+        SHADOW_SECONDS.labels("production").observe(batch.primary_seconds)
+        shared = None
+        shared_seconds = 0.0
+        for model in list(self._models.values()):
+            start = time.perf_counter()
+            try:
+                reused = 0
+                if model.key is not None and model.key == primary_key:
+                    if shared is None:
+                        shared = self._shared_features(batch, distinct)
+                        shared_seconds = time.perf_counter() - start
+                        start = time.perf_counter()
+                    texts, features, reused = shared
+                    predicted = model.loaded.model.steps[-1][1].predict(features)
+                else:
+                    texts = distinct
+                    predicted = model.loaded.model.predict(distinct)
+                # The shared matrix counts towards every model that uses it
+                seconds = time.perf_counter() - start + shared_seconds
+            except Exception as e:
+                model.errors += 1
+                model.last_error = f"{type(e).__name__}: {e}"
+                logger.warning(f"Shadow model '{model.name}' failed: {e}")
+                continue
+            by_text = dict(zip(texts, (str(label) for label in predicted)))
+            agreed = sum(by_text[batch.cleaned[i]] == production[i] for i in indices)
+            model.batches += 1
+            model.items += len(indices)
+            model.agreed += agreed
+            model.seconds += seconds
+            model.primary_seconds += batch.primary_seconds
+            model.reused_rows += reused
+            SHADOW_PREDICTIONS.labels(model.name, "agree").inc(agreed)
+            SHADOW_PREDICTIONS.labels(model.name, "disagree").inc(len(indices) - agreed)
+            SHADOW_SECONDS.labels(model.name).observe(seconds)
+        SHADOW_BATCHES.labels("scored").inc()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns queue counters and the per-model comparison with production."""
+        return {
+            "sample_rate": self.sample_rate,
+            "queue_size": self.queue_size,
+            "queued": self._queue.qsize(),
+            "submitted": self._submitted,
+            "dropped": self._dropped,
+            "models": {
+                name: model.stats(self._primary_key)
+                for name, model in self._models.items()
+            },
+        }
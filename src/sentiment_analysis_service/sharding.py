@@ -0,0 +1,146 @@
+# src/sentiment_analysis_service/sharding.py
+"""
+Persistent process pool that scores the shards of one huge batch in parallel.
+
+TF-IDF transform and LogisticRegression predict run on a single core, so a
+100k-item predict() call is as slow on a 16-core machine as on one core.
+ShardPool splits such a batch into one contiguous shard per worker and
+scores the shards concurrently. Each worker loads the model once when it
+starts (memory-mapped compiled artifacts share their pages between
+workers) and results are reassembled in input order.
+
+Workers are started with "spawn": the server process runs threads (event
+loop, executor, log writer) that must not be forked.
+
+Sharding is opt-in (PREDICT_SHARD_WORKERS > 1): the pool starts with the
+server, and with a pickled model every worker adds a full model copy.
+"""
+
+import logging
+import math
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Sequence
+
+from .config import PREDICT_SHARD_THRESHOLD, PREDICT_SHARD_WORKERS
+
+logger = logging.getLogger(__name__)
+
+
+def _init_shard_worker(model_path: Optional[str]) -> None:
+    """Loads the model once per worker; workers never shard again themselves."""
+    from .predict import load_model, set_sharding
+
+    set_sharding(False)
+    load_model(Path(model_path) if model_path is not None else None)
+
+
+def _ready() -> bool:
+    return True
+
+
+def split_shards(items: Sequence[Any], n_shards: int) -> List[Sequence[Any]]:
+    """Splits `items` into at most `n_shards` contiguous, near-equal shards."""
+    size = max(1, math.ceil(len(items) / max(1, n_shards)))
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+class ShardPool:
+    """
+    Scores shards of large batches on a persistent pool of worker processes.
+
+    The pool is created on first use (or by start()) and kept for the life
+    of the process. After a model swap, recycle() replaces the workers so
+    they load the new model.
+    """
+
+    def __init__(
+        self,
+        workers: int = PREDICT_SHARD_WORKERS,
+        threshold: int = PREDICT_SHARD_THRESHOLD,
+    ):
+        self.workers = workers
+        self.threshold = threshold
+        self._model_path: Optional[str] = None
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """True if batches can be sharded at all (2+ workers, threshold set)."""
+        return self.workers > 1 and self.threshold > 0
+
+    @property
+    def running(self) -> bool:
+        """True once the worker processes have been started."""
+        return self._pool is not None
+
+    def should_shard(self, n_items: int) -> bool:
+        """True if a batch of `n_items` is large enough to be sharded."""
+        return self.enabled and n_items >= self.threshold
+
+    def start(self, model_path: Optional[Path] = None) -> None:
+        """
+        Starts the workers and waits until each has loaded the model.
+
+        Called at service startup so the first large batch does not pay for
+        process start-up and model loading. Idempotent.
+        """
+        with self._lock:
+            if model_path is not None:
+                self._model_path = str(model_path)
+            if self._pool is not None or not self.enabled:
+                return
+            self._pool = self._create_pool()
+            pool = self._pool
+        # One no-op per worker forces every process to start and initialize
+        for future in [pool.submit(_ready) for _ in range(self.workers)]:
+            future.result()
+        logger.info(f"Shard pool started: workers={self.workers}.")
+
+    def _create_pool(self) -> Executor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_shard_worker,
+            initargs=(self._model_path,),
+        )
+
+    def map(self, func: Callable[..., Any], shards: Sequence[Any], *args: Any) -> List:
+        """
+        Runs `func(shard, *args)` for every shard in parallel.
+
+        Returns:
+            List: The results, in shard order.
+        """
+        if self._pool is None:
+            self.start()
+        with self._lock:
+            pool = self._pool
+        futures = [pool.submit(func, shard, *args) for shard in shards]
+        return [future.result() for future in futures]
+
+    def recycle(self, model_path: Optional[Path] = None) -> None:
+        """
+        Replaces running workers so they load the model at `model_path`.
+
+        Shards already submitted finish on the old workers, which then exit.
+        Does nothing if the pool has not been started.
+        """
+        with self._lock:
+            if model_path is not None:
+                self._model_path = str(model_path)
+            if self._pool is None:
+                return
+            old_pool, self._pool = self._pool, self._create_pool()
+        old_pool.shutdown(wait=False)
+        logger.info(f"Recycled shard workers for model {self._model_path}.")
+
+    def shutdown(self) -> None:
+        """Stops the workers. Safe to call more than once."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
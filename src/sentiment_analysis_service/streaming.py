@@ -0,0 +1,154 @@
+# src/sentiment_analysis_service/streaming.py
+import json
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from .config import STREAM_CHUNK_SIZE, STREAM_MAX_LINE_BYTES
+
+# Content types treated as newline-delimited JSON; anything else is plain text
+NDJSON_CONTENT_TYPES = (
+    "application/x-ndjson",
+    "application/ndjson",
+    "application/jsonl",
+    "application/json-lines",
+)
+
+
+# A parsed input line: the text to score, or the error record of a bad line
+Entry = Union[str, Dict[str, Any]]
+
+
+class LineTooLongError(ValueError):
+    """Raised when a single input line exceeds STREAM_MAX_LINE_BYTES."""
+
+
+class RequestStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator reads the request body as it goes.
+
+    For ASGI servers below spec 2.4, Starlette's StreamingResponse polls
+    `receive()` for disconnects while streaming, which would swallow the
+    request body chunks our iterator is still waiting for. Here the iterator
+    owns `receive()`; a client disconnect surfaces as ClientDisconnect from
+    `request.stream()` or as an error when sending.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+
+def is_ndjson(content_type: str) -> bool:
+    """Returns True if the request body should be parsed as NDJSON."""
+    return content_type.split(";")[0].strip().lower() in NDJSON_CONTENT_TYPES
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes], max_line_bytes: int = STREAM_MAX_LINE_BYTES
+) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Yields (line number, decoded line) pairs from a stream of byte chunks.
+
+    Only the current partial line is buffered, so memory stays bounded by
+    `max_line_bytes` whatever the size of the body.
+    """
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            yield line_number, line.decode("utf-8", errors="replace").rstrip("\r")
+        if len(buffer) > max_line_bytes:
+            raise LineTooLongError(
+                f"Line {line_number + 1} exceeds {max_line_bytes} bytes."
+            )
+    if buffer:
+        yield line_number + 1, buffer.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def parse_line(line: str, ndjson: bool) -> str:
+    """
+    Extracts the text to score from one input line.
+
+    NDJSON lines may be a JSON string or an object with a "text" field (the
+    same shape as a /predict input item). Plain-text lines are used as is.
+
+    Raises:
+        ValueError: If an NDJSON line is malformed or has no usable text.
+    """
+    if not ndjson:
+        return line
+    item = json.loads(line)
+    text = item.get("text") if isinstance(item, dict) else item
+    if not isinstance(text, str) or not text:
+        raise ValueError('Expected a non-empty string or an object with "text".')
+    return text
+
+
+async def iter_chunks(
+    lines: AsyncIterable[Tuple[int, str]],
+    ndjson: bool,
+    chunk_size: Optional[int] = None,
+) -> AsyncIterator[List[Entry]]:
+    """
+    Groups parsed lines into chunks of at most `chunk_size` entries.
+
+    Each entry is either the text of a line or, for a malformed line, an
+    `{"line": n, "error": ...}` record, in input order. Malformed lines
+    count towards the chunk size, so a body of them is still streamed in
+    bounded pieces. Blank lines are skipped. `chunk_size` defaults to
+    STREAM_CHUNK_SIZE.
+    """
+    chunk_size = chunk_size or STREAM_CHUNK_SIZE
+    entries: List[Entry] = []
+    async for line_number, line in lines:
+        if not line.strip():
+            continue
+        try:
+            entries.append(parse_line(line, ndjson))
+        except ValueError as e:  # json.JSONDecodeError is a ValueError
+            entries.append({"line": line_number, "error": f"Invalid input line: {e}"})
+        if len(entries) >= chunk_size:
+            yield entries
+            entries = []
+    if entries:
+        yield entries
+
+
+def chunk_texts(entries: List[Entry]) -> List[str]:
+    """Returns the texts to score from a chunk of entries."""
+    return [entry for entry in entries if isinstance(entry, str)]
+
+
+def merge_results(entries: List[Entry], results: List[Any]) -> List[Any]:
+    """
+    Puts the results for chunk_texts(entries) back in input order.
+
+    Error records stay in the place of their line, so output record i
+    always belongs to entry i.
+    """
+    scored = iter(results)
+    return [next(scored) if isinstance(entry, str) else entry for entry in entries]
+
+
+def to_ndjson(records: List[Union[Dict[str, Any], Any]]) -> str:
+    """Serializes records as newline-delimited JSON."""
+    return "".join(json.dumps(record) + "\n" for record in records)
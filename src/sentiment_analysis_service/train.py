@@ -0,0 +1,642 @@
+# src/sentiment_analysis_service/train.py
+"""
+Streaming training of the TF-IDF + linear sentiment model.
+
+Usage:
+    python -m sentiment_analysis_service.train [INPUT] [--output PATH]
+        [--text-column text] [--label-column sentiment] [--chunk-size N]
+        [--workers N] [--epochs N] [--min-df N] [--max-features N]
+        [--max-rows N] [--no-shuffle] [--no-mlflow]
+        [--scaling-report 10000,100000,...]
+
+Replaces the in-memory notebook fit. The corpus (CSV, JSONL or Parquet) is
+read in chunks and never held in memory at once:
+
+1. Vocabulary pass: document frequencies are counted per chunk on a process
+   pool and merged; rare terms are pruned (and the vocabulary optionally
+   capped), then idf is computed exactly as TfidfVectorizer would.
+2. Shuffle pass: the training rows are spread over bucket files in a
+   temporary directory, each row in a random bucket, so no chunk holds a
+   run of sorted input (a corpus ordered by label would otherwise train one
+   class at a time).
+3. Training passes: every epoch reads the buckets in a new random order and
+   shuffles the rows of each one; chunks of them are turned into TF-IDF rows
+   on the pool while the main process trains an SGDClassifier (logistic
+   loss) with partial_fit.
+4. Evaluation pass: the held-out rows are scored and, if mlflow is
+   installed, parameters, metrics and the model are logged to MLflow.
+
+The result is a regular (TfidfVectorizer, classifier) pipeline written
+atomically to OUTPUT, so load_model(), the compiled engine and the export
+tool all work with it.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import pickle
+import tempfile
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, TfidfVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score, classification_report
+from sklearn.pipeline import Pipeline
+
+from .batch import infer_format, read_chunks
+from .compiled import token_fed_pipeline
+from .config import (
+    MLFLOW_EXPERIMENT_NAME,
+    MODEL_PATH,
+    TRAIN_CHUNK_SIZE,
+    TRAIN_DATA_PATH,
+    TRAIN_EPOCHS,
+    TRAIN_LABEL_COLUMN,
+    TRAIN_MAX_FEATURES,
+    TRAIN_MIN_DF,
+    TRAIN_TEST_SIZE,
+    TRAIN_TEXT_COLUMN,
+)
+from .logging_setup import configure_logging
+from .preprocessing import DEFAULT_TOKEN_PATTERN, preprocess_batch, tokenize_batch
+
+logger = logging.getLogger(__name__)
+
+# Vectorizer used by featurizing workers (set by _init_featurizer)
+_featurizer = None
+
+# Upper bound on shuffle buckets (open files during the shuffle pass)
+MAX_SHUFFLE_BUCKETS = 256
+
+
+def holdout_mask(
+    start: int, n_rows: int, test_size: float, seed: int = 42
+) -> np.ndarray:
+    """
+    Returns which of rows start..start+n_rows-1 are held out for evaluation.
+
+    The split is a hash of the row number, so it does not depend on the
+    chunk size and every pass over the file sees the same split.
+    """
+    if test_size <= 0:
+        return np.zeros(n_rows, dtype=bool)
+    rows = np.arange(start, start + n_rows, dtype=np.uint64)
+    hashed = (rows + np.uint64(seed)) * np.uint64(2654435761) % np.uint64(1 << 32)
+    return hashed / float(1 << 32) < test_size
+
+
+def labeled_chunks(
+    path: Path,
+    fmt: str,
+    text_column: str,
+    label_column: str,
+    chunk_size: int,
+    max_rows: Optional[int] = None,
+    test_size: float = 0.0,
+    seed: int = 42,
+) -> Iterator[Tuple[List[Any], np.ndarray, np.ndarray]]:
+    """
+    Yields (texts, labels, is_test) for each chunk of the training file.
+
+    Rows without a label are skipped; at most `max_rows` rows are read.
+    """
+    rows_read = 0
+    for frame in read_chunks(path, fmt, chunk_size):
+        missing = [c for c in (text_column, label_column) if c not in frame.columns]
+        if missing:
+            raise ValueError(
+                f"Column(s) {missing} not found in {path}. "
+                f"Available columns: {list(frame.columns)}"
+            )
+        if max_rows is not None:
+            frame = frame.iloc[: max_rows - rows_read]
+        is_test = holdout_mask(rows_read, len(frame), test_size, seed)
+        rows_read += len(frame)
+        labeled = frame[label_column].notna().to_numpy()
+        if labeled.any():
+            yield (
+                frame[text_column].to_numpy(dtype=object)[labeled].tolist(),
+                frame[label_column].to_numpy()[labeled].astype(str),
+                is_test[labeled],
+            )
+        if max_rows is not None and rows_read >= max_rows:
+            break
+
+
+def _count_terms(texts: List[Any], stop_words: Optional[str]) -> Tuple[Counter, int]:
+    """Counts the documents each term occurs in (runs inside a worker)."""
+    excluded = ENGLISH_STOP_WORDS if stop_words == "english" else frozenset()
+    document_frequency: Counter = Counter()
+    for tokens in tokenize_batch(preprocess_batch(texts), DEFAULT_TOKEN_PATTERN):
+        document_frequency.update(set(tokens).difference(excluded))
+    return document_frequency, len(texts)
+
+
+def _init_featurizer(vectorizer: TfidfVectorizer) -> None:
+    """Keeps a token-fed copy of the vectorizer in this worker."""
+    global _featurizer
+    pipeline = Pipeline([("tfidf", vectorizer), ("clf", None)])
+    _featurizer = token_fed_pipeline(pipeline).steps[0][1]
+
+
+def _featurize(texts: List[Any]) -> Any:
+    """Turns raw texts into TF-IDF rows (runs inside a worker)."""
+    tokens = tokenize_batch(preprocess_batch(texts), _featurizer.token_pattern)
+    return _featurizer.transform(tokens)
+
+
+def _map_ordered(
+    func: Callable,
+    items: Iterable[Tuple[Any, ...]],
+    workers: int,
+    initializer: Optional[Callable] = None,
+    initargs: Tuple[Any, ...] = (),
+) -> Iterator[Tuple[Any, Any]]:
+    """
+    Yields (item, func(*item[0])) in input order, computed on a process pool.
+
+    Each item is (args, context); only `args` is sent to the workers. At most
+    2 * workers items are in flight, so memory stays bounded however long
+    the input is. With one worker everything runs in this process.
+    """
+    if workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for args, context in items:
+            yield context, func(*args)
+        return
+    pending: deque = deque()
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=initializer, initargs=initargs
+    ) as pool:
+        for args, context in items:
+            pending.append((context, pool.submit(func, *args)))
+            if len(pending) >= 2 * workers:
+                context, future = pending.popleft()
+                yield context, future.result()
+        while pending:
+            context, future = pending.popleft()
+            yield context, future.result()
+
+
+def spill_shuffled(
+    rows: Iterable[Tuple[List[Any], np.ndarray]],
+    directory: Path,
+    n_buckets: int,
+    rng: np.random.Generator,
+) -> List[Path]:
+    """
+    Writes (texts, labels) chunks to `n_buckets` files, each row to a random
+    one, and returns the bucket paths.
+
+    Only one chunk is in memory at a time; a bucket ends up with about
+    1 / n_buckets of the rows, drawn from the whole input.
+    """
+    paths = [directory / f"bucket-{b:04d}.pkl" for b in range(n_buckets)]
+    files = [open(path, "wb") for path in paths]
+    try:
+        for texts, labels in rows:
+            buckets = rng.integers(n_buckets, size=len(labels))
+            for b in np.unique(buckets):
+                rows_in_bucket = np.flatnonzero(buckets == b)
+                pickle.dump(
+                    ([texts[i] for i in rows_in_bucket], labels[rows_in_bucket]),
+                    files[b],
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+    finally:
+        for f in files:
+            f.close()
+    return paths
+
+
+def shuffled_chunks(
+    buckets: List[Path], chunk_size: int, rng: np.random.Generator
+) -> Iterator[Tuple[List[Any], np.ndarray]]:
+    """
+    Yields (texts, labels) chunks of the spilled rows in a random order.
+
+    Buckets are visited in a random order and the rows of each are shuffled
+    before being cut into chunks, so every call gives a new permutation.
+    """
+    for b in rng.permutation(len(buckets)):
+        texts: List[Any] = []
+        labels: List[np.ndarray] = []
+        with open(buckets[b], "rb") as f:
+            while True:
+                try:
+                    chunk_texts, chunk_labels = pickle.load(f)
+                except EOFError:
+                    break
+                texts.extend(chunk_texts)
+                labels.append(chunk_labels)
+        if not texts:
+            continue
+        order = rng.permutation(len(texts))
+        bucket_labels = np.concatenate(labels)
+        for start in range(0, len(order), chunk_size):
+            rows = order[start : start + chunk_size]
+            yield [texts[i] for i in rows], bucket_labels[rows]
+
+
+def build_vectorizer(
+    document_frequency: Counter,
+    n_documents: int,
+    min_df: int = TRAIN_MIN_DF,
+    max_features: int = TRAIN_MAX_FEATURES,
+    stop_words: Optional[str] = "english",
+) -> TfidfVectorizer:
+    """
+    Builds a fitted TfidfVectorizer from merged document frequencies.
+
+    Produces the same vocabulary and idf as TfidfVectorizer(min_df=min_df,
+    stop_words=stop_words).fit() on the same preprocessed documents, without
+    needing them all in memory. `max_features` keeps the terms that occur in
+    the most documents (sklearn ranks by total count, which would need a
+    second counter per term).
+    """
+    terms = [t for t, df in document_frequency.items() if df >= min_df]
+    if max_features and len(terms) > max_features:
+        # Highest document frequency first; ties broken alphabetically
+        terms.sort(key=lambda t: (-document_frequency[t], t))
+        terms = terms[:max_features]
+    if not terms:
+        raise ValueError(
+            f"No terms occur in at least {min_df} training documents; "
+            "lower --min-df or train on more data."
+        )
+    terms.sort()
+    vectorizer = TfidfVectorizer(
+        stop_words=stop_words, vocabulary={t: j for j, t in enumerate(terms)}
+    )
+    vectorizer._validate_vocabulary()
+    df = np.array([document_frequency[t] for t in terms], dtype=np.float64)
+    # smooth_idf=True, as in TfidfTransformer
+    vectorizer.idf_ = np.log((1 + n_documents) / (1 + df)) + 1
+    return vectorizer
+
+
+def peak_memory() -> Dict[str, Optional[int]]:
+    """
+    Returns the peak resident memory of this process and of its finished
+    child processes (the largest single child), in bytes; None where the
+    resource module is not available.
+    """
+    try:
+        import resource
+    except ImportError:
+        return {"peak_rss_bytes": None, "peak_worker_rss_bytes": None}
+    # ru_maxrss is in kilobytes on Linux
+    return {
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "peak_worker_rss_bytes": (
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+        ),
+    }
+
+
+def _log_to_mlflow(
+    pipeline: Pipeline,
+    params: Dict[str, Any],
+    metrics: Dict[str, float],
+    report: str,
+) -> Optional[str]:
+    """Logs a training run like the notebook does; returns the run id."""
+    try:
+        import mlflow
+        import mlflow.sklearn
+    except ImportError:
+        logger.warning("mlflow is not installed; skipping experiment tracking.")
+        return None
+    mlflow.set_experiment(MLFLOW_EXPERIMENT_NAME)
+    with mlflow.start_run(run_name="SGDClassifier_StreamingTFIDF") as run:
+        mlflow.log_params(params)
+        mlflow.log_metrics(metrics)
+        mlflow.log_text(report, "classification_report.txt")
+        mlflow.sklearn.log_model(pipeline, "sentiment-model")
+    logger.info(f"MLflow Run ID: {run.info.run_id}")
+    return run.info.run_id
+
+
+def train_model(
+    input_path: Path = TRAIN_DATA_PATH,
+    output: Path = MODEL_PATH,
+    input_format: Optional[str] = None,
+    text_column: str = TRAIN_TEXT_COLUMN,
+    label_column: str = TRAIN_LABEL_COLUMN,
+    chunk_size: int = TRAIN_CHUNK_SIZE,
+    workers: int = os.cpu_count() or 1,
+    epochs: int = TRAIN_EPOCHS,
+    min_df: int = TRAIN_MIN_DF,
+    max_features: int = TRAIN_MAX_FEATURES,
+    stop_words: Optional[str] = "english",
+    alpha: float = 1e-5,
+    test_size: float = TRAIN_TEST_SIZE,
+    max_rows: Optional[int] = None,
+    seed: int = 42,
+    shuffle: bool = True,
+    log_mlflow: bool = True,
+) -> Dict[str, Any]:
+    """
+    Trains the sentiment pipeline on a corpus streamed from disk.
+
+    Args:
+        input_path (Path): CSV, JSONL or Parquet file with text and label columns.
+        output (Path): Where to write the joblib pipeline (replaced atomically,
+                       so a watching server only ever sees a complete file).
+        input_format (Optional[str]): Input format; inferred from the suffix.
+        text_column (str): Column holding the raw text.
+        label_column (str): Column holding the sentiment label.
+        chunk_size (int): Rows per chunk handed to a worker.
+        workers (int): Feature extraction processes; 1 runs in this process.
+        epochs (int): Passes of partial_fit over the training rows.
+        min_df (int): Minimum number of training documents a term must occur in.
+        max_features (int): Keep only this many most frequent terms (0 = all).
+        stop_words (Optional[str]): "english" (as in the notebook) or None.
+        alpha (float): SGDClassifier regularization strength.
+        test_size (float): Fraction of rows held out for evaluation.
+        max_rows (Optional[int]): Only read this many rows of the input.
+        seed (int): Seed for the train/test split, the shuffling and the
+                    solver.
+        shuffle (bool): Shuffle the training rows every epoch. The rows are
+                        copied to bucket files in the temporary directory
+                        (see TMPDIR) first; False trains on them in file
+                        order, straight from the input.
+        log_mlflow (bool): Log the run to MLflow if it is installed.
+
+    Returns:
+        Dict[str, Any]: Row counts, vocabulary size, accuracy, per-pass and
+                        total seconds, peak memory and the MLflow run id.
+    """
+    input_path, output = Path(input_path), Path(output)
+    input_format = input_format or infer_format(input_path)
+
+    def chunks() -> Iterator[Tuple[List[Any], np.ndarray, np.ndarray]]:
+        return labeled_chunks(
+            input_path,
+            input_format,
+            text_column,
+            label_column,
+            chunk_size,
+            max_rows=max_rows,
+            test_size=test_size,
+            seed=seed,
+        )
+
+    def training_rows() -> Iterator[Tuple[Tuple[Any, ...], np.ndarray]]:
+        for texts, labels, is_test in chunks():
+            keep = np.flatnonzero(~is_test)
+            if len(keep):
+                yield ([texts[i] for i in keep],), labels[keep]
+
+    start = time.perf_counter()
+    timings: Dict[str, float] = {}
+
+    # Pass 1: document frequencies and class labels
+    document_frequency: Counter = Counter()
+    label_counts: Counter = Counter()
+    n_train = 0
+    for labels, (counts, n_documents) in _map_ordered(
+        _count_terms,
+        (((texts, stop_words), labels) for (texts,), labels in training_rows()),
+        workers,
+    ):
+        document_frequency.update(counts)
+        label_counts.update(labels.tolist())
+        n_train += n_documents
+    if n_train == 0:
+        raise ValueError(f"No labeled training rows found in {input_path}.")
+    classes = np.array(sorted(label_counts))
+    if len(classes) < 2:
+        raise ValueError(f"Need at least two classes to train, found {classes}.")
+    vectorizer = build_vectorizer(
+        document_frequency, n_train, min_df, max_features, stop_words
+    )
+    n_terms_seen = len(document_frequency)
+    del document_frequency
+    timings["vocabulary_seconds"] = time.perf_counter() - start
+    logger.info(
+        f"Vocabulary pass: {n_train} training rows, {n_terms_seen} terms seen, "
+        f"{len(vectorizer.vocabulary_)} kept (min_df={min_df}), "
+        f"classes={classes.tolist()}"
+    )
+
+    # Passes 2..: incremental training on TF-IDF rows built by the workers
+    classifier = SGDClassifier(loss="log_loss", alpha=alpha, random_state=seed)
+    rng = np.random.default_rng(seed)
+    with tempfile.TemporaryDirectory(prefix="train-shuffle-") as shuffle_dir:
+        if shuffle:
+            shuffle_start = time.perf_counter()
+            n_buckets = min(-(-n_train // chunk_size), MAX_SHUFFLE_BUCKETS)
+            buckets = spill_shuffled(
+                ((texts, labels) for (texts,), labels in training_rows()),
+                Path(shuffle_dir),
+                n_buckets,
+                rng,
+            )
+            timings["shuffle_seconds"] = time.perf_counter() - shuffle_start
+
+        def epoch_rows() -> Iterator[Tuple[Tuple[Any, ...], np.ndarray]]:
+            if not shuffle:
+                return training_rows()
+            return (
+                ((texts,), labels)
+                for texts, labels in shuffled_chunks(buckets, chunk_size, rng)
+            )
+
+        epoch_start = time.perf_counter()
+        for epoch in range(epochs):
+            for labels, features in _map_ordered(
+                _featurize, epoch_rows(), workers, _init_featurizer, (vectorizer,)
+            ):
+                classifier.partial_fit(features, labels, classes=classes)
+            logger.info(f"Epoch {epoch + 1}/{epochs} done.")
+        timings["training_seconds"] = time.perf_counter() - epoch_start
+
+    # Held-out evaluation
+    eval_start = time.perf_counter()
+    pipeline = Pipeline([("tfidf", vectorizer), ("clf", classifier)])
+    y_true: List[str] = []
+    y_pred: List[str] = []
+    test_rows = (
+        (([texts[i] for i in np.flatnonzero(is_test)],), labels[is_test])
+        for texts, labels, is_test in chunks()
+        if is_test.any()
+    )
+    for labels, features in _map_ordered(
+        _featurize, test_rows, workers, _init_featurizer, (vectorizer,)
+    ):
+        y_true.extend(labels.tolist())
+        y_pred.extend(classifier.predict(features).tolist())
+    timings["evaluation_seconds"] = time.perf_counter() - eval_start
+    accuracy = accuracy_score(y_true, y_pred) if y_true else None
+    report = classification_report(y_true, y_pred, zero_division=0) if y_true else ""
+    if accuracy is not None:
+        logger.info(f"Test set accuracy: {accuracy:.4f}\n{report}")
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output.with_name(output.name + ".tmp")
+    joblib.dump(pipeline, tmp_path)
+    os.replace(tmp_path, output)  # Atomic, so the model watcher never sees half a file
+    logger.info(f"Model pipeline saved to {output}")
+
+    summary = {
+        "rows_train": n_train,
+        "rows_test": len(y_true),
+        "classes": classes.tolist(),
+        "n_features": len(vectorizer.vocabulary_),
+        "accuracy": accuracy,
+        **timings,
+        "seconds": time.perf_counter() - start,
+        **peak_memory(),
+        "output": str(output),
+        "mlflow_run_id": None,
+    }
+    if log_mlflow:
+        summary["mlflow_run_id"] = _log_to_mlflow(
+            pipeline,
+            params={
+                "model_type": "SGDClassifier",
+                "loss": "log_loss",
+                "alpha": alpha,
+                "vectorizer": "TfidfVectorizer (streamed two-pass vocabulary)",
+                "min_df": min_df,
+                "max_features": max_features,
+                "epochs": epochs,
+                "chunk_size": chunk_size,
+                "random_state": seed,
+                "shuffle": shuffle,
+                "rows_train": n_train,
+                "n_features": summary["n_features"],
+            },
+            metrics={
+                key: summary[key]
+                for key in ("accuracy", "seconds", "peak_rss_bytes")
+                if summary[key] is not None
+            },
+            report=report,
+        )
+    return summary
+
+
+def _train_in_fresh_process(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs train_model() in this (fresh) process so peak memory is its own."""
+    return train_model(**kwargs)
+
+
+def scaling_report(
+    input_path: Path, sizes: List[int], **train_kwargs: Any
+) -> List[Dict[str, Any]]:
+    """
+    Trains on the first N rows for each N in `sizes` and reports the cost.
+
+    Each run happens in a fresh process, so its peak resident memory is not
+    inflated by earlier, larger runs. Models are written to a temporary
+    directory and MLflow logging is off.
+
+    Returns:
+        List[Dict[str, Any]]: One train_model() summary per size, plus
+                              "max_rows".
+    """
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            kwargs = {
+                **train_kwargs,
+                "input_path": Path(input_path),
+                "output": Path(tmp_dir) / f"model_{size}.joblib",
+                "max_rows": size,
+                "log_mlflow": False,
+            }
+            with context.Pool(1) as pool:
+                summary = pool.apply(_train_in_fresh_process, (kwargs,))
+            results.append({"max_rows": size, **summary})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", type=Path, nargs="?", default=TRAIN_DATA_PATH)
+    parser.add_argument("--output", type=Path, default=MODEL_PATH)
+    parser.add_argument("--input-format", choices=("csv", "jsonl", "parquet"))
+    parser.add_argument("--text-column", default=TRAIN_TEXT_COLUMN)
+    parser.add_argument("--label-column", default=TRAIN_LABEL_COLUMN)
+    parser.add_argument("--chunk-size", type=int, default=TRAIN_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--epochs", type=int, default=TRAIN_EPOCHS)
+    parser.add_argument("--min-df", type=int, default=TRAIN_MIN_DF)
+    parser.add_argument("--max-features", type=int, default=TRAIN_MAX_FEATURES)
+    parser.add_argument("--alpha", type=float, default=1e-5)
+    parser.add_argument("--test-size", type=float, default=TRAIN_TEST_SIZE)
+    parser.add_argument("--max-rows", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--no-shuffle",
+        action="store_true",
+        help="Train on the rows in file order instead of shuffling them "
+        "through temporary bucket files every epoch.",
+    )
+    parser.add_argument("--no-mlflow", action="store_true")
+    parser.add_argument(
+        "--scaling-report",
+        metavar="SIZES",
+        help="Comma-separated row counts; report training time and peak "
+        "memory for each instead of training the model once.",
+    )
+    args = parser.parse_args(argv)
+    configure_logging()
+
+    kwargs = dict(
+        input_format=args.input_format,
+        text_column=args.text_column,
+        label_column=args.label_column,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        epochs=args.epochs,
+        min_df=args.min_df,
+        max_features=args.max_features,
+        alpha=args.alpha,
+        test_size=args.test_size,
+        seed=args.seed,
+        shuffle=not args.no_shuffle,
+    )
+    if args.scaling_report:
+        sizes = [int(size) for size in args.scaling_report.split(",")]
+        print(
+            f"{'rows':>10} {'seconds':>9} {'rows/sec':>10} {'features':>9} "
+            f"{'peak MB':>8} {'worker MB':>9} {'accuracy':>8}"
+        )
+        for row in scaling_report(args.input, sizes, **kwargs):
+            rows = row["rows_train"] + row["rows_test"]
+            worker_mb = (row["peak_worker_rss_bytes"] or 0) / 2**20
+            print(
+                f"{rows:>10} {row['seconds']:>9.2f} {rows / row['seconds']:>10.0f} "
+                f"{row['n_features']:>9} {row['peak_rss_bytes'] / 2**20:>8.1f} "
+                f"{worker_mb:>9.1f} {row['accuracy'] or 0:>8.4f}"
+            )
+        return
+
+    summary = train_model(
+        args.input,
+        args.output,
+        max_rows=args.max_rows,
+        log_mlflow=not args.no_mlflow,
+        **kwargs,
+    )
+    print(
+        f"Trained on {summary['rows_train']} rows ({summary['n_features']} terms) "
+        f"in {summary['seconds']:.1f}s; accuracy={summary['accuracy']}; "
+        f"peak RSS={summary['peak_rss_bytes']}B; model written to {summary['output']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+# src/sentiment_analysis_service/vocabulary.py
+import sys
+from typing import Dict, List
+
+import numpy as np
+
+# Column index returned by lookup() for tokens that are not in the vocabulary
+NOT_FOUND = -1
+
+
+class DictVocabulary:
+    """Vocabulary backed by the vectorizer's plain Python dict (term -> column)."""
+
+    def __init__(self, mapping: Dict[str, int]):
+        self.mapping = mapping
+
+    def __len__(self) -> int:
+        return len(self.mapping)
+
+    def lookup(self, tokens: List[str]) -> np.ndarray:
+        """Returns the column of each token, or NOT_FOUND."""
+        get = self.mapping.get
+        return np.fromiter(
+            (get(token, NOT_FOUND) for token in tokens),
+            dtype=np.int64,
+            count=len(tokens),
+        )
+
+    def items(self):
+        """Yields (term, column) pairs."""
+        return self.mapping.items()
+
+
+class SortedVocabulary:
+    """
+    Read-only vocabulary stored as two numpy arrays.
+
+    `terms` is a sorted fixed-width unicode array and `columns[i]` is the
+    feature column of `terms[i]`. Both arrays can be memory-mapped from disk,
+    so worker processes share them through the OS page cache instead of each
+    holding a private dict.
+    """
+
+    def __init__(self, terms: np.ndarray, columns: np.ndarray):
+        self.terms = terms
+        self.columns = columns
+
+    @classmethod
+    def from_mapping(cls, mapping: Dict[str, int]) -> "SortedVocabulary":
+        """Builds the sorted arrays from a term -> column mapping."""
+        terms = sorted(mapping)
+        return cls(
+            np.asarray(terms, dtype=str),
+            np.asarray([mapping[t] for t in terms], dtype=np.int32),
+        )
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def lookup(self, tokens: List[str]) -> np.ndarray:
+        """Returns the column of each token, or NOT_FOUND (vectorized binary search)."""
+        if not tokens or not len(self.terms):
+            return np.full(len(tokens), NOT_FOUND, dtype=np.int64)
+        probe = np.asarray(tokens, dtype=str)
+        # Search with the probe cut to the stored width, then confirm the match
+        # against the full token so long tokens cannot match a truncated term.
+        positions = np.searchsorted(self.terms, probe.astype(self.terms.dtype))
+        positions = np.minimum(positions, len(self.terms) - 1)
+        found = self.terms[positions] == probe
+        return np.where(found, self.columns[positions], NOT_FOUND).astype(np.int64)
+
+    def items(self):
+        """Yields (term, column) pairs."""
+        return zip(self.terms.tolist(), self.columns.tolist())
+
+
+class CompactVocabulary:
+    """
+    Read-only vocabulary packed into one byte blob, bucketed by term length.
+
+    Terms are UTF-8 encoded and grouped by their byte length L. Each bucket is
+    a sorted run of fixed-width L-byte records inside `blob`, so a term costs
+    exactly L bytes plus a 4-byte column id, with no per-term pointers or
+    Python objects. Lookups group tokens by length and binary-search each
+    bucket with numpy. All arrays can be memory-mapped.
+
+    Terms must not contain NUL bytes (numpy strips trailing NULs); the
+    vectorizer's word token pattern never produces them.
+    """
+
+    def __init__(
+        self,
+        blob: np.ndarray,
+        columns: np.ndarray,
+        bucket_lengths: np.ndarray,
+        bucket_counts: np.ndarray,
+    ):
+        self.blob = blob  # uint8, all buckets back to back
+        self.columns = columns  # int32, one per term, in blob order
+        self.bucket_lengths = bucket_lengths
+        self.bucket_counts = bucket_counts
+        self._buckets = {}
+        byte_offset = term_offset = 0
+        for length, count in zip(bucket_lengths.tolist(), bucket_counts.tolist()):
+            size = length * count
+            terms = blob[byte_offset : byte_offset + size].view(f"S{length}")
+            self._buckets[length] = (
+                terms,
+                columns[term_offset : term_offset + count],
+            )
+            byte_offset += size
+            term_offset += count
+
+    @classmethod
+    def from_mapping(cls, mapping: Dict[str, int]) -> "CompactVocabulary":
+        """Builds the packed blob from a term -> column mapping."""
+        by_length: Dict[int, List[bytes]] = {}
+        encoded_columns = {}
+        for term, column in mapping.items():
+            encoded = term.encode("utf-8")
+            if b"\0" in encoded or not encoded:
+                raise ValueError(f"Cannot store term {term!r} in a CompactVocabulary.")
+            by_length.setdefault(len(encoded), []).append(encoded)
+            encoded_columns[encoded] = column
+
+        lengths = sorted(by_length)
+        chunks: List[bytes] = []
+        columns: List[int] = []
+        counts: List[int] = []
+        for length in lengths:
+            terms = sorted(by_length[length])
+            chunks.append(b"".join(terms))
+            columns.extend(encoded_columns[t] for t in terms)
+            counts.append(len(terms))
+        return cls(
+            np.frombuffer(b"".join(chunks), dtype=np.uint8).copy(),
+            np.asarray(columns, dtype=np.int32),
+            np.asarray(lengths, dtype=np.int32),
+            np.asarray(counts, dtype=np.int64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the packed arrays in bytes."""
+        return (
+            self.blob.nbytes
+            + self.columns.nbytes
+            + self.bucket_lengths.nbytes
+            + self.bucket_counts.nbytes
+        )
+
+    def lookup(self, tokens: List[str]) -> np.ndarray:
+        """Returns the column of each token, or NOT_FOUND."""
+        result = np.full(len(tokens), NOT_FOUND, dtype=np.int64)
+        if not tokens:
+            return result
+        encoded = [token.encode("utf-8") for token in tokens]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        for length in np.unique(lengths).tolist():
+            bucket = self._buckets.get(length)
+            if bucket is None:
+                continue
+            terms, columns = bucket
+            indices = np.flatnonzero(lengths == length)
+            probe = np.array([encoded[i] for i in indices], dtype=f"S{length}")
+            positions = np.minimum(np.searchsorted(terms, probe), len(terms) - 1)
+            found = terms[positions] == probe
+            result[indices[found]] = columns[positions[found]]
+        return result
+
+    def items(self):
+        """Yields (term, column) pairs."""
+        for terms, columns in self._buckets.values():
+            for term, column in zip(terms.tolist(), columns.tolist()):
+                yield term.decode("utf-8"), column
+
+
+def dict_vocabulary_nbytes(mapping: Dict[str, int]) -> int:
+    """Approximate memory held by a str -> int dict, including keys and values."""
+    return sys.getsizeof(mapping) + sum(
+        sys.getsizeof(term) + sys.getsizeof(column) for term, column in mapping.items()
+    )
+
+
+VOCABULARY_BACKENDS = {
+    "dict": DictVocabulary,
+    "sorted": SortedVocabulary,
+    "compact": CompactVocabulary,
+}
+
+
+def build_vocabulary(mapping: Dict[str, int], backend: str = "dict"):
+    """Builds a vocabulary of the given backend from a term -> column mapping."""
+    if backend not in VOCABULARY_BACKENDS:
+        raise ValueError(
+            f"Unknown vocabulary backend '{backend}'. "
+            f"Expected one of {tuple(VOCABULARY_BACKENDS)}."
+        )
+    if backend == "dict":
+        return DictVocabulary(dict(mapping))
+    return VOCABULARY_BACKENDS[backend].from_mapping(mapping)
+
+
+def _benchmark(n_terms: int = 200_000, n_tokens: int = 200_000, seed: int = 0):
+    """Compares memory per term and lookup throughput of the backends."""
+    import random
+    import string as string_module
+    import time
+
+    rng = random.Random(seed)
+    letters = string_module.ascii_lowercase
+    terms = set()
+    while len(terms) < n_terms:
+        terms.add("".join(rng.choices(letters, k=rng.randint(2, 14))))
+    mapping = {term: column for column, term in enumerate(terms)}
+    term_list = list(mapping)
+    # Half the probes hit the vocabulary, half are random misses
+    tokens = [
+        (
+            rng.choice(term_list)
+            if rng.random() < 0.5
+            else "".join(rng.choices(letters, k=rng.randint(2, 14)))
+        )
+        for _ in range(n_tokens)
+    ]
+
+    expected = None
+    print(f"{n_terms} terms, {n_tokens} lookups per run")
+    for name in VOCABULARY_BACKENDS:
+        vocabulary = build_vocabulary(mapping, name)
+        if name == "dict":
+            nbytes = dict_vocabulary_nbytes(mapping)
+        elif name == "sorted":
+            nbytes = vocabulary.terms.nbytes + vocabulary.columns.nbytes
+        else:
+            nbytes = vocabulary.nbytes
+        start = time.perf_counter()
+        columns = vocabulary.lookup(tokens)
+        elapsed = time.perf_counter() - start
+        if expected is None:
+            expected = columns
+        assert np.array_equal(columns, expected), f"{name} mapping differs"
+        print(
+            f"{name:>8}: {nbytes / n_terms:7.1f} bytes/term, "
+            f"{n_tokens / elapsed / 1e6:6.2f}M lookups/s"
+        )
+
+
+# Example usage: python -m sentiment_analysis_service.vocabulary
+if __name__ == "__main__":
+    _benchmark()
@@ -1,5 +1,8 @@
 # tests/conftest.py
+import os
+import shutil
 import sys
+import tempfile
 from pathlib import Path
 
 # Get the absolute path of the project's root directory
@@ -8,3 +11,16 @@ project_root = Path(__file__).parent.parent
 # Add the 'src' directory to the Python path
 src_path = project_root / "src"
 sys.path.insert(0, str(src_path))
+
+# Log to a temporary file rather than the repository's logs/service.log. Set
+# before the package is imported (predict.py configures logging on import);
+# an environment variable also reaches spawned worker processes.
+_log_dir = tempfile.mkdtemp(prefix="sentiment-test-logs-")
+os.environ["LOG_FILE"] = str(Path(_log_dir) / "service.log")
+
+
+def pytest_unconfigure(config):
+    from sentiment_analysis_service.logging_setup import shutdown_logging
+
+    shutdown_logging()
+    shutil.rmtree(_log_dir, ignore_errors=True)
@@ -0,0 +1,104 @@
+# tests/test_admission.py
+import time
+
+import pytest
+
+from sentiment_analysis_service.admission import (
+    AdmissionController,
+    AdmissionError,
+    parse_deadline,
+    remaining,
+)
+from sentiment_analysis_service.metrics import ADMISSIONS
+
+
+def test_check_size_rejects_too_many_items_and_long_texts():
+    controller = AdmissionController(max_items=2, max_text_chars=5)
+    controller.check_size(["abc", "abcde"])
+    with pytest.raises(AdmissionError) as too_many:
+        controller.check_size(["a", "b", "c"])
+    assert too_many.value.status_code == 413
+    assert too_many.value.reason == "too_many_items"
+    assert too_many.value.retry_after is None
+    with pytest.raises(AdmissionError) as too_long:
+        controller.check_size(["ok", "too long"])
+    assert too_long.value.reason == "text_too_long"
+
+
+def test_check_body_size_uses_content_length():
+    controller = AdmissionController(max_body_bytes=100)
+    controller.check_body_size("100")
+    with pytest.raises(AdmissionError) as too_large:
+        controller.check_body_size("101")
+    assert (too_large.value.status_code, too_large.value.reason) == (
+        413,
+        "body_too_large",
+    )
+    with pytest.raises(AdmissionError) as unknown:
+        controller.check_body_size(None)
+    assert unknown.value.status_code == 411
+    with pytest.raises(AdmissionError) as invalid:
+        controller.check_body_size("lots")
+    assert invalid.value.status_code == 400
+    AdmissionController(max_body_bytes=0).check_body_size(None)
+
+
+def test_zero_limits_are_disabled():
+    controller = AdmissionController(
+        max_items=0, max_text_chars=0, max_in_flight_items=0
+    )
+    controller.check_size(["x" * 10**6] * 3)
+    with controller.admit(10**6):
+        with controller.admit(10**6):
+            pass
+
+
+def test_admit_sheds_over_budget_and_releases():
+    controller = AdmissionController(max_in_flight_items=10, retry_after=2)
+    shed_before = ADMISSIONS.labels("shed", "capacity").value
+    with controller.admit(8):
+        assert controller.in_flight_items == 8
+        with pytest.raises(AdmissionError) as shed:
+            with controller.admit(3):
+                pass
+        assert shed.value.status_code == 429
+        assert shed.value.retry_after == 2
+        with controller.admit(2):
+            assert controller.in_flight_items == 10
+    assert controller.in_flight_items == 0
+    assert ADMISSIONS.labels("shed", "capacity").value == shed_before + 1
+
+
+def test_oversized_request_admitted_when_idle():
+    """A request larger than the whole budget must not be starved forever."""
+    controller = AdmissionController(max_in_flight_items=10)
+    with controller.admit(50):
+        assert controller.in_flight_items == 50
+
+
+def test_admit_releases_on_error():
+    controller = AdmissionController(max_in_flight_items=10)
+    with pytest.raises(RuntimeError):
+        with controller.admit(5):
+            raise RuntimeError("boom")
+    assert controller.in_flight_items == 0
+
+
+def test_expired_deadline_is_shed():
+    controller = AdmissionController()
+    with pytest.raises(AdmissionError) as expired:
+        with controller.admit(1, deadline=time.perf_counter() - 1):
+            pass
+    assert expired.value.status_code == 503
+    assert expired.value.retry_after
+    assert controller.in_flight_items == 0
+
+
+def test_parse_deadline():
+    assert parse_deadline(None, 10.0) is None
+    assert parse_deadline("250", 10.0) == pytest.approx(10.25)
+    assert remaining(None) is None
+    for bad in ("soon", "0", "-5"):
+        with pytest.raises(AdmissionError) as invalid:
+            parse_deadline(bad, 0.0)
+        assert invalid.value.status_code == 400
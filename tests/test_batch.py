@@ -0,0 +1,72 @@
+# tests/test_batch.py
+import json
+
+import pandas as pd
+import pytest
+
+from sentiment_analysis_service.batch import run_batch, infer_format
+from sentiment_analysis_service.predict import predict
+
+TEXTS = [
+    "This product is amazing! Highly recommend.",
+    "Very disappointed with the quality.",
+    "Works okay, but not great.",
+    "Excellent customer service.",
+    "The app is buggy and crashes frequently.",
+]
+
+
+@pytest.fixture
+def input_csv(tmp_path):
+    path = tmp_path / "reviews.csv"
+    pd.DataFrame({"id": range(len(TEXTS)), "review": TEXTS}).to_csv(path, index=False)
+    return path
+
+
+def test_run_batch_csv_to_jsonl(input_csv, tmp_path):
+    """Every row should be scored, in order, with the same labels as predict()."""
+    output = tmp_path / "scored.jsonl"
+    summary = run_batch(
+        input_csv, output, text_column="review", chunk_size=2, workers=1
+    )
+
+    scored = pd.read_json(output, lines=True)
+    assert summary["rows_scored"] == len(TEXTS)
+    assert summary["chunks"] == 3
+    assert list(scored["id"]) == list(range(len(TEXTS)))
+    assert list(scored["sentiment"]) == [p["sentiment"] for p in predict(TEXTS)]
+
+
+def test_run_batch_resumes_after_last_committed_chunk(input_csv, tmp_path):
+    """A resumed run should skip committed chunks and drop partial output."""
+    output = tmp_path / "scored.csv"
+    run_batch(input_csv, output, text_column="review", chunk_size=2, workers=1)
+    expected = pd.read_csv(output)
+
+    # Simulate a crash after the first chunk: progress says one chunk is done
+    # and the output holds that chunk plus some half-written garbage.
+    progress_path = tmp_path / "scored.csv.progress.json"
+    progress = json.loads(progress_path.read_text())
+    first_chunk = expected.iloc[:2].to_csv(index=False).encode("utf-8")
+    output.write_bytes(first_chunk + b"partial,garb")
+    progress.update(chunks_done=1, rows_done=2, output_bytes=len(first_chunk))
+    progress_path.write_text(json.dumps(progress))
+
+    summary = run_batch(
+        input_csv, output, text_column="review", chunk_size=2, workers=1, resume=True
+    )
+    assert summary["rows_scored"] == 3
+    assert summary["rows_total"] == len(TEXTS)
+    pd.testing.assert_frame_equal(pd.read_csv(output), expected)
+
+
+def test_run_batch_missing_text_column(input_csv, tmp_path):
+    with pytest.raises(ValueError):
+        run_batch(input_csv, tmp_path / "out.csv", text_column="nope", workers=1)
+
+
+def test_infer_format():
+    assert infer_format("a/b.parquet") == "parquet"
+    assert infer_format("x.ndjson") == "jsonl"
+    with pytest.raises(ValueError):
+        infer_format("x.txt")
@@ -0,0 +1,96 @@
+# tests/test_batching.py
+import asyncio
+
+import pytest
+
+from sentiment_analysis_service.batching import MicroBatcher
+from sentiment_analysis_service.executor import InferenceExecutor
+
+
+class RecordingPredict:
+    """Fake predict function that records the batches it receives."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [{"input_text": t, "sentiment": f"label-{t}"} for t in texts]
+
+
+def _run_with_batcher(predict_fn, coro_factory, **kwargs):
+    executor = InferenceExecutor(kind="thread", max_workers=2, max_in_flight=2)
+    batcher = MicroBatcher(executor, predict_fn=predict_fn, **kwargs)
+
+    async def main():
+        try:
+            return await coro_factory(batcher)
+        finally:
+            await batcher.stop()
+
+    try:
+        return asyncio.run(main()), batcher
+    finally:
+        executor.shutdown()
+
+
+def test_concurrent_requests_are_merged_and_routed():
+    """Concurrent submits should share one predict call and get their own slices."""
+    fake = RecordingPredict()
+
+    async def scenario(batcher):
+        return await asyncio.gather(
+            batcher.submit(["a", "b"]), batcher.submit(["c"]), batcher.submit(["d"])
+        )
+
+    results, batcher = _run_with_batcher(
+        fake, scenario, max_batch_size=16, max_wait_ms=20
+    )
+    assert len(fake.calls) == 1
+    assert [[r["input_text"] for r in res] for res in results] == [
+        ["a", "b"],
+        ["c"],
+        ["d"],
+    ]
+    stats = batcher.stats()
+    assert stats["batches"] == 1
+    assert stats["batched_texts"] == 4
+    assert stats["queue_depth"] == 0
+
+
+def test_max_batch_size_is_respected():
+    """A flush should never exceed max_batch_size when requests can be split up."""
+    fake = RecordingPredict()
+
+    async def scenario(batcher):
+        return await asyncio.gather(*(batcher.submit([str(i)]) for i in range(10)))
+
+    results, batcher = _run_with_batcher(
+        fake, scenario, max_batch_size=4, max_wait_ms=20
+    )
+    assert [r[0]["input_text"] for r in results] == [str(i) for i in range(10)]
+    assert all(len(call) <= 4 for call in fake.calls)
+    assert sum(len(call) for call in fake.calls) == 10
+    assert batcher.stats()["max_batch_size_seen"] <= 4
+
+
+def test_predict_failure_propagates_to_callers():
+    """Errors from the merged predict call should reach every waiting caller."""
+
+    def failing(texts):
+        raise RuntimeError("boom")
+
+    async def scenario(batcher):
+        return await asyncio.gather(
+            batcher.submit(["a"]), batcher.submit(["b"]), return_exceptions=True
+        )
+
+    results, _ = _run_with_batcher(failing, scenario, max_wait_ms=5)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_invalid_limits():
+    """Non-positive batch sizes should be rejected."""
+    executor = InferenceExecutor(kind="thread", max_workers=1, max_in_flight=1)
+    with pytest.raises(ValueError):
+        MicroBatcher(executor, max_batch_size=0)
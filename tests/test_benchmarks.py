@@ -0,0 +1,73 @@
+# tests/test_benchmarks.py
+import json
+
+import pytest
+
+from sentiment_analysis_service.benchmarks import CORPORA, compare, make_corpus
+from sentiment_analysis_service.benchmarks.suite import measure
+
+
+@pytest.mark.parametrize("kind", sorted(CORPORA))
+def test_corpora_are_deterministic(kind):
+    """Same kind, size and seed must give the same texts."""
+    texts = make_corpus(kind, 20, seed=3)
+    assert len(texts) == 20
+    assert all(isinstance(t, str) and t.strip() for t in texts)
+    assert texts == make_corpus(kind, 20, seed=3)
+    assert texts != make_corpus(kind, 20, seed=4)
+
+
+def test_unknown_corpus_raises():
+    with pytest.raises(ValueError):
+        make_corpus("poems", 1)
+
+
+def test_measure_runs_setup_before_every_timed_call():
+    calls = []
+    timings = measure(
+        lambda: calls.append("call"),
+        repeats=3,
+        min_time=0.0,
+        setup=lambda: calls.append("setup"),
+    )
+    assert len(timings) == 3
+    # One untimed warm-up call, then setup before each timed call
+    assert calls == ["call"] + ["setup", "call"] * 3
+
+
+def _doc(*results):
+    return {"schema": 1, "results": list(results)}
+
+
+def _result(name, batch_size, items_per_sec):
+    return {
+        "name": name,
+        "corpus": "c",
+        "batch_size": batch_size,
+        "items_per_sec": items_per_sec,
+    }
+
+
+def test_compare_flags_regressions_improvements_and_missing():
+    baseline = _doc(
+        _result("predict", 1, 100.0),
+        _result("predict", 10, 100.0),
+        _result("predict", 100, 100.0),
+        _result("predict", 1000, 100.0),
+    )
+    current = _doc(
+        _result("predict", 1, 85.0),  # 15% slower
+        _result("predict", 10, 95.0),  # Within threshold
+        _result("predict", 100, 130.0),
+        _result("predict", 5000, 10.0),
+    )
+    rows = compare(current, baseline, threshold=0.1)
+    statuses = {row["batch_size"]: row["status"] for row in rows}
+    assert statuses == {
+        1: "regression",
+        10: "ok",
+        100: "improvement",
+        5000: "new",
+        1000: "missing",
+    }
+    json.dumps(rows)  # Machine-readable
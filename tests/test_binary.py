@@ -0,0 +1,88 @@
+# tests/test_binary.py
+import msgpack
+import pyarrow as pa
+import pytest
+
+from sentiment_analysis_service.binary import (
+    BinaryRequestError,
+    UnsupportedFormatError,
+    binary_format,
+    decode_request,
+    encode_response,
+)
+
+
+def _arrow_stream(columns):
+    batch = pa.record_batch(list(columns.values()), names=list(columns))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def test_binary_format_from_content_type():
+    assert binary_format("application/msgpack") == "msgpack"
+    assert binary_format("application/vnd.apache.arrow.stream; x=1") == "arrow"
+    with pytest.raises(UnsupportedFormatError):
+        binary_format("application/json")
+
+
+def test_msgpack_round_trip():
+    body = msgpack.packb({"texts": ["good", "bad"]})
+    assert decode_request(body, "msgpack") == ["good", "bad"]
+    response = msgpack.unpackb(encode_response(["positive", "negative"], "msgpack"))
+    assert response == {"count": 2, "labels": ["positive", "negative"], "error": None}
+
+
+def test_arrow_round_trip():
+    body = _arrow_stream({"text": pa.array(["good", "bad"])})
+    assert decode_request(body, "arrow") == ["good", "bad"]
+    table = pa.ipc.open_stream(encode_response(["positive", "negative"], "arrow"))
+    assert table.read_all().to_pydict() == {"label": ["positive", "negative"]}
+
+
+@pytest.mark.parametrize(
+    "body, fmt, error_type",
+    [
+        (msgpack.packb({"texts": ["ok", ""]}), "msgpack", "string_too_short"),
+        (msgpack.packb({"texts": ["ok", 3]}), "msgpack", "string_type"),
+        (msgpack.packb({"inputs": []}), "msgpack", "missing"),
+        (b"\xc1", "msgpack", "msgpack_invalid"),
+        (_arrow_stream({"body": pa.array(["x"])}), "arrow", "missing"),
+        (_arrow_stream({"text": pa.array([1, 2])}), "arrow", "string_type"),
+        (b"not arrow", "arrow", "arrow_invalid"),
+    ],
+)
+def test_invalid_bodies_raise_validation_errors(body, fmt, error_type):
+    with pytest.raises(BinaryRequestError) as excinfo:
+        decode_request(body, fmt)
+    assert excinfo.value.errors[0]["type"] == error_type
+
+
+def test_encode_response_reports_long_text():
+    encoded = encode_response(["positive", "negative"], "msgpack", {1: "chunked"})
+    assert msgpack.unpackb(encoded)["long_text"] == {"1": "chunked"}
+    reader = pa.ipc.open_stream(
+        encode_response(["positive", "negative"], "arrow", {1: "chunked"})
+    )
+    assert reader.schema.metadata[b"long_text"] == b'{"1": "chunked"}'
+
+
+def test_encode_response_with_probabilities():
+    import numpy as np
+
+    matrix = np.array([[0.1, 0.9], [0.8, 0.2]])
+    classes = np.array(["negative", "positive"])
+    labels = ["positive", "negative"]
+    packed = msgpack.unpackb(encode_response(labels, "msgpack", None, matrix, classes))
+    assert packed["confidence"] == [0.9, 0.8]
+    assert packed["probabilities"] == {"negative": [0.1, 0.8], "positive": [0.9, 0.2]}
+    table = pa.ipc.open_stream(
+        encode_response(labels, "arrow", None, matrix, classes)
+    ).read_all()
+    assert table.to_pydict() == {
+        "label": labels,
+        "confidence": [0.9, 0.8],
+        "probability_negative": [0.1, 0.8],
+        "probability_positive": [0.9, 0.2],
+    }
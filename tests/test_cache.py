@@ -0,0 +1,57 @@
+# tests/test_cache.py
+import pytest
+
+from sentiment_analysis_service.cache import PredictionCache, MISSING
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_hit_and_miss_counts():
+    """Lookups should be counted as hits or misses."""
+    cache = PredictionCache(max_size=10)
+    assert cache.get("a") is MISSING
+    cache.put("a", "positive")
+    assert cache.get("a") == "positive"
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
+    assert stats["approx_memory_bytes"] > 0
+
+
+def test_cache_evicts_least_recently_used():
+    """The least recently used entry should be evicted once the cache is full."""
+    cache = PredictionCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")  # "b" is now least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_ttl_expiry():
+    """Entries older than the TTL should be treated as misses."""
+    clock = FakeClock()
+    cache = PredictionCache(max_size=10, ttl_seconds=5, clock=clock)
+    cache.put("a", 1)
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5.0
+    assert cache.get("a") is MISSING
+    assert len(cache) == 0
+    assert cache.stats()["approx_memory_bytes"] == 0
+
+
+def test_cache_invalid_size():
+    """A cache must hold at least one entry."""
+    with pytest.raises(ValueError):
+        PredictionCache(max_size=0)
@@ -0,0 +1,222 @@
+# tests/test_compiled.py
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from sentiment_analysis_service import predict as predict_module
+from sentiment_analysis_service.compiled import (
+    compile_pipeline,
+    is_compiled_artifact,
+    load_compiled,
+    prune_compiled,
+    read_artifact_meta,
+    save_compiled,
+    token_fed_pipeline,
+)
+from sentiment_analysis_service.predict import load_model, predict, set_engine
+from sentiment_analysis_service.preprocessing import preprocess_batch, tokenize_batch
+
+# Texts covering in-vocabulary words, repeats, stop words, unicode and empties
+PARITY_TEXTS = [
+    "This product is amazing! Highly recommend.",
+    "Very disappointed with the quality.",
+    "Works okay, but not great.",
+    "Excellent customer service, resolved my issue quickly.",
+    "The app is buggy and crashes frequently.",
+    "amazing amazing amazing quality quality",
+    "Waste of money and time. Terrible!",
+    "Best purchase I've made this year!",
+    "café naïve résumé — ünïcödé text",
+    "the and of",  # Only stop words
+    "",
+    "x",  # Single character tokens are ignored by the token pattern
+    "Average experience, nothing special, buggy but excellent",
+]
+
+
+def test_compiled_matches_pipeline_on_trained_model():
+    """Compiled scorer must give the same labels and decision values as sklearn."""
+    pipeline = load_model()
+    compiled = compile_pipeline(pipeline)
+    cleaned = preprocess_batch(PARITY_TEXTS)
+
+    expected_scores = pipeline.decision_function(cleaned)
+    np.testing.assert_allclose(
+        compiled.decision_function(cleaned), expected_scores, rtol=1e-12, atol=1e-12
+    )
+    assert list(compiled.predict(cleaned)) == list(pipeline.predict(cleaned))
+
+
+@pytest.mark.parametrize(
+    "vectorizer_kwargs",
+    [{}, {"sublinear_tf": True}, {"norm": "l1"}, {"binary": True, "use_idf": False}],
+)
+def test_compiled_matches_binary_pipeline(vectorizer_kwargs):
+    """Parity should also hold for binary classifiers and other vectorizer options."""
+    texts = ["good good great", "bad awful", "great value", "awful bad bad", "good"]
+    labels = ["pos", "neg", "pos", "neg", "pos"]
+    pipeline = Pipeline(
+        [
+            ("tfidf", TfidfVectorizer(**vectorizer_kwargs)),
+            ("clf", LogisticRegression()),
+        ]
+    ).fit(texts, labels)
+    compiled = compile_pipeline(pipeline)
+    probe = texts + ["unknown words only", "", "good bad"]
+    np.testing.assert_allclose(
+        compiled.decision_function(probe), pipeline.decision_function(probe)
+    )
+    assert list(compiled.predict(probe)) == list(pipeline.predict(probe))
+
+
+def test_compile_rejects_ngrams():
+    """Features the scorer does not reproduce should be refused at export."""
+    pipeline = Pipeline(
+        [("tfidf", TfidfVectorizer(ngram_range=(1, 2))), ("clf", LogisticRegression())]
+    ).fit(["a good one", "a bad one"], ["pos", "neg"])
+    with pytest.raises(ValueError):
+        compile_pipeline(pipeline)
+
+
+def test_predict_compiled_engine_matches_sklearn_engine():
+    """predict() should return identical results with either engine."""
+    sklearn_results = predict(PARITY_TEXTS)
+    try:
+        set_engine("compiled")
+        assert (
+            predict_module._scoring_model() is predict_module._manager.active.compiled
+        )
+        compiled_results = predict(PARITY_TEXTS)
+    finally:
+        set_engine("sklearn")
+    assert compiled_results == sklearn_results
+
+
+def test_set_engine_rejects_unknown():
+    with pytest.raises(ValueError):
+        set_engine("onnx")
+
+
+@pytest.mark.parametrize("vocabulary", ["compact", "sorted"])
+def test_saved_artifact_round_trip_is_memory_mapped(tmp_path, vocabulary):
+    """A saved artifact should load memory-mapped and score identically."""
+    pipeline = load_model()
+    compiled = compile_pipeline(pipeline)
+    path = save_compiled(
+        compiled, tmp_path / "model.mmap", version="abc123", vocabulary=vocabulary
+    )
+    assert is_compiled_artifact(path)
+
+    loaded = load_compiled(path, mmap=True)
+    assert isinstance(loaded.weights, np.memmap)
+    assert not loaded.weights.flags.writeable
+    assert dict(loaded.vocabulary.items()) == pipeline.steps[0][1].vocabulary_
+    cleaned = preprocess_batch(PARITY_TEXTS)
+    np.testing.assert_array_equal(
+        loaded.decision_function(cleaned), compiled.decision_function(cleaned)
+    )
+    assert list(loaded.predict(cleaned)) == list(pipeline.predict(cleaned))
+
+
+def test_load_model_detects_compiled_artifact(tmp_path, monkeypatch):
+    """load_model should serve a compiled artifact directory directly."""
+    sklearn_results = predict(PARITY_TEXTS)
+    path = save_compiled(
+        compile_pipeline(load_model()), tmp_path / "model.mmap", version="v-test"
+    )
+    # Pretend nothing is loaded yet; monkeypatch restores the manager afterwards
+    monkeypatch.setattr(
+        predict_module,
+        "_manager",
+        predict_module.ModelManager(prepare=predict_module._prepare_model),
+    )
+
+    model = load_model(path)
+    assert not hasattr(model, "steps")
+    assert predict_module.get_model_version() == "v-test"
+    assert predict_module.get_model_load_info()["format"] == "mmap"
+    assert predict(PARITY_TEXTS) == sklearn_results
+
+
+def test_token_fed_pipeline_matches_pipeline():
+    """Feeding tokens to the sklearn pipeline should not change predictions."""
+    pipeline = load_model()
+    cleaned = preprocess_batch(PARITY_TEXTS)
+    tokens = tokenize_batch(cleaned)
+    assert list(token_fed_pipeline(pipeline).predict(tokens)) == list(
+        pipeline.predict(cleaned)
+    )
+    # The original pipeline is left untouched
+    assert pipeline.steps[0][1].analyzer == "word"
+
+
+def test_compiled_probabilities_match_predict_proba():
+    pipeline = load_model()
+    compiled = compile_pipeline(pipeline)
+    cleaned = preprocess_batch(PARITY_TEXTS)
+    np.testing.assert_allclose(
+        compiled.probabilities(compiled.decision_function(cleaned)),
+        pipeline.predict_proba(cleaned),
+    )
+
+
+def test_binary_probabilities_match_predict_proba():
+    pipeline = Pipeline(
+        [("tfidf", TfidfVectorizer()), ("clf", LogisticRegression())]
+    ).fit(["good one", "bad one", "great", "awful"], ["pos", "neg", "pos", "neg"])
+    compiled = compile_pipeline(pipeline)
+    assert not compiled.multinomial
+    texts = ["good", "awful one", "unknown"]
+    np.testing.assert_allclose(
+        compiled.probabilities(compiled.decision_function(texts)),
+        pipeline.predict_proba(texts),
+    )
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_prune_compiled_drops_small_weights_and_casts(dtype):
+    """Pruned terms leave the vocabulary; kept terms keep their (cast) weights."""
+    compiled = compile_pipeline(load_model())
+    magnitudes = np.abs(compiled.weights).max(axis=1)
+    threshold = float(np.median(magnitudes))
+    pruned = prune_compiled(compiled, threshold, dtype)
+
+    kept = {t for t, j in compiled.vocabulary.items() if magnitudes[j] > threshold}
+    assert {t for t, _ in pruned.vocabulary.items()} == kept
+    assert pruned.weights.dtype == np.dtype(dtype)
+    assert pruned.idf.dtype == np.dtype(dtype)
+    for term, column in pruned.vocabulary.items():
+        original = compiled.vocabulary.lookup([term])[0]
+        np.testing.assert_allclose(
+            pruned.weights[column], compiled.weights[original], rtol=1e-3
+        )
+    with pytest.raises(ValueError, match="every term"):
+        prune_compiled(compiled, float(magnitudes.max()))
+
+
+def test_float16_artifact_round_trips(tmp_path):
+    """Reduced-precision arrays are saved and memory-mapped as is."""
+    pruned = prune_compiled(compile_pipeline(load_model()), 0.0, "float16")
+    loaded = load_compiled(save_compiled(pruned, tmp_path / "model.mmap"))
+    cleaned = preprocess_batch(PARITY_TEXTS)
+
+    assert loaded.weights.dtype == np.float16
+    np.testing.assert_array_equal(loaded.predict(cleaned), pruned.predict(cleaned))
+
+
+def test_reexport_swaps_the_directory_without_touching_mapped_files(tmp_path):
+    """Arrays mapped from the previous export stay readable after a re-export."""
+    path = tmp_path / "model.mmap"
+    compiled = compile_pipeline(load_model())
+    save_compiled(compiled, path, version="v1")
+    served = load_compiled(path)
+    old_weights = np.array(served.weights)
+
+    save_compiled(prune_compiled(compiled, dtype="float32"), path, version="v2")
+
+    np.testing.assert_array_equal(served.weights, old_weights)  # No SIGBUS
+    assert load_compiled(path).weights.dtype == np.float32
+    assert read_artifact_meta(path)["version"] == "v2"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["model.mmap"]
@@ -0,0 +1,134 @@
+# tests/test_executor.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+from sentiment_analysis_service.executor import InferenceExecutor
+from sentiment_analysis_service.logging_setup import is_request_sampled, sample_request
+
+
+def _slow_identity(value):
+    time.sleep(0.05)
+    return value
+
+
+def test_executor_runs_off_event_loop_thread():
+    """Work submitted to the executor should not run on the event loop thread."""
+    executor = InferenceExecutor(kind="thread", max_workers=2, max_in_flight=2)
+
+    async def main():
+        loop_thread = threading.get_ident()
+        worker_thread = await executor.run(threading.get_ident)
+        return loop_thread, worker_thread
+
+    try:
+        loop_thread, worker_thread = asyncio.run(main())
+    finally:
+        executor.shutdown()
+    assert loop_thread != worker_thread
+
+
+def test_executor_caps_in_flight_batches():
+    """No more than max_in_flight calls should be running at once."""
+    executor = InferenceExecutor(kind="thread", max_workers=4, max_in_flight=2)
+    peak = 0
+
+    async def tracked(value):
+        nonlocal peak
+        task = asyncio.ensure_future(executor.run(_slow_identity, value))
+        await asyncio.sleep(0.01)
+        peak = max(peak, executor.in_flight)
+        return await task
+
+    async def main():
+        return await asyncio.gather(*(tracked(i) for i in range(6)))
+
+    try:
+        results = asyncio.run(main())
+    finally:
+        executor.shutdown()
+    assert results == list(range(6))
+    assert 0 < peak <= 2
+
+
+def test_executor_invalid_kind():
+    """An unknown executor kind should be rejected."""
+    with pytest.raises(ValueError):
+        InferenceExecutor(kind="gpu")
+
+
+def test_executor_shutdown_is_idempotent():
+    """Calling shutdown twice (or before start) should be harmless."""
+    executor = InferenceExecutor(kind="thread", max_workers=1, max_in_flight=1)
+    executor.shutdown()
+    executor.start()
+    executor.shutdown()
+    executor.shutdown()
+
+
+def test_executor_slot_wait_times_out():
+    """A call that cannot get a slot within its timeout should fail fast."""
+    executor = InferenceExecutor(kind="thread", max_workers=1, max_in_flight=1)
+
+    async def main():
+        busy = asyncio.ensure_future(executor.run(time.sleep, 0.2))
+        await asyncio.sleep(0.01)
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run(_slow_identity, 1, timeout=0.01)
+        await busy
+        # A free slot is taken even with a zero timeout
+        return await executor.run(_slow_identity, 2, timeout=0)
+
+    try:
+        assert asyncio.run(main()) == 2
+    finally:
+        executor.shutdown()
+
+
+def test_background_calls_yield_to_interactive_ones():
+    """A waiting interactive call gets the next slot before queued background work."""
+    executor = InferenceExecutor(kind="thread", max_workers=1, max_in_flight=1)
+    order = []
+
+    def record(name):
+        time.sleep(0.02)
+        order.append(name)
+        return name
+
+    async def main():
+        first = asyncio.ensure_future(executor.run(record, "interactive-1"))
+        await asyncio.sleep(0.005)
+        background = asyncio.ensure_future(
+            executor.run(record, "background", background=True)
+        )
+        await asyncio.sleep(0.005)
+        second = asyncio.ensure_future(executor.run(record, "interactive-2"))
+        await asyncio.gather(first, background, second)
+        return executor.background_in_flight
+
+    try:
+        background_in_flight = asyncio.run(main())
+    finally:
+        executor.shutdown()
+    assert order == ["interactive-1", "interactive-2", "background"]
+    assert background_in_flight == 0
+
+
+@pytest.mark.parametrize("kind", ["thread", "process"])
+def test_executor_calls_keep_the_request_sampling(kind):
+    """Records logged by a worker must follow the request's sampling decision."""
+    executor = InferenceExecutor(kind=kind, max_workers=1, max_in_flight=1)
+
+    async def request(rate):
+        sample_request(rate)  # Each task runs in its own context
+        return await executor.run(is_request_sampled)
+
+    async def main():
+        return await asyncio.gather(request(0.0), request(1.0))
+
+    try:
+        assert asyncio.run(main()) == [False, True]
+    finally:
+        executor.shutdown()
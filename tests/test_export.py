@@ -0,0 +1,107 @@
+# tests/test_export.py
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sentiment_analysis_service.compiled import ARTIFACT_META_FILE, compile_pipeline
+from sentiment_analysis_service.config import MODEL_PATH
+from sentiment_analysis_service.export import (
+    AgreementError,
+    export_model,
+    export_report,
+    load_holdout_texts,
+    main,
+)
+from sentiment_analysis_service.model_manager import file_version
+from sentiment_analysis_service.predict import load_model
+
+HOLDOUT = [
+    "This product is amazing! Highly recommend.",
+    "Very disappointed with the quality.",
+    "Works okay, but not great.",
+    "Excellent customer service, resolved my issue quickly.",
+    "The app is buggy and crashes frequently.",
+    "Waste of money and time. Terrible!",
+    "Best purchase I've made this year!",
+    "Average experience, nothing special.",
+]
+
+
+def _meta(path):
+    with open(path / ARTIFACT_META_FILE) as f:
+        return json.load(f)
+
+
+def test_full_precision_export_keeps_the_pickle_version(tmp_path):
+    path = export_model(MODEL_PATH, tmp_path / "full.mmap", holdout_texts=HOLDOUT)
+
+    assert _meta(path)["version"] == file_version(MODEL_PATH)
+
+
+def test_reduced_export_gets_its_own_version(tmp_path):
+    """Cached predictions of the pickle must not be reused for a lossy export."""
+    path = export_model(
+        MODEL_PATH, tmp_path / "f16.mmap", dtype="float16", holdout_texts=HOLDOUT
+    )
+
+    assert _meta(path)["version"] != file_version(MODEL_PATH)
+    assert np.load(path / "weights.npy").dtype == np.float16
+
+
+def test_export_refuses_when_agreement_is_below_target(tmp_path):
+    """Pruning nearly every term changes labels; nothing may be written."""
+    weights = compile_pipeline(load_model()).weights
+    # Keep only the terms with the two largest distinct weight magnitudes
+    threshold = float(np.unique(np.abs(weights).max(axis=1).round(6))[-3])
+    output = tmp_path / "pruned.mmap"
+
+    with pytest.raises(AgreementError) as excinfo:
+        export_model(
+            MODEL_PATH,
+            output,
+            prune_threshold=threshold,
+            holdout_texts=HOLDOUT,
+            min_agreement=1.0,
+        )
+    assert excinfo.value.agreement < 1.0
+    assert not output.exists()
+
+
+def test_lossy_export_requires_a_holdout(tmp_path):
+    with pytest.raises(ValueError, match="holdout"):
+        export_model(MODEL_PATH, tmp_path / "m.mmap", dtype="float32")
+
+
+def test_cli_lossy_export_without_holdout_exits_with_a_message(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "sentiment_analysis_service.export.TRAIN_DATA_PATH", tmp_path / "none.csv"
+    )
+    with pytest.raises(SystemExit, match="pass --holdout"):
+        main(["--output", str(tmp_path / "m.mmap"), "--dtype", "float32"])
+    assert not (tmp_path / "m.mmap").exists()
+
+
+def test_load_holdout_texts_uses_training_split(tmp_path):
+    """With test_size > 0 only the rows train.py held out are returned."""
+    path = tmp_path / "corpus.csv"
+    pd.DataFrame({"text": [f"text {i}" for i in range(200)]}).to_csv(path, index=False)
+
+    held_out = load_holdout_texts(path, test_size=0.2)
+    assert 10 < len(held_out) < 70
+    assert len(load_holdout_texts(path, test_size=0)) == 200
+    assert len(load_holdout_texts(path, test_size=0, max_rows=5)) == 5
+
+
+def test_export_report_compares_before_and_after(tmp_path):
+    path = export_model(
+        MODEL_PATH, tmp_path / "f32.mmap", dtype="float32", holdout_texts=HOLDOUT
+    )
+    rows = export_report(MODEL_PATH, path, HOLDOUT)
+
+    assert [row["name"] for row in rows] == ["pickle", "compiled", "export"]
+    assert rows[2]["bytes"] < rows[1]["bytes"]
+    assert all(row["texts_per_sec"] > 0 and row["load_seconds"] >= 0 for row in rows)
+    assert rows[0]["agreement"] == 1.0
+    assert rows[2]["agreement"] >= 0.99
@@ -0,0 +1,154 @@
+# tests/test_jobs.py
+import asyncio
+
+import pytest
+
+from sentiment_analysis_service.executor import InferenceExecutor
+from sentiment_analysis_service.jobs import (
+    JobNotFoundError,
+    JobRunner,
+    JobStateError,
+    JobStore,
+)
+from sentiment_analysis_service.predict import load_model, predict
+
+TEXTS = [
+    "This product is amazing! Highly recommend.",
+    "Very disappointed with the quality.",
+    "Works okay, but not great.",
+    "The app is buggy and crashes frequently.",
+    "I love it!",
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    yield store
+    store.close()
+
+
+def _submit(store, entries, chunk_size=2, probabilities=False):
+    job_id = store.create_job(probabilities)
+    for start in range(0, len(entries), chunk_size):
+        store.add_chunk(job_id, entries[start : start + chunk_size])
+    store.finish_submission(job_id)
+    return job_id
+
+
+def _run_until_done(store, *job_ids):
+    """Runs a JobRunner until every job has reached a final state."""
+    load_model()
+
+    async def main():
+        executor = InferenceExecutor(kind="thread", max_workers=1, max_in_flight=1)
+        runner = JobRunner(store, executor, workers=1, poll_interval=0.01)
+        await runner.start()
+        try:
+            for _ in range(500):
+                jobs = [store.get_job(job_id) for job_id in job_ids]
+                if all(job["finished_at"] is not None for job in jobs):
+                    return jobs
+                await asyncio.sleep(0.01)
+            raise AssertionError(f"Jobs did not finish: {jobs}")
+        finally:
+            await runner.stop()
+            executor.shutdown()
+
+    return asyncio.run(main())
+
+
+def test_job_results_match_predict_and_keep_error_records_in_place(store):
+    entries = TEXTS[:2] + [{"line": 3, "error": "Invalid input line"}] + TEXTS[2:]
+    job_id = _submit(store, entries, probabilities=True)
+
+    (job,) = _run_until_done(store, job_id)
+
+    assert job["status"] == "succeeded"
+    assert job["total_items"] == job["processed_items"] == len(entries)
+    assert job["chunks_done"] == job["n_chunks"] == 3
+    results = store.get_results(job_id, 0, 100)["results"]
+    expected = predict(TEXTS, probabilities=True)
+    assert results[:2] + results[3:] == expected
+    assert results[2] == {"line": 3, "error": "Invalid input line"}
+
+
+def test_results_are_paged_across_chunks(store):
+    job_id = _submit(store, TEXTS, chunk_size=2)
+    _run_until_done(store, job_id)
+
+    pages, offset = [], 0
+    while offset is not None:
+        page = store.get_results(job_id, offset, 3)
+        pages.append([r["input_text"] for r in page["results"]])
+        offset = page["next_offset"]
+    assert pages == [TEXTS[:3], TEXTS[3:]]
+
+
+def test_results_stop_at_the_first_unscored_chunk(store):
+    job_id = _submit(store, TEXTS, chunk_size=2)
+    claimed_id, index, entries, _ = store.claim_chunk()
+    assert (claimed_id, index, entries) == (job_id, 0, TEXTS[:2])
+    store.complete_chunk(job_id, 0, [{"input_text": t} for t in entries])
+
+    page = store.get_results(job_id, 0, 100)
+    assert [r["input_text"] for r in page["results"]] == TEXTS[:2]
+    assert page["next_offset"] == 2
+    assert store.get_job(job_id)["status"] == "running"
+
+
+def test_recover_resumes_interrupted_jobs(tmp_path):
+    """A restart requeues running chunks and fails interrupted uploads."""
+    path = tmp_path / "jobs.sqlite3"
+    before = JobStore(path)
+    job_id = _submit(before, TEXTS, chunk_size=2)
+    before.claim_chunk()  # The process stops while scoring this chunk
+    uploading = before.create_job()
+    before.add_chunk(uploading, TEXTS[:1])
+    before.close()
+
+    after = JobStore(path)
+    assert after.recover() == {
+        "requeued_chunks": 1,
+        "interrupted_uploads": 1,
+        "resumed_jobs": 1,
+    }
+    (job,) = _run_until_done(after, job_id)
+    assert job["status"] == "succeeded"
+    assert [r["input_text"] for r in after.get_results(job_id, 0, 100)["results"]] == (
+        TEXTS
+    )
+    assert after.get_job(uploading)["status"] == "failed"
+    assert after.claim_chunk() is None
+    after.close()
+
+
+def test_cancel_and_delete(store):
+    job_id = _submit(store, TEXTS)
+    store.cancel_job(job_id)
+    assert store.get_job(job_id)["status"] == "cancelled"
+    assert store.claim_chunk() is None
+    with pytest.raises(JobStateError):
+        store.cancel_job(job_id)
+    with pytest.raises(JobStateError):
+        store.add_chunk(job_id, TEXTS)
+
+    store.delete_job(job_id)
+    with pytest.raises(JobNotFoundError):
+        store.get_job(job_id)
+    assert store.stats()["jobs"] == {}
+
+
+def test_failed_chunk_fails_the_job(store, monkeypatch):
+    def broken_predict(texts, probabilities=False):
+        raise RuntimeError("model exploded")
+
+    monkeypatch.setattr("sentiment_analysis_service.predict.predict", broken_predict)
+    job_id = _submit(store, TEXTS)
+
+    (job,) = _run_until_done(store, job_id)
+
+    assert job["status"] == "failed"
+    assert "model exploded" in job["error"]
+    assert job["chunks_done"] == 0
+    assert store.stats()["pending_chunks"] == 0
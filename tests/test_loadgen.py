@@ -0,0 +1,74 @@
+# tests/test_loadgen.py
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from sentiment_analysis_service.benchmarks.loadgen import (
+    find_knee,
+    parse_stage_metrics,
+    percentile,
+    run_level,
+    stage_means,
+)
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 1001))
+    assert percentile(values, 50) == 500
+    assert percentile(values, 99) == 990
+    assert percentile(values, 99.9) == 999
+    assert percentile([], 50) is None
+
+
+def test_find_knee_is_last_level_with_meaningful_gain():
+    levels = [
+        {"concurrency": c, "items_per_sec": t}
+        for c, t in [(1, 100), (2, 190), (4, 350), (8, 370), (16, 380)]
+    ]
+    assert find_knee(levels, min_gain=0.1) == 4
+    assert find_knee([], min_gain=0.1) is None
+
+
+def test_stage_means_from_metrics_scrapes():
+    before = parse_stage_metrics(
+        'sentiment_stage_duration_seconds_count{stage="parse"} 2\n'
+        'sentiment_stage_duration_seconds_sum{stage="parse"} 0.002\n'
+    )
+    after = parse_stage_metrics(
+        'sentiment_stage_duration_seconds_bucket{stage="parse",le="+Inf"} 6\n'
+        'sentiment_stage_duration_seconds_count{stage="parse"} 6\n'
+        'sentiment_stage_duration_seconds_sum{stage="parse"} 0.010\n'
+        'sentiment_stage_duration_seconds_count{stage="classify"} 0\n'
+        'sentiment_stage_duration_seconds_sum{stage="classify"} 0\n'
+    )
+    means = stage_means(before, after)
+    assert abs(means["parse"] - 0.002) < 1e-12
+    assert means["classify"] is None
+
+
+def test_run_level_records_latencies_and_errors():
+    """Closed-loop clients should count successes and failures separately."""
+    app = FastAPI()
+    calls = {"n": 0}
+
+    @app.post("/predict")
+    async def fake_predict():
+        calls["n"] += 1
+        if calls["n"] % 5 == 0:
+            from fastapi import HTTPException
+
+            raise HTTPException(status_code=503)
+        return {"ok": True}
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await run_level(c, [b"{}"], concurrency=3, duration=0.2)
+
+    level = asyncio.run(scenario())
+    assert level["concurrency"] == 3
+    assert level["requests"] > 0
+    assert level["errors"] == level["error_kinds"].get("503", 0) > 0
+    assert level["latency_ms"]["p50"] is not None
+    assert 0 < level["error_rate"] < 1
@@ -0,0 +1,97 @@
+# tests/test_logging_setup.py
+import json
+import logging
+import multiprocessing
+import os
+import queue
+from concurrent.futures import ProcessPoolExecutor
+
+from sentiment_analysis_service import logging_setup
+from sentiment_analysis_service.logging_setup import (
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    SamplingFilter,
+    _request_sampled,
+    sample_request,
+)
+
+
+class CountingArg:
+    """Argument that records how often it is rendered."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __str__(self):
+        self.calls += 1
+        return "rendered"
+
+
+def _record(level=logging.INFO, msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord("test", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_merges_fields():
+    record = _record(fields={"request_id": "abc", "input_count": 3})
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "hello world"
+    assert entry["level"] == "INFO"
+    assert entry["request_id"] == "abc"
+    assert entry["input_count"] == 3
+
+
+def test_sampling_filter_drops_info_but_keeps_warning():
+    token = _request_sampled.set(False)
+    try:
+        sampling = SamplingFilter()
+        assert not sampling.filter(_record(logging.INFO))
+        assert sampling.filter(_record(logging.WARNING))
+    finally:
+        _request_sampled.reset(token)
+
+
+def test_sample_request_rates():
+    token = _request_sampled.set(True)
+    try:
+        assert sample_request(1.0) is True
+        assert sample_request(0.0) is False
+    finally:
+        _request_sampled.reset(token)
+
+
+def test_queue_handler_defers_formatting_and_drops_when_full():
+    log_queue = queue.Queue(maxsize=1)
+    handler = NonBlockingQueueHandler(log_queue)
+    arg = CountingArg()
+    handler.handle(_record(args=(arg,)))
+    handler.handle(_record(args=(arg,)))  # Queue full: dropped, not blocking
+    assert arg.calls == 0
+    assert handler.dropped == 1
+    assert log_queue.get_nowait().getMessage() == "hello rendered"
+
+
+def _log_error_in_worker(message):
+    logging.getLogger("sentiment_analysis_service.worker").error(message)
+    return os.getpid()
+
+
+def test_forked_process_workers_keep_logging(tmp_path, monkeypatch):
+    """A forked worker gets its own log writer instead of the parent's dead one."""
+    log_file = tmp_path / "service.log"
+    monkeypatch.setattr(logging_setup, "LOG_FILE", log_file)
+    logging_setup.configure_logging(force=True)
+    try:
+        logging.getLogger("sentiment_analysis_service.worker").error("from parent")
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("fork")
+        ) as pool:
+            worker_pid = pool.submit(_log_error_in_worker, "from worker").result()
+        assert worker_pid != os.getpid()
+        logging_setup.shutdown_logging()  # Flush the parent's writer
+        messages = [json.loads(line)["message"] for line in open(log_file)]
+        assert "from parent" in messages and "from worker" in messages
+    finally:
+        monkeypatch.undo()
+        logging_setup.configure_logging(force=True)
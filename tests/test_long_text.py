@@ -0,0 +1,83 @@
+# tests/test_long_text.py
+import pytest
+
+from sentiment_analysis_service import predict as predict_module
+from sentiment_analysis_service.benchmarks.corpus import long_text
+from sentiment_analysis_service.long_text import LongTextPolicy
+
+TEXT = "one two three four five six seven eight nine ten eleven twelve"
+
+
+@pytest.fixture
+def policy():
+    """Restores the module's long-text policy after the test."""
+    previous = predict_module.get_long_text_policy()
+    yield
+    predict_module.set_long_text_policy(previous)
+
+
+def test_actions_only_report_long_texts():
+    policy = LongTextPolicy(mode="truncate", max_chars=10)
+    assert policy.actions(["short", TEXT, None, "x" * 11]) == {
+        1: "truncated",
+        3: "truncated",
+    }
+    assert LongTextPolicy(mode="chunk", max_chars=10).actions([TEXT]) == {0: "chunked"}
+    assert LongTextPolicy(mode="none", max_chars=10).actions([TEXT]) == {}
+
+
+def test_truncate_keeps_head_and_tail_on_word_boundaries():
+    policy = LongTextPolicy(mode="truncate", max_chars=30, head_fraction=0.5)
+    truncated = policy.truncate(TEXT)
+    assert len(truncated) <= 31
+    assert truncated.startswith("one two")
+    assert truncated.endswith("eleven twelve")
+    assert set(truncated.split()) <= set(TEXT.split())
+    assert policy.truncate("short") == "short"
+
+
+def test_chunks_cover_text_without_splitting_words():
+    policy = LongTextPolicy(mode="chunk", max_chars=20, max_chunks=10)
+    chunks = policy.chunks(TEXT)
+    assert all(len(chunk) <= 20 for chunk in chunks)
+    assert " ".join(chunk.strip() for chunk in chunks).split() == TEXT.split()
+
+
+def test_chunks_are_bounded_for_huge_texts():
+    policy = LongTextPolicy(mode="chunk", max_chars=1000, max_chunks=4)
+    text = long_text(1000000)
+    chunks = policy.chunks(text)
+    assert len(chunks) == 4
+    assert all(len(chunk) <= 1000 for chunk in chunks)
+    assert text.startswith(chunks[0]) and text.endswith(chunks[-1])
+
+
+def test_invalid_policy_rejected():
+    with pytest.raises(ValueError):
+        LongTextPolicy(mode="summarize")
+    with pytest.raises(ValueError):
+        LongTextPolicy(max_chars=0)
+
+
+@pytest.mark.parametrize("mode", ["truncate", "chunk"])
+def test_predict_reports_long_text_action(policy, mode):
+    predict_module.set_long_text_policy(LongTextPolicy(mode=mode, max_chars=2000))
+    texts = ["I love it!", long_text(50000)]
+    results = predict_module.predict(texts)
+    assert "long_text" not in results[0]
+    assert results[1]["long_text"] == ("truncated" if mode == "truncate" else "chunked")
+    assert results[1]["sentiment"] in {"positive", "negative", "neutral"}
+    assert predict_module.predict_labels(texts) == [r["sentiment"] for r in results]
+
+
+def test_chunk_of_one_matches_full_prediction(policy):
+    """A text scored as a single chunk gets the same label as without policy."""
+    text = long_text(3000, seed=7)
+    predict_module.set_long_text_policy(LongTextPolicy(mode="none"))
+    expected = predict_module.predict([text])[0]["sentiment"]
+    predict_module.set_long_text_policy(
+        LongTextPolicy(mode="chunk", max_chars=2999, max_chunks=1)
+    )
+    predict_module.clear_prediction_cache()
+    chunked = predict_module._predict_chunked([[text]], predict_module._active_model())
+    assert chunked == [expected]
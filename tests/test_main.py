@@ -0,0 +1,515 @@
+# tests/test_main.py
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from sentiment_analysis_service.main import app
+from sentiment_analysis_service.schemas import ColumnarPredictResponse
+
+
+@pytest.fixture(scope="module")
+def client():
+    # Using the client as a context manager runs the startup/shutdown events
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_health_reports_model_loaded(client):
+    """Health endpoint should see the model loaded at startup."""
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json() == {"status": "OK", "model_loaded": True}
+
+
+def test_predict_endpoint(client):
+    """Predict endpoint should return one prediction per input, in order."""
+    payload = {"inputs": [{"text": "I love it!"}, {"text": "Terrible quality."}]}
+    response = client.post("/predict", json=payload, headers={"X-Request-ID": "t-1"})
+    assert response.status_code == 200
+    predictions = response.json()["predictions"]
+    assert [p["input_text"] for p in predictions] == ["I love it!", "Terrible quality."]
+    for p in predictions:
+        assert p["sentiment"] in ["positive", "negative", "neutral"]
+
+
+def test_predict_endpoint_rejects_empty_text(client):
+    """Empty text items should fail request validation."""
+    response = client.post("/predict", json={"inputs": [{"text": ""}]})
+    assert response.status_code == 422
+
+
+def _ndjson_lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_predict_stream_ndjson(client):
+    """NDJSON input should stream back one result per line, in order."""
+    body = '{"text": "I love it!"}\n"Terrible quality."\n\nnot json\n{"text": "ok"}'
+    response = client.post(
+        "/predict/stream",
+        content=body.encode("utf-8"),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = _ndjson_lines(response)
+    # One record per non-blank line, in input order
+    assert [r.get("input_text") for r in records] == [
+        "I love it!",
+        "Terrible quality.",
+        None,
+        "ok",
+    ]
+    assert records[2]["line"] == 4 and "error" in records[2]
+
+
+def test_predict_stream_plain_text_in_chunks(client, monkeypatch):
+    """Plain-text bodies should be scored in chunks without losing lines."""
+    monkeypatch.setattr(
+        "sentiment_analysis_service.streaming.STREAM_CHUNK_SIZE", 2, raising=True
+    )
+    lines = [f"line number {i} is great" for i in range(5)]
+
+    def body():
+        for line in lines:  # Sent in several pieces to exercise line buffering
+            yield (line[:4]).encode()
+            yield (line[4:] + "\n").encode()
+
+    response = client.post(
+        "/predict/stream", content=body(), headers={"Content-Type": "text/plain"}
+    )
+    assert response.status_code == 200
+    assert [r["input_text"] for r in _ndjson_lines(response)] == lines
+
+
+def test_predict_stream_chunking_calls_predict_per_chunk(client, monkeypatch):
+    """Each chunk of STREAM_CHUNK_SIZE lines should be a separate predict call."""
+    import sentiment_analysis_service.main as main_module
+
+    calls = []
+    real_predict = main_module.predict
+
+    def recording_predict(texts):
+        calls.append(len(texts))
+        return real_predict(texts)
+
+    monkeypatch.setattr("sentiment_analysis_service.streaming.STREAM_CHUNK_SIZE", 2)
+    monkeypatch.setattr(main_module, "predict", recording_predict)
+    body = "".join(f"text {i}\n" for i in range(5)).encode()
+    response = client.post(
+        "/predict/stream", content=body, headers={"Content-Type": "text/plain"}
+    )
+    assert len(_ndjson_lines(response)) == 5
+    assert calls == [2, 2, 1]
+
+
+def test_metrics_endpoint_reports_stage_latencies(client):
+    """/metrics should expose per-stage histograms after a prediction."""
+    client.post("/predict", json={"inputs": [{"text": "Great value."}]})
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for stage in ("parse", "preprocess", "transform", "classify", "response"):
+        assert f'sentiment_stage_duration_seconds_count{{stage="{stage}"}}' in (
+            response.text
+        )
+    assert 'sentiment_batch_size_count{source="request"}' in response.text
+    assert "sentiment_model_load_seconds" in response.text
+
+
+@pytest.mark.parametrize("response_format", ["fast", "columnar"])
+def test_predict_response_formats(client, response_format):
+    """Fast formats should return the same labels as the standard path."""
+    payload = {"inputs": [{"text": "I love it!"}, {"text": "Terrible quality."}]}
+    standard = client.post("/predict", json=payload).json()
+    response = client.post(f"/predict?format={response_format}", json=payload)
+    assert response.status_code == 200
+    if response_format == "fast":
+        assert response.json() == standard
+    else:
+        labels = [p["sentiment"] for p in standard["predictions"]]
+        assert response.json() == {"count": 2, "labels": labels, "error": None}
+
+
+def test_predict_rejects_unknown_format(client):
+    response = client.post("/predict?format=xml", json={"inputs": [{"text": "hi"}]})
+    assert response.status_code == 422
+
+
+def test_predict_binary_msgpack_matches_json(client):
+    """The binary endpoint should return the same labels as /predict."""
+    import msgpack
+
+    texts = ["I love it!", "Terrible quality."]
+    expected = [
+        p["sentiment"]
+        for p in client.post(
+            "/predict", json={"inputs": [{"text": t} for t in texts]}
+        ).json()["predictions"]
+    ]
+    response = client.post(
+        "/predict/binary",
+        content=msgpack.packb({"texts": texts}),
+        headers={"Content-Type": "application/msgpack"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(response.content)["labels"] == expected
+
+
+def test_predict_binary_errors_match_predict(client):
+    import msgpack
+
+    response = client.post(
+        "/predict/binary",
+        content=msgpack.packb({"texts": [""]}),
+        headers={"Content-Type": "application/msgpack"},
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "string_too_short"
+    response = client.post(
+        "/predict/binary", content=b"a,b", headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == 415
+
+
+@pytest.fixture
+def admin_headers(monkeypatch):
+    """Configures an admin token and returns the headers carrying it."""
+    from sentiment_analysis_service import main
+
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "test-token")
+    return {"X-Admin-Token": "test-token"}
+
+
+def test_admin_endpoints_need_a_configured_token(client, monkeypatch):
+    from sentiment_analysis_service import main
+
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "")
+    response = client.post("/admin/reload", headers={"X-Admin-Token": ""})
+    assert response.status_code == 403 and "disabled" in response.json()["detail"]
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "test-token")
+    assert client.post("/admin/reload").status_code == 403
+    wrong = client.post("/admin/reload", headers={"X-Admin-Token": "guess"})
+    assert wrong.status_code == 403
+
+
+def test_admin_reload_swaps_model(client, admin_headers):
+    """Reloading the served model should keep serving with the same version."""
+    version = client.get("/stats").json()["model"]["version"]
+    response = client.post("/admin/reload", headers=admin_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["previous_version"] == version
+    assert body["model"]["version"] == version
+    assert body["model"]["reloads"] >= 1
+    payload = {"inputs": [{"text": "I love it!"}]}
+    assert client.post("/predict", json=payload).status_code == 200
+
+
+def test_admin_reload_rejects_missing_and_outside_paths(client, admin_headers):
+    version = client.get("/stats").json()["model"]["version"]
+    missing = client.post(
+        "/admin/reload", json={"model_path": "missing.joblib"}, headers=admin_headers
+    )
+    assert missing.status_code == 404
+    outside = client.post(
+        "/admin/reload", json={"model_path": "/etc/passwd"}, headers=admin_headers
+    )
+    assert outside.status_code == 400
+    assert client.get("/stats").json()["model"]["version"] == version
+    assert client.get("/health").status_code == 200
+
+
+def test_predict_rejects_oversized_request(client, monkeypatch):
+    from sentiment_analysis_service import main
+
+    monkeypatch.setattr(main.admission, "max_items", 2)
+    payload = {"inputs": [{"text": "ok"}] * 3}
+    response = client.post("/predict", json=payload)
+    assert response.status_code == 413
+    assert response.json()["reason"] == "too_many_items"
+
+
+def test_predict_limits_apply_before_the_body_is_parsed(client, monkeypatch):
+    from sentiment_analysis_service import main, schemas
+
+    monkeypatch.setattr(main.admission, "max_body_bytes", 64)
+    payload = {"inputs": [{"text": "long enough to pass the byte limit"}] * 3}
+    too_large = client.post("/predict", json=payload)
+    assert too_large.status_code == 413
+    assert too_large.json()["reason"] == "body_too_large"
+    chunked = client.post("/predict", content=iter([b'{"inputs": []}']))
+    assert chunked.status_code == 411
+
+    # Item count: checked by the schema before any item is validated
+    monkeypatch.setattr(main.admission, "max_body_bytes", 0)
+    monkeypatch.setattr(schemas, "ADMISSION_MAX_ITEMS", 2)
+    too_many = client.post("/predict", json=payload)
+    assert too_many.status_code == 413
+    assert too_many.json()["reason"] == "too_many_items"
+    assert "long enough" not in too_many.text  # The input is not echoed back
+    too_long = client.post("/predict", json={"inputs": [{"text": "x" * 1000001}]})
+    assert too_long.status_code == 413
+    assert too_long.json()["reason"] == "text_too_long"
+    assert client.post("/predict", json={"inputs": [{"text": ""}]}).status_code == 422
+
+
+def test_predict_sheds_when_over_capacity(client, monkeypatch):
+    import msgpack
+
+    from sentiment_analysis_service import main
+
+    # Pretend other requests already hold the whole budget
+    monkeypatch.setattr(main.admission, "max_in_flight_items", 10)
+    monkeypatch.setattr(main.admission, "_in_flight_items", 10)
+    payload = {"inputs": [{"text": "I love it!"}]}
+    response = client.post("/predict", json=payload)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    binary = client.post(
+        "/predict/binary",
+        content=msgpack.packb({"texts": ["I love it!"]}),
+        headers={"Content-Type": "application/msgpack"},
+    )
+    assert binary.status_code == 429
+    assert "sentiment_admission_total" in client.get("/metrics").text
+
+
+def test_predict_deadline_header(client):
+    payload = {"inputs": [{"text": "I love it!"}]}
+    ok = client.post(
+        "/predict", json=payload, headers={"X-Request-Deadline-Ms": "5000"}
+    )
+    assert ok.status_code == 200
+    invalid = client.post(
+        "/predict", json=payload, headers={"X-Request-Deadline-Ms": "soon"}
+    )
+    assert invalid.status_code == 400
+    expired = client.post(
+        "/predict", json=payload, headers={"X-Request-Deadline-Ms": "0.000001"}
+    )
+    assert expired.status_code == 503
+    assert "Retry-After" in expired.headers
+
+
+@pytest.mark.parametrize("response_format", ["standard", "fast"])
+def test_predict_probabilities_query(client, response_format):
+    payload = {"inputs": [{"text": "I love it!"}, {"text": "Terrible quality."}]}
+    response = client.post(
+        f"/predict?probabilities=true&format={response_format}", json=payload
+    )
+    assert response.status_code == 200
+    for p in response.json()["predictions"]:
+        assert p["confidence"] == p["probabilities"][p["sentiment"]]
+        assert len(p["probabilities"]) == 3
+    top = client.post("/predict?top_k=2", json=payload).json()["predictions"]
+    assert all(len(p["probabilities"]) == 2 for p in top)
+    plain = client.post("/predict", json=payload).json()["predictions"]
+    assert all(p["confidence"] is None for p in plain)
+    assert client.post("/predict?top_k=0", json=payload).status_code == 422
+
+
+def test_predict_binary_probabilities(client):
+    import msgpack
+
+    response = client.post(
+        "/predict/binary?probabilities=true",
+        content=msgpack.packb({"texts": ["I love it!", "Terrible quality."]}),
+        headers={"Content-Type": "application/msgpack"},
+    )
+    assert response.status_code == 200
+    body = msgpack.unpackb(response.content)
+    assert len(body["confidence"]) == 2
+    assert set(body["probabilities"]) == {"negative", "neutral", "positive"}
+
+
+@pytest.fixture
+def job_store(tmp_path, monkeypatch):
+    """Points the /jobs endpoints and the running job workers at a temp spool."""
+    from sentiment_analysis_service import main
+    from sentiment_analysis_service.jobs import JobStore
+
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    monkeypatch.setattr(main.job_runner, "store", store)
+    yield store
+    store.close()
+
+
+def _wait_for_job(client, job_id):
+    for _ in range(500):
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["finished_at"] is not None:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job did not finish: {job}")
+
+
+def test_job_batch_submit_poll_and_page(client, job_store):
+    texts = [f"review number {i} is great" for i in range(5)]
+    response = client.post(
+        "/jobs?probabilities=true", json={"inputs": [{"text": t} for t in texts]}
+    )
+    assert response.status_code == 202
+    job = _wait_for_job(client, response.json()["job_id"])
+    assert job["status"] == "succeeded" and job["processed_items"] == 5
+
+    first = client.get(f"/jobs/{job['job_id']}/results?limit=3").json()
+    second = client.get(
+        f"/jobs/{job['job_id']}/results?offset={first['next_offset']}&limit=3"
+    ).json()
+    results = first["results"] + second["results"]
+    assert [r["input_text"] for r in results] == texts
+    assert all(r["confidence"] is not None for r in results)
+    assert second["next_offset"] is None
+
+
+def test_job_file_keeps_error_records_in_place(client, job_store):
+    body = '{"text": "I love it!"}\n\nnot json\n"Terrible quality."\n'
+    response = client.post(
+        "/jobs/file",
+        content=body.encode("utf-8"),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 202
+    job = _wait_for_job(client, response.json()["job_id"])
+    results = client.get(f"/jobs/{job['job_id']}/results").json()["results"]
+    assert results[0]["input_text"] == "I love it!"
+    assert results[1]["line"] == 3 and "error" in results[1]
+    assert results[2]["input_text"] == "Terrible quality."
+
+
+def test_job_cancel_delete_and_unknown_ids(client, job_store):
+    assert client.get("/jobs/missing").status_code == 404
+    assert client.get("/jobs/missing/results").status_code == 404
+    job_id = client.post("/jobs", json={"inputs": [{"text": "ok"}]}).json()["job_id"]
+    _wait_for_job(client, job_id)
+    assert client.post(f"/jobs/{job_id}/cancel").status_code == 409  # Finished
+    assert client.delete(f"/jobs/{job_id}").status_code == 204
+    assert client.get(f"/jobs/{job_id}").status_code == 404
+    assert "jobs" in client.get("/stats").json()
+
+
+def test_profile_header_returns_breakdown(client, admin_headers):
+    payload = {"inputs": [{"text": "I love it!"}, {"text": "Terrible quality."}]}
+    plain = client.post("/predict", json=payload)
+    assert "Server-Timing" not in plain.headers
+
+    response = client.post(
+        "/predict", json=payload, headers={**admin_headers, "X-Profile": "cprofile"}
+    )
+    assert response.status_code == 200
+    assert response.json() == plain.json()
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("parse;dur=") and "preprocess;dur=" in timing
+    profile_id = response.headers["X-Profile-Id"]
+    profile = client.get(f"/admin/profiles/{profile_id}", headers=admin_headers).json()
+    assert profile["mode"] == "cprofile" and profile["items"] == 2
+    assert profile["path"] == "/predict" and profile["functions"]
+    assert list(profile["stages"])[:2] == ["parse", "queue"]
+    profiles = client.get("/admin/profiles", headers=admin_headers).json()
+    assert profiles["profiles"][0]["id"] == profile["id"]
+
+    bad = client.post(
+        "/predict", json=payload, headers={**admin_headers, "X-Profile": "everything"}
+    )
+    assert bad.status_code == 400
+    unknown = client.get("/admin/profiles/unknown", headers=admin_headers)
+    assert unknown.status_code == 404
+
+
+def test_admin_profiling_samples_requests(client, admin_headers):
+    from sentiment_analysis_service import main
+
+    response = client.post(
+        "/admin/profiling", json={"sample_rate": 1.0}, headers=admin_headers
+    )
+    assert response.status_code == 200 and response.json()["sample_mode"] == "stages"
+    try:
+        sampled = client.post("/predict/binary", content=b"", headers={})
+        assert "Server-Timing" not in sampled.headers  # Rejected before predict()
+        payload = {"inputs": [{"text": "ok"}]}
+        assert "X-Profile-Id" in client.post("/predict", json=payload).headers
+    finally:
+        main.profiler.configure(sample_rate=0.0)
+    invalid = client.post(
+        "/admin/profiling", json={"sample_mode": "x"}, headers=admin_headers
+    )
+    assert invalid.status_code == 400
+    assert (
+        client.get("/admin/profiling", headers=admin_headers).json()["sample_rate"]
+        == 0.0
+    )
+
+
+def test_stream_chunks_bound_malformed_lines():
+    """A body of malformed lines is flushed in chunks, not buffered until EOF."""
+    import asyncio
+
+    from sentiment_analysis_service.streaming import iter_chunks
+
+    async def lines():
+        for i in range(5):
+            yield i + 1, "not json"
+
+    async def collect():
+        return [chunk async for chunk in iter_chunks(lines(), True, chunk_size=2)]
+
+    chunks = asyncio.run(collect())
+    assert [len(entries) for entries in chunks] == [2, 2, 1]
+    assert all("error" in entry for entries in chunks for entry in entries)
+
+
+def test_profile_header_needs_a_valid_admin_token(client, monkeypatch):
+    from sentiment_analysis_service import main
+
+    payload = {"inputs": [{"text": "ok"}]}
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "")  # Not configured: never allowed
+    response = client.post("/predict", json=payload, headers={"X-Profile": "memory"})
+    assert response.status_code == 403
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "test-token")
+    response = client.post(
+        "/predict",
+        json=payload,
+        headers={"X-Profile": "memory", "X-Admin-Token": "guess"},
+    )
+    assert response.status_code == 403
+
+
+def test_profiled_requests_respect_the_deadline(client, admin_headers, monkeypatch):
+    import asyncio
+
+    from sentiment_analysis_service import main
+
+    # Every executor slot is taken
+    monkeypatch.setattr(main.inference_executor, "_slots", asyncio.Semaphore(0))
+    response = client.post(
+        "/predict",
+        json={"inputs": [{"text": "ok"}]},
+        headers={
+            **admin_headers,
+            "X-Profile": "stages",
+            "X-Request-Deadline-Ms": "100",
+        },
+    )
+    assert response.status_code == 503
+    assert response.json()["reason"] == "deadline"
+
+
+def test_openapi_documents_the_columnar_response(client):
+    schema = client.get("/openapi.json").json()
+    response = schema["paths"]["/predict"]["post"]["responses"]["200"]
+    refs = {
+        option["$ref"].rsplit("/", 1)[1]
+        for option in response["content"]["application/json"]["schema"]["anyOf"]
+    }
+    assert refs == {"PredictResponse", "ColumnarPredictResponse"}
+
+    columnar = client.post(
+        "/predict?format=columnar&probabilities=true",
+        json={"inputs": [{"text": "I love it!"}, {"text": "Terrible."}]},
+    )
+    ColumnarPredictResponse.model_validate(columnar.json())
+    assert set(columnar.json()) <= set(ColumnarPredictResponse.model_fields)
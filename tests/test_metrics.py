@@ -0,0 +1,54 @@
+# tests/test_metrics.py
+import threading
+
+from sentiment_analysis_service.metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("h", "test", buckets=(1, 5, 10))
+    for value in (0.5, 1, 3, 7, 20):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert list(snapshot["buckets"].values()) == [2, 3, 4, 5]
+    assert snapshot["count"] == 5
+    assert snapshot["sum"] == 31.5
+
+
+def test_counter_is_exact_across_threads():
+    counter = Counter("c", "test")
+
+    def work():
+        for _ in range(10000):
+            counter.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.value == 80000
+
+
+def test_gauge_inc_dec_and_function():
+    gauge = Gauge("g", "test")
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+    assert gauge.value == 1
+    gauge.set_function(lambda: 7)
+    assert gauge.value == 7
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    histogram = Histogram(
+        "stage_seconds", "Stage time.", ("stage",), registry=registry, buckets=(0.1,)
+    )
+    Counter("requests_total", "Requests.", registry=registry).inc(3)
+    histogram.labels("parse").observe(0.05)
+    text = registry.render()
+    assert "# TYPE stage_seconds histogram" in text
+    assert 'stage_seconds_bucket{stage="parse",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="parse",le="+Inf"} 1' in text
+    assert 'stage_seconds_count{stage="parse"} 1' in text
+    assert "requests_total 3" in text
@@ -0,0 +1,122 @@
+# tests/test_model_manager.py
+import os
+import shutil
+
+import pytest
+
+from sentiment_analysis_service.config import MODEL_PATH
+from sentiment_analysis_service.model_manager import (
+    ModelManager,
+    artifact_signature,
+    load_artifact,
+)
+
+
+@pytest.fixture
+def model_file(tmp_path):
+    path = tmp_path / "model.joblib"
+    shutil.copy(MODEL_PATH, path)
+    return path
+
+
+def test_load_activates_and_reports_status(model_file):
+    manager = ModelManager(model_file, watch_interval=0)
+    assert manager.active is None
+    loaded = manager.load()
+    assert manager.active is loaded
+    status = manager.status()
+    assert status["loaded"] and status["version"] == loaded.version
+    assert status["format"] == "pickle"
+    assert status["load_seconds"] > 0
+    assert status["reloads"] == 0 and status["failed_reloads"] == 0
+
+
+def test_prepare_runs_before_swap(model_file):
+    """The new model must not be visible until prepare() has finished."""
+    seen = []
+    manager = ModelManager(model_file, watch_interval=0)
+    manager.load()
+    old = manager.active
+    manager._prepare = lambda loaded: seen.append(manager.active)
+    new = manager.load()
+    assert seen == [old]
+    assert manager.active is new and new is not old
+    assert manager.status()["reloads"] == 1
+
+
+def test_failed_reload_keeps_old_model(model_file, tmp_path):
+    manager = ModelManager(model_file, watch_interval=0)
+    old = manager.load()
+    with pytest.raises(FileNotFoundError):
+        manager.load(tmp_path / "missing.joblib")
+    broken = tmp_path / "broken.joblib"
+    broken.write_bytes(b"not a pickle")
+    with pytest.raises(Exception):
+        manager.load(broken)
+    assert manager.active is old
+    assert manager.model_path == model_file
+    status = manager.status()
+    assert status["failed_reloads"] == 2 and status["last_error"]
+
+
+def test_failed_warm_up_keeps_old_model(model_file):
+    manager = ModelManager(model_file, watch_interval=0)
+    old = manager.load()
+
+    def failing_prepare(loaded):
+        raise RuntimeError("warm-up failed")
+
+    manager._prepare = failing_prepare
+    with pytest.raises(RuntimeError):
+        manager.load()
+    assert manager.active is old
+
+
+def test_in_flight_reference_survives_swap(model_file):
+    """A request holding the old model keeps a working model after a swap."""
+    manager = ModelManager(model_file, watch_interval=0)
+    held = manager.load()
+    manager.load()
+    assert manager.active is not held
+    assert list(held.model.predict(["love it"])) == list(
+        manager.active.model.predict(["love it"])
+    )
+
+
+def test_check_for_update_reloads_changed_file(model_file):
+    manager = ModelManager(model_file, watch_interval=0.01)
+    first = manager.load()
+    assert manager.check_for_update() is False
+    # Same content, new mtime: a redeploy of the artifact
+    stat = os.stat(model_file)
+    os.utime(model_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert manager.check_for_update() is True
+    assert manager.active is not first
+    assert manager.active.version == first.version
+    assert manager.check_for_update() is False
+
+
+def test_check_for_update_skips_broken_artifact_once(model_file):
+    manager = ModelManager(model_file, watch_interval=0.01)
+    old = manager.load()
+    model_file.write_bytes(b"truncated")
+    assert manager.check_for_update() is False
+    assert manager.active is old
+    assert manager.status()["failed_reloads"] == 1
+    # Not retried until the file changes again
+    assert manager.check_for_update() is False
+    assert manager.status()["failed_reloads"] == 1
+
+
+def test_listener_called_after_swap(model_file):
+    manager = ModelManager(model_file, watch_interval=0)
+    calls = []
+    manager.add_listener(calls.append)
+    loaded = manager.load()
+    assert calls == [loaded]
+
+
+def test_artifact_signature_and_load_errors(tmp_path):
+    assert artifact_signature(tmp_path / "missing") is None
+    with pytest.raises(FileNotFoundError):
+        load_artifact(tmp_path / "missing")
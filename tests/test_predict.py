@@ -120,3 +120,39 @@ def test_predict_single_item_list():
 # can be brittle if the model changes slightly during retraining. It's often better to test the
 # structure, types, and validity of the output, rather than exact prediction values, unless
 # specific known cases MUST yield a certain result (golden tests).
+
+
+def test_predict_same_normalized_text_same_label():
+    """Texts that normalize to the same string should get the same label."""
+    variants = ["Great product!", "great   PRODUCT", "GREAT product..."]
+    predictions = predict(variants)
+    assert len({p["sentiment"] for p in predictions}) == 1
+    assert [p["input_text"] for p in predictions] == variants
+
+
+def test_predict_probabilities_match_sklearn():
+    """Probabilities should equal predict_proba and agree with the labels."""
+    from sentiment_analysis_service.predict import predict_probabilities
+    from sentiment_analysis_service.preprocessing import preprocess_batch
+
+    texts = ["I love it", "Awful, broken on arrival", "It arrived on Tuesday"]
+    pipeline = load_model()
+    labels, matrix, classes = predict_probabilities(texts)
+    expected = pipeline.predict_proba(preprocess_batch(texts))
+    assert matrix == pytest.approx(expected)
+    assert list(classes) == list(pipeline.classes_)
+    assert labels == list(pipeline.predict(preprocess_batch(texts)))
+
+
+def test_predict_with_probabilities_and_top_k():
+    texts = ["I love it", "Terrible quality."]
+    full = predict(texts, probabilities=True)
+    for result in full:
+        assert len(result["probabilities"]) == 3
+        assert sum(result["probabilities"].values()) == pytest.approx(1.0)
+        assert result["confidence"] == result["probabilities"][result["sentiment"]]
+        assert result["confidence"] == max(result["probabilities"].values())
+    top = predict(texts, top_k=1)
+    assert [list(r["probabilities"]) for r in top] == [[r["sentiment"]] for r in full]
+    # Labels are the same as without probabilities
+    assert [r["sentiment"] for r in predict(texts)] == [r["sentiment"] for r in full]
@@ -3,6 +3,7 @@ import pytest  # Import pytest
 from sentiment_analysis_service.preprocessing import (
     preprocess_text,
     preprocess_batch,
+    tokenize_batch,
 )  # Import functions to test
 
 # --- Tests for preprocess_text ---
@@ -80,3 +81,30 @@ def test_preprocess_batch_empty_list():
 def test_preprocess_text_parameterized(input_text, expected_output):
     """Example of parameterized test for preprocess_text."""
     assert preprocess_text(input_text) == expected_output
+
+
+# --- Tests for the fused batch path and tokenization ---
+
+
+@pytest.mark.parametrize(
+    "texts",
+    [
+        ["ΟΔΟΣ ΟΔΟΣ", "Σ", "İstanbul ÇAĞ"],  # Context-dependent lowercasing
+        ["tab\there", "line\nbreak\r\n", "\x1cinfo\x1fsep", "nbsp  em"],
+        ["contains \x00 separator", "other"],  # Falls back to per-item cleaning
+        [None, 1.5, "ok!", b"bytes"],
+        ["a"],
+    ],
+)
+def test_preprocess_batch_matches_preprocess_text(texts):
+    """The fused batch path must equal preprocess_text() item by item."""
+    assert preprocess_batch(texts) == [preprocess_text(t) for t in texts]
+
+
+def test_tokenize_batch_matches_vectorizer_analyzer():
+    """Tokens of cleaned text should equal what the vectorizer would produce."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    analyzer = TfidfVectorizer().build_analyzer()
+    cleaned = preprocess_batch(["Great PRODUCT, works well!", "naïve café x y zz"])
+    assert tokenize_batch(cleaned) == [analyzer(text) for text in cleaned]
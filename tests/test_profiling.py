@@ -0,0 +1,87 @@
+# tests/test_profiling.py
+import pytest
+
+from sentiment_analysis_service.metrics import STAGE_SECONDS, observe_stage
+from sentiment_analysis_service.predict import load_model, predict
+from sentiment_analysis_service.profiling import (
+    Profiler,
+    current_profile,
+    run_profiled,
+    server_timing,
+)
+
+TEXTS = [
+    "This product is amazing! Highly recommend.",
+    "Very disappointed with the quality.",
+    "Works okay, but not great.",
+]
+
+
+def _stage_count(stage):
+    return STAGE_SECONDS.labels(stage).snapshot()["count"]
+
+
+def test_stages_mode_breaks_down_predict():
+    load_model()
+    result, report = run_profiled("stages", predict, TEXTS)
+
+    assert result == predict(TEXTS)
+    assert report["mode"] == "stages"
+    assert {"preprocess", "other"} <= set(report["stages"])
+    assert "memory" not in report and "functions" not in report
+    total = sum(stage["seconds"] for stage in report["stages"].values())
+    assert total == pytest.approx(report["seconds"], rel=1e-6)
+    assert current_profile() is None  # Reset once the call returns
+
+
+def test_memory_mode_reports_allocations_per_stage():
+    load_model()
+    _, report = run_profiled("memory", predict, TEXTS * 50)
+
+    assert report["memory"]["peak_bytes"] > 0
+    assert report["memory"]["top_sites"]
+    site = report["memory"]["top_sites"][0]
+    assert site["size_bytes"] > 0 and site["count"] > 0
+    assert "peak_bytes" in report["stages"]["preprocess"]
+
+
+def test_cprofile_mode_lists_hot_functions():
+    load_model()
+    _, report = run_profiled("cprofile", predict, TEXTS)
+
+    functions = report["functions"]
+    assert functions and any("predict" in row["function"] for row in functions)
+    cumtimes = [row["cumtime"] for row in functions]
+    assert cumtimes == sorted(cumtimes, reverse=True)
+
+
+def test_observe_stage_still_feeds_metrics_while_profiling():
+    before = _stage_count("classify")
+
+    def timed():
+        with observe_stage("classify"):
+            pass
+
+    _, report = run_profiled("stages", timed)
+    assert _stage_count("classify") == before + 1
+    assert report["stages"]["classify"]["calls"] == 1
+    assert server_timing(report).startswith("classify;dur=")
+
+
+def test_profiler_sampling_and_store():
+    profiler = Profiler(sample_rate=0.0, sample_mode="stages", store_size=2)
+    assert profiler.choose_mode(None) is None
+    assert profiler.choose_mode("cprofile") == "cprofile"
+    with pytest.raises(ValueError, match="Unknown profiling mode"):
+        profiler.choose_mode("everything")
+
+    profiler.configure(sample_rate=1.0, sample_mode="memory")
+    assert profiler.choose_mode(None) == "memory"
+    with pytest.raises(ValueError):
+        profiler.configure(sample_rate=2.0)
+
+    ids = [profiler.save({"mode": "stages", "seconds": i}) for i in range(3)]
+    with pytest.raises(KeyError):
+        profiler.get(ids[0])  # Evicted
+    assert [p["id"] for p in profiler.list()] == ids[:0:-1]
+    assert profiler.stats()["profiled"] == 3
@@ -0,0 +1,68 @@
+# tests/test_serialization.py
+import json
+
+import numpy as np
+import pytest
+
+from sentiment_analysis_service import serialization
+from sentiment_analysis_service.schemas import PredictionResult, PredictResponse
+from sentiment_analysis_service.serialization import (
+    columnar_payload,
+    dumps,
+    standard_payload,
+)
+
+PREDICTIONS = [
+    {"input_text": "I love it", "sentiment": np.str_("positive")},
+    {"input_text": "Ünïcode ✓", "sentiment": np.str_("neutral")},
+]
+
+
+def test_standard_payload_matches_pydantic_response():
+    """The fast path must produce exactly the response_model JSON."""
+    expected = PredictResponse(
+        predictions=[PredictionResult(**p) for p in PREDICTIONS]
+    ).model_dump(mode="json")
+    assert json.loads(dumps(standard_payload(PREDICTIONS))) == expected
+
+
+def test_columnar_payload():
+    payload = json.loads(dumps(columnar_payload(PREDICTIONS)))
+    assert payload == {"count": 2, "labels": ["positive", "neutral"], "error": None}
+
+
+def test_item_without_sentiment_fails_like_pydantic_path():
+    with pytest.raises(ValueError, match="boom"):
+        standard_payload([{"input_text": "x", "error": "boom"}])
+
+
+def test_stdlib_fallback_handles_numpy(monkeypatch):
+    monkeypatch.setattr(serialization, "orjson", None)
+    encoded = dumps({"labels": np.array(["a", "b"]), "one": np.str_("c")})
+    assert json.loads(encoded) == {"labels": ["a", "b"], "one": "c"}
+
+
+def test_long_text_actions_reported():
+    predictions = [dict(PREDICTIONS[0]), dict(PREDICTIONS[1], long_text="truncated")]
+    columnar = json.loads(dumps(columnar_payload(predictions)))
+    assert columnar["long_text"] == {"1": "truncated"}
+    standard = json.loads(dumps(standard_payload(predictions)))
+    assert [p["long_text"] for p in standard["predictions"]] == [None, "truncated"]
+
+
+def test_columnar_payload_with_probabilities():
+    predictions = [
+        dict(
+            PREDICTIONS[0],
+            confidence=0.7,
+            probabilities={"positive": 0.7, "neutral": 0.2},
+        ),
+        dict(PREDICTIONS[1], confidence=0.6, probabilities={"neutral": 0.6}),
+    ]
+    payload = json.loads(dumps(columnar_payload(predictions)))
+    assert payload["confidence"] == [0.7, 0.6]
+    assert payload["probabilities"] == {"neutral": [0.2, 0.6], "positive": [0.7, None]}
+    expected = PredictResponse(
+        predictions=[PredictionResult(**p) for p in predictions]
+    ).model_dump(mode="json")
+    assert json.loads(dumps(standard_payload(predictions))) == expected
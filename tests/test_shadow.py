@@ -0,0 +1,146 @@
+# tests/test_shadow.py
+from pathlib import Path
+
+import joblib
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from sentiment_analysis_service import predict as predict_module
+from sentiment_analysis_service.config import MODEL_PATH
+from sentiment_analysis_service.model_manager import LoadedModel
+from sentiment_analysis_service.predict import (
+    clear_prediction_cache,
+    flush_shadow_scoring,
+    get_shadow_stats,
+    load_model,
+    predict,
+    register_shadow_model,
+    shutdown_shadow_scoring,
+)
+from sentiment_analysis_service.shadow import (
+    ShadowBatch,
+    ShadowScorer,
+    parse_shadow_models,
+    vectorizer_key,
+)
+
+TEXTS = [
+    "This product is amazing! Highly recommend.",
+    "Very disappointed with the quality.",
+    "Works okay, but not great.",
+    "The app is buggy and crashes frequently.",
+    "This product is amazing! Highly recommend.",
+]
+
+
+@pytest.fixture(autouse=True)
+def no_shadows():
+    yield
+    shutdown_shadow_scoring()
+
+
+@pytest.fixture
+def contrarian_model_path(tmp_path):
+    """A model with its own vectorizer that predicts the opposite sentiment."""
+    pipeline = Pipeline(
+        [
+            ("tfidf", TfidfVectorizer()),
+            ("clf", LogisticRegression()),
+        ]
+    ).fit(
+        ["amazing recommend", "disappointed quality", "buggy crashes", "okay great"],
+        ["negative", "positive", "positive", "negative"],
+    )
+    path = tmp_path / "contrarian.joblib"
+    joblib.dump(pipeline, path)
+    return path
+
+
+def test_parse_shadow_models():
+    assert parse_shadow_models("") == {}
+    assert parse_shadow_models("a=models/a.joblib, b = b.mmap") == {
+        "a": Path("models/a.joblib"),
+        "b": Path("b.mmap"),
+    }
+    with pytest.raises(ValueError, match="name=path"):
+        parse_shadow_models("models/a.joblib")
+
+
+def test_vectorizer_key_identifies_identical_vectorizers(contrarian_model_path):
+    """Separately loaded copies share a key; another vocabulary does not."""
+    production = load_model()
+    assert vectorizer_key(joblib.load(MODEL_PATH)) == vectorizer_key(production)
+    assert vectorizer_key(production) is not None
+    assert vectorizer_key(joblib.load(contrarian_model_path)) != vectorizer_key(
+        production
+    )
+    assert vectorizer_key(object()) is None
+
+
+def test_shadow_sharing_the_vectorizer_reuses_production_features():
+    """A candidate with production's vectorizer only runs its classifier."""
+    load_model()
+    clear_prediction_cache()
+    register_shadow_model("same", MODEL_PATH)
+
+    results = predict(TEXTS)
+    flush_shadow_scoring()
+
+    stats = get_shadow_stats()["models"]["same"]
+    assert [r["sentiment"] for r in results] == [r["sentiment"] for r in predict(TEXTS)]
+    assert stats["shares_vectorizer"] is True
+    assert stats["agreement"] == 1.0
+    assert stats["items"] == len(TEXTS)
+    assert stats["reused_rows"] == len(set(TEXTS))  # All were cache misses
+    assert stats["mean_seconds"] > 0 and stats["mean_primary_seconds"] > 0
+
+
+def test_shadow_with_its_own_vectorizer_records_disagreement(contrarian_model_path):
+    load_model()
+    register_shadow_model("contrarian", contrarian_model_path)
+
+    predict(TEXTS, probabilities=True)
+    flush_shadow_scoring()
+
+    stats = get_shadow_stats()["models"]["contrarian"]
+    assert stats["shares_vectorizer"] is False
+    assert stats["reused_rows"] == 0
+    assert stats["agreement"] < 1.0
+    assert stats["errors"] == 0
+
+
+def test_submit_drops_batches_when_the_queue_is_full():
+    """Shadow scoring must never make predict() wait."""
+    scorer = ShadowScorer(queue_size=1)  # No model registered: nothing drains it
+    batch = ShadowBatch(
+        cleaned=["good"],
+        labels=["positive"],
+        primary=predict_module._active_model(),
+        primary_seconds=0.001,
+    )
+
+    assert scorer.submit(batch) is True
+    assert scorer.submit(batch) is False
+    assert scorer.stats()["dropped"] == 1
+
+
+def test_failing_shadow_model_is_counted_not_raised():
+    scorer = ShadowScorer()
+    broken = LoadedModel(model=object(), version="x", path=Path("x"), format="pickle")
+    scorer.register("broken", broken)
+    scorer.submit(
+        ShadowBatch(
+            cleaned=["good"],
+            labels=["positive"],
+            primary=predict_module._active_model(),
+            primary_seconds=0.001,
+        )
+    )
+    scorer.flush()
+
+    stats = scorer.stats()["models"]["broken"]
+    assert stats["errors"] == 1
+    assert "AttributeError" in stats["last_error"]
+    scorer.shutdown()
@@ -0,0 +1,48 @@
+# tests/test_sharding.py
+import pytest
+
+from sentiment_analysis_service import predict as predict_module
+from sentiment_analysis_service.benchmarks.corpus import long_text, short_tweets
+from sentiment_analysis_service.sharding import ShardPool, split_shards
+
+
+def test_split_shards_is_contiguous_and_complete():
+    items = list(range(10))
+    shards = split_shards(items, 3)
+    assert shards == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    assert split_shards(items, 20) == [[i] for i in items]
+    assert split_shards([], 4) == []
+
+
+def test_should_shard_respects_threshold_and_workers():
+    assert ShardPool(workers=4, threshold=100).should_shard(100)
+    assert not ShardPool(workers=4, threshold=100).should_shard(99)
+    assert not ShardPool(workers=1, threshold=100).should_shard(10**6)
+    assert not ShardPool(workers=4, threshold=0).should_shard(10**6)
+
+
+@pytest.fixture
+def sharded():
+    """Shards every batch of 50+ texts over two worker processes."""
+    predict_module.set_sharding(True, workers=2, threshold=50)
+    yield
+    predict_module.set_sharding(False)
+    predict_module.set_sharding(True)
+
+
+def test_sharded_predict_matches_unsharded(sharded):
+    texts = short_tweets(300) + [long_text(20000)]
+    predict_module.set_sharding(False)
+    expected = predict_module.predict(texts, probabilities=True)
+    predict_module.set_sharding(True, workers=2, threshold=50)
+    predict_module.start_shard_pool()
+    assert predict_module.get_sharding_stats()["running"]
+    results = predict_module.predict(texts, probabilities=True)
+    assert [r["sentiment"] for r in results] == [r["sentiment"] for r in expected]
+    assert [r.get("long_text") for r in results] == [
+        r.get("long_text") for r in expected
+    ]
+    assert [r["confidence"] for r in results] == pytest.approx(
+        [r["confidence"] for r in expected]
+    )
+    assert predict_module.predict_labels(texts) == [r["sentiment"] for r in expected]
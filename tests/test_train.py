@@ -0,0 +1,145 @@
+# tests/test_train.py
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from sentiment_analysis_service.benchmarks.corpus import labeled_texts
+from sentiment_analysis_service.compiled import compile_pipeline
+from sentiment_analysis_service.model_manager import load_artifact
+from sentiment_analysis_service.preprocessing import preprocess_batch
+from sentiment_analysis_service.train import (
+    build_vectorizer,
+    holdout_mask,
+    labeled_chunks,
+    train_model,
+    _count_terms,
+)
+
+
+@pytest.fixture
+def corpus_csv(tmp_path):
+    texts, labels = labeled_texts(600, seed=3)
+    path = tmp_path / "corpus.csv"
+    pd.DataFrame({"text": texts, "sentiment": labels}).to_csv(path, index=False)
+    return path
+
+
+def test_streamed_vocabulary_matches_in_memory_fit():
+    """Merged per-chunk counts should give TfidfVectorizer's vocabulary and idf."""
+    texts, _ = labeled_texts(300, seed=1)
+    texts += ["A rare word appears once", "", "the and of"]
+    document_frequency, n_documents = _count_terms(texts[:150], "english")
+    more, n_more = _count_terms(texts[150:], "english")
+    document_frequency.update(more)
+
+    streamed = build_vectorizer(document_frequency, n_documents + n_more, min_df=2)
+    reference = TfidfVectorizer(stop_words="english", min_df=2).fit(
+        preprocess_batch(texts)
+    )
+
+    assert streamed.vocabulary_ == reference.vocabulary_
+    np.testing.assert_allclose(streamed.idf_, reference.idf_)
+    sample = preprocess_batch(texts[:20])
+    np.testing.assert_allclose(
+        streamed.transform(sample).toarray(), reference.transform(sample).toarray()
+    )
+
+
+def test_holdout_split_does_not_depend_on_chunk_size(corpus_csv):
+    """Every pass (and any chunk size) must see the same train/test split."""
+
+    def split(chunk_size):
+        return np.concatenate(
+            [
+                is_test
+                for _, _, is_test in labeled_chunks(
+                    corpus_csv, "csv", "text", "sentiment", chunk_size, test_size=0.2
+                )
+            ]
+        )
+
+    assert np.array_equal(split(50), split(600))
+    assert 0.1 < split(50).mean() < 0.3
+    assert not holdout_mask(0, 10, 0.0).any()
+
+
+def test_train_model_writes_a_servable_pipeline(corpus_csv, tmp_path):
+    """The artifact should load like the notebook's pipeline and compile."""
+    output = tmp_path / "model.joblib"
+    summary = train_model(
+        corpus_csv, output, chunk_size=100, workers=1, log_mlflow=False
+    )
+
+    assert summary["rows_train"] + summary["rows_test"] == 600
+    assert summary["accuracy"] > 0.9
+    assert summary["peak_rss_bytes"] > 0
+    loaded = load_artifact(output)
+    texts, labels = labeled_texts(50, seed=99)
+    cleaned = preprocess_batch(texts)
+    predictions = loaded.model.predict(cleaned)
+    assert (predictions == np.array(labels)).mean() > 0.9
+    assert np.array_equal(compile_pipeline(loaded.model).predict(cleaned), predictions)
+
+
+def test_train_model_is_the_same_on_a_process_pool(corpus_csv, tmp_path):
+    """Parallel feature extraction must not change the trained model."""
+    single = tmp_path / "single.joblib"
+    parallel = tmp_path / "parallel.joblib"
+    train_model(corpus_csv, single, chunk_size=100, workers=1, log_mlflow=False)
+    train_model(corpus_csv, parallel, chunk_size=100, workers=2, log_mlflow=False)
+
+    np.testing.assert_array_equal(
+        load_artifact(single).model.steps[1][1].coef_,
+        load_artifact(parallel).model.steps[1][1].coef_,
+    )
+
+
+def test_train_model_rejects_missing_columns(corpus_csv, tmp_path):
+    with pytest.raises(ValueError, match="not found"):
+        train_model(
+            corpus_csv, tmp_path / "m.joblib", label_column="nope", log_mlflow=False
+        )
+
+
+def test_trained_model_probabilities_match_predict_proba(corpus_csv, tmp_path):
+    """SGDClassifier is one-vs-rest, so probabilities use normalized sigmoids."""
+    from sentiment_analysis_service.compiled import (
+        scores_to_probabilities,
+        uses_softmax,
+    )
+
+    output = tmp_path / "model.joblib"
+    train_model(corpus_csv, output, chunk_size=200, workers=1, log_mlflow=False)
+    pipeline = load_artifact(output).model
+    classifier = pipeline.steps[1][1]
+    features = pipeline.steps[0][1].transform(preprocess_batch(["great box", "bad"]))
+
+    assert not uses_softmax(classifier)
+    np.testing.assert_allclose(
+        scores_to_probabilities(classifier.decision_function(features), False),
+        classifier.predict_proba(features),
+    )
+
+
+def test_training_shuffles_a_label_sorted_corpus(tmp_path):
+    """With rows sorted by label, every chunk holds a single class."""
+    texts, labels = labeled_texts(1200, seed=5)
+    frame = pd.DataFrame({"text": texts, "sentiment": labels})
+    path = tmp_path / "sorted.csv"
+    frame.sort_values("sentiment", kind="stable").to_csv(path, index=False)
+
+    def accuracy(shuffle):
+        return train_model(
+            path,
+            tmp_path / f"shuffle_{shuffle}.joblib",
+            chunk_size=50,
+            workers=1,
+            epochs=2,
+            shuffle=shuffle,
+            log_mlflow=False,
+        )["accuracy"]
+
+    shuffled = accuracy(shuffle=True)
+    assert shuffled > 0.9
+    assert shuffled > accuracy(shuffle=False) + 0.1  # One class at a time
@@ -0,0 +1,46 @@
+# tests/test_vocabulary.py
+import numpy as np
+
+import pytest
+
+from sentiment_analysis_service.vocabulary import (
+    CompactVocabulary,
+    DictVocabulary,
+    SortedVocabulary,
+    NOT_FOUND,
+    build_vocabulary,
+)
+
+MAPPING = {"good": 3, "bad": 0, "great": 1, "café": 4, "a" * 12: 2}
+PROBES = ["good", "bad", "great", "café", "a" * 12, "missing", "goo", "goods", ""]
+PROBES += ["a" * 13, "zzz"]  # Longer than any stored term / past the last term
+
+
+@pytest.mark.parametrize("backend", [SortedVocabulary, CompactVocabulary])
+def test_vocabulary_backend_matches_dict(backend):
+    """Every backend must map every token to the same column as the dict."""
+    expected = DictVocabulary(MAPPING).lookup(PROBES)
+    actual = backend.from_mapping(MAPPING).lookup(PROBES)
+    np.testing.assert_array_equal(actual, expected)
+    assert expected[-1] == NOT_FOUND
+
+
+@pytest.mark.parametrize("backend", ["dict", "sorted", "compact"])
+def test_vocabulary_backend_empty_inputs(backend):
+    vocabulary = build_vocabulary(MAPPING, backend)
+    assert len(vocabulary) == len(MAPPING)
+    assert len(vocabulary.lookup([])) == 0
+    assert dict(vocabulary.items()) == MAPPING
+
+
+def test_compact_vocabulary_is_compact():
+    """Packed storage should cost the term bytes plus a 4-byte column each."""
+    vocabulary = CompactVocabulary.from_mapping(MAPPING)
+    term_bytes = sum(len(t.encode("utf-8")) for t in MAPPING)
+    assert vocabulary.blob.nbytes == term_bytes
+    assert vocabulary.columns.nbytes == 4 * len(MAPPING)
+
+
+def test_build_vocabulary_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        build_vocabulary(MAPPING, "trie")